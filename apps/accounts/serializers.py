@@ -5,6 +5,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from .models import User, Address
 from store.models import Category
+from common.utils.image_variants import ImageVariantsField
 
 class AddressSerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,6 +21,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class UserSerializer(serializers.ModelSerializer):
     address = AddressSerializer(read_only=True)
+    profile_photo_variants = ImageVariantsField(source="profile_photo")
 
     class Meta:
         model = User
@@ -28,6 +30,7 @@ class UserSerializer(serializers.ModelSerializer):
             "full_name",
             "phone_number",
             "profile_photo",
+            "profile_photo_variants",
             "address",
             "created_time",
         ]
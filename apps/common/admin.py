@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Region, District, StaticPage, Setting
+from .models import EndpointMetric, Region, District, StaticPage, Setting, Task
 
 
 @admin.register(Region)
@@ -36,3 +36,33 @@ class SettingAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "locked_until")
+    list_filter = ("status", "name")
+    search_fields = ("name", "last_error")
+    readonly_fields = ("guid", "created_time", "updated_time")
+
+
+@admin.register(EndpointMetric)
+class EndpointMetricAdmin(admin.ModelAdmin):
+    list_display = (
+        "view_name",
+        "method",
+        "period",
+        "requests",
+        "queries",
+        "total_time_us",
+        "over_budget",
+    )
+    list_filter = ("method", "period")
+    search_fields = ("view_name",)
+    date_hierarchy = "period"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "common"
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from .utils import image_variants, request_metrics
+
+        image_variants.connect_signals()
+        request_metrics.install_serializer_timing()
+        connection_created.connect(request_metrics.install_query_counting)
+        for connection in connections.all(initialized_only=True):
+            request_metrics.install_query_counting(connection)
@@ -0,0 +1,59 @@
+"""Umumiy o'qish endpointlarining async nusxalari (`custom_response` formatida)."""
+
+from django.http import Http404
+
+from common.utils.async_views import AsyncAPIView
+
+from . import views
+from .models import Setting, StaticPage
+from .serializers import (
+    RegionWithDistrictsSerializer,
+    SettingSerializer,
+    StaticPageDetailSerializer,
+    StaticPageListSerializer,
+)
+
+
+class RegionsWithDistrictsListView(AsyncAPIView):
+    envelope = True
+
+    async def get(self, request):
+        queryset = views.RegionsWithDistrictsListView().get_queryset()
+        regions = [region async for region in queryset.aiterator(chunk_size=500)]
+        return RegionWithDistrictsSerializer(
+            regions, many=True, context=self.get_serializer_context()
+        ).data
+
+
+class StaticPageListView(AsyncAPIView):
+    envelope = True
+
+    async def get(self, request):
+        pages = [
+            page
+            async for page in StaticPage.objects.filter(is_active=True).order_by("id")
+        ]
+        return StaticPageListSerializer(
+            pages, many=True, context=self.get_serializer_context()
+        ).data
+
+
+class StaticPageDetailView(AsyncAPIView):
+    envelope = True
+
+    async def get(self, request, slug):
+        try:
+            page = await StaticPage.objects.aget(slug=slug, is_active=True)
+        except StaticPage.DoesNotExist:
+            raise Http404
+        return StaticPageDetailSerializer(
+            page, context=self.get_serializer_context()
+        ).data
+
+
+class SettingDetailView(AsyncAPIView):
+    envelope = True
+
+    async def get(self, request):
+        setting, created = await Setting.objects.aget_or_create(pk=1)
+        return SettingSerializer(setting, context=self.get_serializer_context()).data
@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULTS = {
+    "ALIAS": "replica",
+    "STICKY_SECONDS": 10,
+    "COOKIE_NAME": "read_primary",
+}
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, "READ_REPLICA", {})}
+
+
+def get_replica_alias():
+    """Nusxa sozlanmagan bo'lsa None."""
+    alias = get_options()["ALIAS"]
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def replica_reads():
+    """Blok ichidagi o'qishlar (ContextVar orqali async thread'larda ham) nusxadan."""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Umumiy keshni to'ldiradigan o'qishlar uchun: nusxadagi eskirgan ma'lumot
+    keshga tushib, hamma uchun saqlanib qolmasligi kerak.
+    """
+    token = _read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    `replica_reads()` ichida o'qishlar nusxaga, qolgan hamma narsa (yozish,
+    admin, tranzaksiya ichidagi o'qishlar) asosiy bazaga yo'naltiriladi.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get():
+            return None
+        alias = get_replica_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Nusxadagi ma'lumot asosiy bazadagi bilan bir xil
+        aliases = {DEFAULT_DB_ALIAS, get_options()["ALIAS"]}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,8 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class ObjectNotFound(APIException):
+    status_code = status.HTTP_404_NOT_FOUND
+    default_detail = "Ma'lumot topilmadi"
+    default_code = "object_not_found"
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from common.utils import image_variants
+
+
+class Command(BaseCommand):
+    help = "Mavjud rasmlar uchun kichraytirilgan variantlarni yaratadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Mavjud variantlarni qayta yaratish"
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, field_name in image_variants.image_fields():
+            names.update(
+                model.objects.exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .values_list(field_name, flat=True)
+            )
+        names = sorted(name for name in names if image_variants.is_local(name))
+
+        def generate(name):
+            try:
+                return len(image_variants.generate_variants(name, options["force"]))
+            except Exception as exc:
+                self.stderr.write(f"{name}: {exc}")
+                return 0
+
+        created = sum(image_variants.get_executor().map(generate, names))
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(names)} ta rasm, {created} ta variant yaratildi.")
+        )
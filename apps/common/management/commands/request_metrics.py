@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from common.utils.request_metrics import request_metrics, summarize
+
+
+class Command(BaseCommand):
+    help = "Endpointlar bo'yicha so'rovlar soni, DB/serializer vaqti va latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+        parser.add_argument("--limit", type=int, default=30)
+        parser.add_argument(
+            "--sort",
+            choices=["total_ms", "avg_total_ms", "avg_queries", "avg_db_ms"],
+            default="total_ms",
+        )
+
+    def handle(self, *args, **options):
+        request_metrics.flush()
+        since = timezone.now() - timedelta(hours=options["hours"])
+        rows = sorted(summarize(since), key=lambda row: row[options["sort"]])
+        rows = rows[::-1][: options["limit"]]
+        if not rows:
+            self.stdout.write("O'lchovlar yo'q.")
+            return
+
+        header = (
+            f"{'endpoint':<45} {'req':>7} {'queries':>8} {'db ms':>8} "
+            f"{'ser ms':>8} {'total ms':>9} {'budget!':>7}"
+        )
+        self.stdout.write(header)
+        for row in rows:
+            self.stdout.write(
+                f"{row['method'] + ' ' + row['view_name']:<45} "
+                f"{row['requests']:>7} {row['avg_queries']:>8.1f} "
+                f"{row['avg_db_ms']:>8.1f} {row['avg_serializer_ms']:>8.1f} "
+                f"{row['avg_total_ms']:>9.1f} {row['over_budget']:>7}"
+            )
@@ -0,0 +1,51 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from common.utils import tasks
+
+
+class Command(BaseCommand):
+    help = "Navbatdagi fon vazifalarini bajaradi."
+
+    def add_arguments(self, parser):
+        config = tasks.get_config()
+        parser.add_argument("--workers", type=int, default=config["WORKERS"])
+        parser.add_argument("--batch-size", type=int, default=config["BATCH_SIZE"])
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Navbat bo'shaguncha ishlab, keyin to'xtash",
+        )
+
+    def handle(self, *args, **options):
+        worker_id = uuid.uuid4().hex
+        poll_interval = tasks.get_config()["POLL_INTERVAL"]
+        done = failed = 0
+
+        # Bitta worker bo'lsa vazifalar joriy oqimda bajariladi
+        pool = None
+        if options["workers"] > 1:
+            pool = ThreadPoolExecutor(max_workers=options["workers"])
+        run = pool.map if pool else map
+
+        try:
+            while True:
+                claimed = tasks.claim_tasks(options["batch_size"], worker_id)
+                if not claimed:
+                    if options["once"]:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                for ok in run(tasks.run_task, claimed):
+                    done += ok
+                    failed += not ok
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{done} ta vazifa bajarildi, {failed} tasi xato.")
+        )
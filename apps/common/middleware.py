@@ -0,0 +1,130 @@
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import get_options, get_replica_alias, replica_reads
+from .utils.request_metrics import (
+    RequestMetrics,
+    current_metrics,
+    get_view_name,
+    request_metrics,
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Har bir so'rov uchun SQL so'rovlar soni, DB vaqti, serializer vaqti va
+    umumiy vaqtni o'lchaydi. DEBUG talab qilinmaydi: so'rovlar
+    `count_queries` execute wrapper'i orqali sanaladi, SQL matni saqlanmaydi.
+    Sync va async rejimda ishlaydi, ASGI da async view'lar thread'ga
+    o'tkazilmaydi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request_metrics.enabled:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.record(request, metrics, start)
+        return response
+
+    async def __acall__(self, request):
+        if not request_metrics.enabled:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.record(request, metrics, start)
+        return response
+
+    def record(self, request, metrics, start):
+        metrics.total_time = perf_counter() - start
+        view_name = get_view_name(request)
+        if view_name:
+            request_metrics.record_request(view_name, request.method, metrics)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    `use_replica = True` belgilangan view'larning GET/HEAD so'rovlari o'qish
+    nusxasidan bajariladi. Yozuvchi so'rovdan (POST/PUT/PATCH/DELETE) keyin
+    qisqa muddatli cookie qo'yiladi va u amal qilguncha foydalanuvchi
+    so'rovlari asosiy bazadan o'qiydi, ya'ni o'z o'zgarishlarini darhol ko'radi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.use_replica(request):
+            return self.mark_primary(request, self.get_response(request))
+        with replica_reads():
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        if not self.use_replica(request):
+            return self.mark_primary(request, await self.get_response(request))
+        with replica_reads():
+            response = await self.get_response(request)
+        return response
+
+    @staticmethod
+    def use_replica(request):
+        if request.method not in SAFE_METHODS or get_replica_alias() is None:
+            return False
+        if get_options()["COOKIE_NAME"] in request.COOKIES:
+            return False
+        try:
+            match = resolve(request.path_info, getattr(request, "urlconf", None))
+        except Resolver404:
+            return False
+        view_class = getattr(match.func, "view_class", None)
+        return getattr(view_class, "use_replica", False)
+
+    @staticmethod
+    def mark_primary(request, response):
+        if request.method in SAFE_METHODS or get_replica_alias() is None:
+            return response
+        if response.status_code >= 400:
+            # Muvaffaqiyatsiz so'rov hech narsa yozmagan
+            return response
+        options = get_options()
+        response.set_cookie(
+            options["COOKIE_NAME"],
+            "1",
+            max_age=options["STICKY_SECONDS"],
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
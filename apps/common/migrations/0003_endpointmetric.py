@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:40
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_task"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EndpointMetric",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "guid",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                (
+                    "created_time",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Yaratilgan vaqti"
+                    ),
+                ),
+                (
+                    "updated_time",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Yangilangan vaqti"
+                    ),
+                ),
+                ("view_name", models.CharField(max_length=200)),
+                ("method", models.CharField(max_length=10)),
+                ("period", models.DateTimeField()),
+                ("requests", models.PositiveBigIntegerField(default=0)),
+                ("queries", models.PositiveBigIntegerField(default=0)),
+                ("db_time_us", models.PositiveBigIntegerField(default=0)),
+                ("serializer_time_us", models.PositiveBigIntegerField(default=0)),
+                ("total_time_us", models.PositiveBigIntegerField(default=0)),
+                ("over_budget", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-period", "view_name"],
+                "indexes": [
+                    models.Index(
+                        fields=["period"], name="common_endp_period_f8f30d_idx"
+                    )
+                ],
+                "unique_together": {("view_name", "method", "period")},
+            },
+        ),
+    ]
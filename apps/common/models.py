@@ -60,3 +60,54 @@ class Setting(BaseModel):
 
     class Meta:
         ordering = ["-created_time"]
+
+
+class Task(BaseModel):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("failed", "Failed"),
+    ]
+
+    name = models.CharField(max_length=255, db_index=True)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["run_at"]
+        indexes = [
+            models.Index(fields=["status", "run_at"]),
+            models.Index(fields=["status", "locked_until"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class EndpointMetric(BaseModel):
+    """Endpoint bo'yicha soatlik yig'indilar (RequestMetricsMiddleware)."""
+
+    view_name = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    period = models.DateTimeField()
+    requests = models.PositiveBigIntegerField(default=0)
+    queries = models.PositiveBigIntegerField(default=0)
+    db_time_us = models.PositiveBigIntegerField(default=0)
+    serializer_time_us = models.PositiveBigIntegerField(default=0)
+    total_time_us = models.PositiveBigIntegerField(default=0)
+    over_budget = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-period", "view_name"]
+        unique_together = [("view_name", "method", "period")]
+        indexes = [models.Index(fields=["period"])]
+
+    def __str__(self):
+        return f"{self.method} {self.view_name} @ {self.period:%Y-%m-%d %H:00}"
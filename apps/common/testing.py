@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils.request_metrics import get_budget
+
+
+class QueryBudgetMixin:
+    """
+    Testlar uchun: endpoint `REQUEST_METRICS["BUDGETS"]` dagi so'rovlar
+    chegarasidan oshmasligini tekshiradi.
+
+        with self.assertQueryBudget("store:ad-list"):
+            self.client.get(url)
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, view_name):
+        budget = get_budget(view_name).get("queries")
+        if budget is None:
+            self.fail(f"{view_name} uchun REQUEST_METRICS budjeti belgilanmagan")
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        if len(queries) > budget:
+            sql = "\n".join(
+                f"{i}. {query['sql']}" for i, query in enumerate(queries, start=1)
+            )
+            self.fail(f"{view_name}: {len(queries)} ta so'rov, budjet {budget}\n{sql}")
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path(
@@ -14,4 +14,21 @@ urlpatterns = [
     ),
     path("pages/", views.StaticPageListView.as_view(), name="pages"),
     path("settings/", views.SettingDetailView.as_view(), name="settings"),
+    # ASGI uchun async nusxalar
+    path(
+        "async/regions-with-districts/",
+        async_views.RegionsWithDistrictsListView.as_view(),
+        name="async-regions-with-districts",
+    ),
+    path(
+        "async/pages/<slug:slug>/",
+        async_views.StaticPageDetailView.as_view(),
+        name="async-static-page-detail",
+    ),
+    path("async/pages/", async_views.StaticPageListView.as_view(), name="async-pages"),
+    path(
+        "async/settings/",
+        async_views.SettingDetailView.as_view(),
+        name="async-settings",
+    ),
 ]
@@ -0,0 +1,156 @@
+"""
+DRF async view'larni qo'llamaydi, shuning uchun o'qish endpointlarining async
+nusxalari oddiy Django async View ustida quriladi. Javob formati, xatolar va
+sahifalash DRF view'lardagi bilan bir xil, filtr va serializerlar qayta
+ishlatiladi.
+"""
+
+import asyncio
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+from django.http import JsonResponse
+from django.http.response import HttpResponseBase
+from django.views import View
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .custom_exception_handler import custom_exception_handler
+from .custom_response_decorator import format_response_data
+
+
+async def aauthenticate(request):
+    """
+    JWT (Bearer) yoki sessiya foydalanuvchisi. Token tekshiruvi bazaga
+    murojaat qilmaydi, foydalanuvchi simplejwt ning o'z `get_user` i bilan
+    olinadi (faol emas, parol o'zgargan kabi tekshiruvlar saqlanadi).
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return await request.auser()
+    token = authentication.get_validated_token(raw_token)
+    return await sync_to_async(authentication.get_user)(token)
+
+
+def _release_connection(func):
+    def wrapper():
+        try:
+            return func()
+        finally:
+            # Worker thread ulanishi CONN_MAX_AGE bo'yicha yopiladi
+            close_old_connections()
+
+    return wrapper
+
+
+async def gather_queries(*funcs):
+    """
+    Mustaqil so'rovlarni (sync funksiyalar) parallel bajaradi. Django async
+    ORM i thread_sensitive: bitta so'rovdagi `await`lar baribir bitta
+    thread'da ketma-ket ishlaydi, shuning uchun har bir funksiya alohida
+    thread va ulanishda bajariladi. Tranzaksiya ichida (ATOMIC_REQUESTS,
+    testlar) boshqa ulanish yozilmagan ma'lumotni ko'rmaydi - ketma-ket.
+    """
+    if await sync_to_async(lambda: connection.in_atomic_block)():
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(
+        *(
+            sync_to_async(_release_connection(func), thread_sensitive=False)()
+            for func in funcs
+        )
+    )
+
+
+class AsyncAPIView(View):
+    """
+    Faqat GET. Handler ma'lumot (dict/list) qaytaradi, u DRF JSONRenderer
+    kabi JSON ga aylantiriladi. `self.request` - DRF Request, shuning uchun
+    filtr backendlari, sahifalash va serializerlar o'zgarishsiz ishlaydi.
+    `envelope = True` bo'lsa javob `custom_response` formatida qaytadi.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    pagination_class = None
+    envelope = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = Request(request)
+        try:
+            self.request.user = await aauthenticate(request)
+            data = await super().dispatch(self.request, *args, **kwargs)
+        except Exception as exc:
+            response = custom_exception_handler(
+                exc, {"view": self, "request": self.request}
+            )
+            if response is None:
+                raise
+            return self.render(response.data, response.status_code, exception=True)
+        if isinstance(data, HttpResponseBase):
+            return data
+        return self.render(data)
+
+    def render(self, data, status=200, exception=False):
+        if self.envelope:
+            data = format_response_data(data, exception)
+        return JsonResponse(
+            data,
+            status=status,
+            safe=False,
+            encoder=JSONEncoder,
+            json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+        )
+
+    def get_serializer_context(self, **extra):
+        return {"request": self.request, "view": self, **extra}
+
+    async def paginate(self, objects, count):
+        """
+        `pagination_class` sozlamalari bilan sahifa raqami bo'yicha sahifa.
+        `objects` - queryset (async o'qiladi) yoki ro'yxat.
+        """
+        paginator = self.pagination_class()
+        page_size = paginator.get_page_size(self.request)
+        page_number = self.request.query_params.get(paginator.page_query_param) or 1
+        try:
+            number = int(page_number)
+        except (TypeError, ValueError):
+            number = 0
+        pages = max(1, ceil(count / page_size))
+        if not 1 <= number <= pages:
+            raise NotFound(
+                paginator.invalid_page_message.format(
+                    page_number=page_number, message=""
+                )
+            )
+
+        start = (number - 1) * page_size
+        page = objects[start : start + page_size]
+        if not isinstance(page, list):
+            page = [obj async for obj in page]
+        self.page = (number, pages, count)
+        return page
+
+    def get_paginated_data(self, data):
+        number, pages, count = self.page
+        url = self.request.build_absolute_uri()
+        param = self.pagination_class.page_query_param
+        if number == 1:
+            previous_link = None
+        elif number == 2:
+            previous_link = remove_query_param(url, param)
+        else:
+            previous_link = replace_query_param(url, param, number - 1)
+        return {
+            "count": count,
+            "next": (
+                replace_query_param(url, param, number + 1) if number < pages else None
+            ),
+            "previous": previous_link,
+            "results": data,
+        }
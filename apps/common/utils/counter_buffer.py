@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "STORE": "common.utils.counter_buffer.LocalMemoryStore",
+    "STORE_OPTIONS": {},
+    # Soniya. 0 - buferlashsiz, har bir qo'shimcha darhol yoziladi; None - fon
+    # oqimisiz, faqat flush_* buyruqlari va jarayon chiqishida yoziladi
+    "FLUSH_INTERVAL": 10,
+    "FLUSH_THRESHOLD": 500,
+    "BATCH_SIZE": 500,
+}
+
+
+class LocalMemoryStore:
+    """Jarayon ichidagi hisoblagichlar (har bir worker o'zinikini yig'adi)."""
+
+    # Boshqa jarayon (masalan, flush_* buyruqlari) bu qiymatlarni ko'rmaydi
+    shared = False
+
+    def __init__(self, namespace=None):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, key, amount=1):
+        with self._lock:
+            self._counts[key] += amount
+            return len(self._counts)
+
+    def get(self, key):
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+
+class CounterBuffer:
+    """
+    Hisoblagich qo'shimchalarini xotirada (yoki umumiy faylda) yig'ib, fon
+    oqimida guruhlab yozadi. Vorislar `write(counts)` ni amalga oshiradi;
+    sozlamalar `settings_name` nomli lug'atdan olinadi.
+    """
+
+    settings_name = None
+    namespace = None
+    defaults = DEFAULTS
+
+    def __init__(self):
+        self._store = None
+        self._worker = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._exit_flush_registered = False
+        self._database_name = None
+
+    @property
+    def options(self):
+        return {**self.defaults, **getattr(settings, self.settings_name, {})}
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    options = self.options
+                    store_class = import_string(options["STORE"])
+                    self._store = store_class(
+                        namespace=self.namespace, **options["STORE_OPTIONS"]
+                    )
+        return self._store
+
+    def record(self, key, amount=1):
+        pending_keys = self.store.add(key, amount)
+        self._register_exit_flush()
+        options = self.options
+        if options["FLUSH_INTERVAL"] == 0:
+            self._flush_quietly()
+        elif options["FLUSH_INTERVAL"] is not None:
+            self._ensure_worker()
+            if pending_keys >= options["FLUSH_THRESHOLD"]:
+                self._wakeup.set()
+
+    @property
+    def is_shared(self):
+        """Store boshqa jarayonlardan ham o'qiladimi (flush_* buyruqlari uchun)."""
+        return getattr(self.store, "shared", False)
+
+    def pending(self, key):
+        return self.store.get(key)
+
+    def flush(self):
+        counts = self.store.drain()
+        if not counts:
+            return 0
+        try:
+            self.write(counts)
+        except Exception:
+            # Yozilmagan qo'shimchalar yo'qolmasligi uchun qaytarib qo'yamiz
+            for key, amount in counts.items():
+                self.store.add(key, amount)
+            raise
+        return sum(counts.values())
+
+    def write(self, counts):
+        raise NotImplementedError
+
+    @staticmethod
+    def group_by_amount(counts):
+        keys_by_amount = defaultdict(list)
+        for key, amount in counts.items():
+            keys_by_amount[amount].append(key)
+        return keys_by_amount
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name=f"{self.namespace}-flusher", daemon=True
+            )
+            self._worker.start()
+
+    def _register_exit_flush(self):
+        # Fon oqimi bo'lmasa ham (FLUSH_INTERVAL 0 yoki None) qoldiq yo'qolmaydi
+        if self._exit_flush_registered:
+            return
+        with self._lock:
+            if not self._exit_flush_registered:
+                self._database_name = connection.settings_dict["NAME"]
+                atexit.register(self._flush_at_exit)
+                self._exit_flush_registered = True
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            # Sozlama keyin 0/None ga o'zgarsa oqim band aylanmaydi
+            self._wakeup.wait(self.options["FLUSH_INTERVAL"] or None)
+            self._wakeup.clear()
+            close_old_connections()
+            self._flush_quietly()
+
+    def _flush_at_exit(self):
+        # Yig'ilgan qiymatlar boshqa bazaga tegishli (masalan, testlar tugab test
+        # bazasi o'chirilgan): yozilmaydi va asosiy bazaga ulanilmaydi
+        if connection.settings_dict["NAME"] != self._database_name:
+            return
+        self._flush_quietly()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("%s flush failed", type(self).__name__)
@@ -1,3 +1,4 @@
+from rest_framework.response import Response
 from rest_framework.views import APIView
 
 """
@@ -10,44 +11,49 @@ Response structure:
 """
 
 
+def format_response_data(response_data, exception):
+    data = {
+        "success": True,
+    }
+
+    if exception:
+        data["success"] = False
+        list_errors = []
+        errors = response_data.get("errors", [])
+
+        for e in errors:
+            field = e.get("field")
+            message = e.get("message")
+            try:
+                if isinstance(message, list):
+                    message_ = message[0]
+                else:
+                    message_ = message
+                error_data = {
+                    "field": field,
+                    "message": message_,
+                    "code": message_.code.upper(),
+                }
+            except Exception:
+                error_data = {
+                    "field": field,
+                    "message": message,
+                }
+            list_errors.append(error_data)
+
+        data["errors"] = list_errors
+    else:
+        data["data"] = response_data
+    return data
+
+
 def custom_response(view):
     def inner(self, request, *args, **kwargs):
         response = super(view, self).dispatch(request, args, **kwargs)
-        response_data = response.data
-        data = {
-            "success": True,
-        }
-
-        if response.exception:
-            data["success"] = False
-            list_errors = []
-            errors = response_data.get("errors", [])
-
-            for e in errors:
-                field = e.get("field")
-                message = e.get("message")
-                try:
-                    if isinstance(message, list):
-                        message_ = message[0]
-                    else:
-                        message_ = message
-                    error_data = {
-                        "field": field,
-                        "message": message_,
-                        "code": message_.code.upper(),
-                    }
-                except Exception:
-                    error_data = {
-                        "field": field,
-                        "message": message,
-                    }
-                list_errors.append(error_data)
-
-            data["errors"] = list_errors
-        else:
-            data["data"] = response_data
-
-        response.data = data
+        if not isinstance(response, Response):
+            # masalan, 304 Not Modified
+            return response
+        response.data = format_response_data(response.data, response.exception)
         return response
 
     assert issubclass(view, APIView), (
@@ -0,0 +1,231 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_delete, post_init, post_save
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+from .tasks import task
+
+DEFAULTS = {
+    # nomi: (eni, bo'yi) - rasm shu o'lchamga sig'diriladi
+    "SIZES": {"thumb": (320, 320), "detail": (800, 800), "full": (1600, 1600)},
+    "FORMAT": "WEBP",
+    "QUALITY": 80,
+    "WORKERS": 2,
+    "FIELDS": (),
+    # Tayyor bo'lmagan rasm storage da shuncha soniyadan keyin qayta tekshiriladi
+    "READY_CHECK_INTERVAL": 60,
+}
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "IMAGE_VARIANTS", {})}
+
+
+def is_local(name):
+    return bool(name) and not name.startswith(("http://", "https://"))
+
+
+def variant_name(name, variant):
+    config = get_config()
+    stem = os.path.splitext(name)[0]
+    return f"variants/{variant}/{stem}.{EXTENSIONS[config['FORMAT']]}"
+
+
+def ready_key(name):
+    # O'lchamlar yoki format o'zgarsa belgi ham yangilanadi
+    config = get_config()
+    source = f"{name}\n{config['FORMAT']}\n{sorted(config['SIZES'].items())}"
+    return f"image-variants:ready:{hashlib.sha1(source.encode()).hexdigest()}"
+
+
+def is_ready(name):
+    """
+    Variantlar worker yoki buyruq jarayonida yaratiladi, shuning uchun
+    tayyorlik umumiy storage dan (oxirgi yoziladigan variant fayli) olinadi.
+    Natija keshda saqlanadi: tayyor rasm qayta tekshirilmaydi, tayyor
+    bo'lmagani READY_CHECK_INTERVAL dan keyin tekshiriladi.
+    """
+    key = ready_key(name)
+    ready = cache.get(key)
+    if ready is None:
+        config = get_config()
+        last_variant = list(config["SIZES"])[-1]
+        ready = default_storage.exists(variant_name(name, last_variant))
+        cache.set(key, ready, None if ready else config["READY_CHECK_INTERVAL"])
+    return ready
+
+
+def variant_url(name, variant, ready=None):
+    """Variant hali tayyor bo'lmasa asl rasm manzili qaytadi."""
+    if not is_local(name):
+        return name or None
+    if ready is None:
+        ready = is_ready(name)
+    return default_storage.url(variant_name(name, variant) if ready else name)
+
+
+def variant_urls(name):
+    if not name:
+        return None
+    ready = is_local(name) and is_ready(name)
+    return {
+        variant: variant_url(name, variant, ready) for variant in get_config()["SIZES"]
+    }
+
+
+def generate_variants(name, force=False):
+    """Barcha o'lchamlarni yaratadi; mavjudlari `force` bo'lmasa o'tkaziladi."""
+    if not is_local(name):
+        return []
+    config = get_config()
+    pending = {
+        variant: variant_name(name, variant)
+        for variant in config["SIZES"]
+        if force or not default_storage.exists(variant_name(name, variant))
+    }
+    if not pending:
+        cache.set(ready_key(name), True, None)
+        return []
+
+    with default_storage.open(name, "rb") as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if config["FORMAT"] == "JPEG" or image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB" if config["FORMAT"] == "JPEG" else "RGBA")
+
+    created = []
+    for variant, path in pending.items():
+        resized = image.copy()
+        resized.thumbnail(config["SIZES"][variant], Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, config["FORMAT"], quality=config["QUALITY"])
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(buffer.getvalue()))
+        created.append(path)
+    cache.set(ready_key(name), True, None)
+    return created
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_config()["WORKERS"],
+                thread_name_prefix="image-variants",
+            )
+    return _executor
+
+
+@task
+def build_variants(name):
+    generate_variants(name)
+
+
+def is_referenced(name):
+    """Bir nechta yozuv bitta faylga ishora qilishi mumkin (takroriy nomlar)."""
+    return any(
+        model._default_manager.filter(**{field_name: name}).exists()
+        for model, field_name in image_fields()
+    )
+
+
+@task
+def delete_variant_files(name):
+    """
+    Faqat yaratilgan variantlarni o'chiradi. Asl fayl boshqa yozuvlarga ham
+    tegishli bo'lishi mumkin, shuning uchun tegilmaydi; nom hali ishlatilayotgan
+    bo'lsa variantlar ham qoladi.
+    """
+    if not is_local(name) or is_referenced(name):
+        return
+    cache.delete(ready_key(name))
+    for variant in get_config()["SIZES"]:
+        default_storage.delete(variant_name(name, variant))
+
+
+def schedule_variants(name):
+    """Variantlar `run_tasks` worker ida yaratiladi."""
+    if is_local(name):
+        build_variants.delay(name)
+
+
+def image_fields():
+    for path in get_config()["FIELDS"]:
+        label, field_name = path.rsplit(".", 1)
+        yield apps.get_model(label), field_name
+
+
+def remember_image_names(sender, instance, **kwargs):
+    # Bazadan yuklangan nomlar: saqlashda rasm almashganini bilish uchun.
+    # Kechiktirilgan (.only/.defer) maydon yozilmaydi va o'zgarmagan hisoblanadi
+    instance._image_names = {
+        field_name: instance.__dict__[field_name]
+        for model, field_name in image_fields()
+        if isinstance(instance, model) and field_name in instance.__dict__
+    }
+
+
+def schedule_variants_on_save(
+    sender, instance, created=False, raw=False, update_fields=None, **kwargs
+):
+    """Faqat rasm nomi o'zgarganda (masalan, `last_login` saqlanganda emas)."""
+    if raw:
+        return
+    loaded = getattr(instance, "_image_names", {})
+    for model, field_name in image_fields():
+        if not isinstance(instance, model) or field_name not in instance.__dict__:
+            continue
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        name = getattr(instance, field_name).name
+        if created or loaded.get(field_name, name) != name:
+            loaded[field_name] = name
+            schedule_variants(name)
+    instance._image_names = loaded
+
+
+def delete_files_on_delete(sender, instance, **kwargs):
+    for model, field_name in image_fields():
+        if isinstance(instance, model):
+            name = getattr(instance, field_name).name
+            if is_local(name):
+                delete_variant_files.delay(name)
+
+
+def connect_signals():
+    for model, _ in image_fields():
+        uid = f"image-variants:{model._meta.label_lower}"
+        post_init.connect(remember_image_names, sender=model, dispatch_uid=uid)
+        post_save.connect(schedule_variants_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(delete_files_on_delete, sender=model, dispatch_uid=uid)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Rasm maydoni uchun {"thumb": url, "detail": url, "full": url}."""
+
+    def to_representation(self, value):
+        urls = variant_urls(getattr(value, "name", value))
+        if urls is None:
+            return None
+        request = self.context.get("request")
+        if request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url) for variant, url in urls.items()
+        }
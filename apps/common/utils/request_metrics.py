@@ -0,0 +1,200 @@
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db.models import F
+from django.utils import timezone
+
+from .counter_buffer import DEFAULTS, CounterBuffer
+
+logger = logging.getLogger(__name__)
+
+METRIC_FIELDS = (
+    "requests",
+    "queries",
+    "db_time_us",
+    "serializer_time_us",
+    "total_time_us",
+    "over_budget",
+)
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+class RequestMetrics:
+    """Bitta so'rov davomida yig'iladigan o'lchovlar (soniyalarda)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.total_time = 0.0
+        self._serializer_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += perf_counter() - start
+
+
+def count_queries(execute, sql, params, many, context):
+    """Joriy so'rov o'lchovi bo'lsa SQL so'rovni unga qo'shadi."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.execute_wrapper(execute, sql, params, many, context)
+
+
+def install_query_counting(connection, **kwargs):
+    """
+    `connection_created` signali: har bir ulanishga `count_queries` qo'yiladi.
+    Ulanishlar thread'ga bog'liq, o'lchov esa ContextVar da, shuning uchun
+    async view'larning sync_to_async thread'laridagi so'rovlar ham sanaladi.
+    """
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def get_budget(view_name):
+    """`REQUEST_METRICS["BUDGETS"]` dan {"queries": n, "ms": n} (bo'lmasa {})."""
+    return request_metrics.options["BUDGETS"].get(view_name, {})
+
+
+def is_over_budget(view_name, metrics):
+    budget = get_budget(view_name)
+    if "queries" in budget and metrics.queries > budget["queries"]:
+        return True
+    return "ms" in budget and metrics.total_time * 1000 > budget["ms"]
+
+
+class RequestMetricsBuffer(CounterBuffer):
+    """
+    Endpoint o'lchovlarini xotirada yig'ib, soatlik EndpointMetric
+    qatorlariga F() qo'shimchalari bilan yozadi. Kalit - (view, method,
+    soat, maydon), shuning uchun faqat LocalMemoryStore ishlatiladi.
+    """
+
+    settings_name = "REQUEST_METRICS"
+    namespace = "request_metrics"
+    defaults = {
+        **DEFAULTS,
+        "ENABLED": True,
+        "FLUSH_INTERVAL": 60,
+        "BUDGETS": {},
+    }
+
+    @property
+    def enabled(self):
+        return self.options["ENABLED"]
+
+    def record_request(self, view_name, method, metrics):
+        period = timezone.now().replace(minute=0, second=0, microsecond=0)
+        values = {
+            "requests": 1,
+            "queries": metrics.queries,
+            "db_time_us": round(metrics.db_time * 1_000_000),
+            "serializer_time_us": round(metrics.serializer_time * 1_000_000),
+            "total_time_us": round(metrics.total_time * 1_000_000),
+            "over_budget": int(is_over_budget(view_name, metrics)),
+        }
+        if values["over_budget"]:
+            logger.warning(
+                "%s %s exceeded its budget: %d queries, %.1f ms",
+                method,
+                view_name,
+                metrics.queries,
+                metrics.total_time * 1000,
+            )
+        for field, amount in values.items():
+            if amount:
+                self.record((view_name, method, period.isoformat(), field), amount)
+
+    def write(self, counts):
+        from common.models import EndpointMetric
+
+        rows = {}
+        for (view_name, method, period, field), amount in counts.items():
+            rows.setdefault((view_name, method, period), {})[field] = amount
+
+        EndpointMetric.objects.bulk_create(
+            [
+                EndpointMetric(view_name=view_name, method=method, period=period)
+                for view_name, method, period in rows
+            ],
+            ignore_conflicts=True,
+        )
+        for (view_name, method, period), values in rows.items():
+            EndpointMetric.objects.filter(
+                view_name=view_name, method=method, period=period
+            ).update(**{field: F(field) + amount for field, amount in values.items()})
+
+
+request_metrics = RequestMetricsBuffer()
+
+
+def install_serializer_timing():
+    """
+    `serializer.data` vaqtini joriy so'rov o'lchoviga qo'shadi. DRF da buning
+    uchun kengaytma nuqtasi yo'q, shuning uchun BaseSerializer.data o'raladi;
+    ichma-ich `.data` chaqiruvlari bir marta sanaladi.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    data = BaseSerializer.data
+    if getattr(data.fget, "timed", False):
+        return
+
+    def timed_data(self):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return data.fget(self)
+        metrics._serializer_depth += 1
+        start = perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            metrics._serializer_depth -= 1
+            if not metrics._serializer_depth:
+                metrics.serializer_time += perf_counter() - start
+
+    timed_data.timed = True
+    BaseSerializer.data = property(timed_data)
+
+
+def summarize(since):
+    """`since` dan beri endpointlar bo'yicha o'rtacha qiymatlar."""
+    from django.db.models import Sum
+
+    from common.models import EndpointMetric
+
+    rows = (
+        EndpointMetric.objects.filter(period__gte=since)
+        .values("view_name", "method")
+        .annotate(**{field: Sum(field) for field in METRIC_FIELDS})
+        .order_by("-total_time_us")
+    )
+    summary = []
+    for row in rows:
+        requests = row["requests"] or 1
+        summary.append(
+            {
+                "view_name": row["view_name"],
+                "method": row["method"],
+                "requests": row["requests"],
+                "avg_queries": row["queries"] / requests,
+                "avg_db_ms": row["db_time_us"] / requests / 1000,
+                "avg_serializer_ms": row["serializer_time_us"] / requests / 1000,
+                "avg_total_ms": row["total_time_us"] / requests / 1000,
+                "total_ms": row["total_time_us"] / 1000,
+                "over_budget": row["over_budget"],
+            }
+        )
+    return summary
+
+
+def get_view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else None
@@ -0,0 +1,96 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+from common.db_router import primary_reads
+
+VERSION_KEY = "response-cache:version:{label}"
+RESPONSE_KEY = "response-cache:{digest}"
+
+
+def model_version(model):
+    key = VERSION_KEY.format(label=model._meta.label_lower)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.set(key, version, None)
+    return version
+
+
+def expire_response_cache(model):
+    """Model ma'lumotini qaytaruvchi barcha keshlangan javoblarni eskirtiradi."""
+    cache.set(VERSION_KEY.format(label=model._meta.label_lower), time.time_ns(), None)
+
+
+def expire_model_responses(sender, **kwargs):
+    expire_response_cache(sender)
+
+
+class ResponseCacheMixin:
+    """
+    GET javobini til, URL parametrlari va `cache_models` versiyalari bo'yicha
+    keshlaydi. Versiyalar shu modellarning post_save/post_delete signallarida
+    yangilanadi, shuning uchun o'zgarishdan keyin eski javob qaytmaydi.
+    Javobga ETag va Last-Modified qo'yiladi, mos so'rovlarga 304 qaytariladi.
+    """
+
+    cache_models = ()
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for model in cls.cache_models:
+            uid = f"response-cache:{model._meta.label_lower}"
+            post_save.connect(expire_model_responses, sender=model, dispatch_uid=uid)
+            post_delete.connect(expire_model_responses, sender=model, dispatch_uid=uid)
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 600)
+
+    def get_response_cache_key(self, request):
+        versions = [model_version(model) for model in self.cache_models]
+        parts = [
+            f"{type(self).__module__}.{type(self).__qualname__}",
+            get_language() or "",
+            urlencode(sorted(self.kwargs.items())),
+            urlencode(sorted(request.query_params.lists()), doseq=True),
+            *map(str, versions),
+        ]
+        digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+        return RESPONSE_KEY.format(digest=digest), max(versions, default=0)
+
+    def get(self, request, *args, **kwargs):
+        key, version = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            # Kesh hamma uchun: ma'lumot asosiy bazadan olinadi
+            with primary_reads():
+                response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = {
+                "data": response.data,
+                "etag": f'"{key.rsplit(":", 1)[-1]}"',
+                "last_modified": version // 10**9,
+            }
+            cache.set(key, entry, self.get_cache_timeout())
+
+        not_modified = get_conditional_response(
+            request._request,
+            etag=entry["etag"],
+            last_modified=entry["last_modified"],
+        )
+        response = not_modified or Response(entry["data"])
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        return response
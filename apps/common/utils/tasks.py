@@ -0,0 +1,122 @@
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # True bo'lsa vazifa navbatga yozilmay, darhol bajariladi
+    "EAGER": False,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_DELAY": 30,
+    "LEASE": 300,
+    "WORKERS": 4,
+    "BATCH_SIZE": 20,
+    "POLL_INTERVAL": 1,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "TASKS", {})}
+
+
+def task(func=None, *, max_attempts=None):
+    """
+    Funksiyani fon vazifasiga aylantiradi: `func.delay(*args, **kwargs)`
+    joriy tranzaksiya ichida navbatga yozadi (tranzaksiya bekor bo'lsa
+    vazifa ham yo'qoladi), `run_tasks` worker uni bajaradi. Argumentlar
+    JSON bo'lishi kerak. Vazifa kamida bir marta bajariladi, shuning uchun
+    u takror ishlashga chidamli (idempotent) bo'lishi kerak.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def delay(*args, **kwargs):
+            from common.models import Task
+
+            config = get_config()
+            if config["EAGER"]:
+                func(*args, **kwargs)
+                return None
+            return Task.objects.create(
+                name=name,
+                args=list(args),
+                kwargs=kwargs,
+                max_attempts=max_attempts or config["MAX_ATTEMPTS"],
+                run_at=timezone.now(),
+            )
+
+        func.delay = delay
+        func.task_name = name
+        return func
+
+    return decorator(func) if func is not None else decorator
+
+
+def claim_tasks(limit, worker_id=None):
+    """
+    Bajarilish vaqti kelgan yoki lease muddati o'tgan vazifalarni shartli
+    UPDATE bilan egallaydi; bir nechta worker bir vazifani olmaydi.
+    """
+    from common.models import Task
+
+    config = get_config()
+    worker_id = worker_id or uuid.uuid4().hex
+    now = timezone.now()
+    available = Q(status="pending", run_at__lte=now) | Q(
+        status="running", locked_until__lt=now
+    )
+    ids = list(
+        Task.objects.filter(available)
+        .order_by("run_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    Task.objects.filter(available, pk__in=ids).update(
+        status="running",
+        locked_by=worker_id,
+        locked_until=now + timedelta(seconds=config["LEASE"]),
+        attempts=F("attempts") + 1,
+    )
+    return list(Task.objects.filter(pk__in=ids, status="running", locked_by=worker_id))
+
+
+def run_task(task_row):
+    from common.models import Task
+
+    close_old_connections()
+    try:
+        func = import_string(task_row.name)
+        with transaction.atomic():
+            func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Vazifa bajarilmadi: %s", task_row.name)
+        pending = Task.objects.filter(pk=task_row.pk, locked_by=task_row.locked_by)
+        if task_row.attempts >= task_row.max_attempts:
+            pending.update(status="failed", last_error=error, locked_until=None)
+        else:
+            delay = get_config()["RETRY_DELAY"] * 2 ** (task_row.attempts - 1)
+            pending.update(
+                status="pending",
+                last_error=error,
+                locked_until=None,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+        return False
+    else:
+        Task.objects.filter(pk=task_row.pk, locked_by=task_row.locked_by).delete()
+        return True
+    finally:
+        close_old_connections()
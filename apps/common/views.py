@@ -9,11 +9,13 @@ from .serializers import (
     SettingSerializer,
 )
 from .utils.custom_response_decorator import custom_response
+from .utils.response_cache import ResponseCacheMixin
 
 
 @custom_response
-class RegionsWithDistrictsListView(generics.ListAPIView):
+class RegionsWithDistrictsListView(ResponseCacheMixin, generics.ListAPIView):
     serializer_class = RegionWithDistrictsSerializer
+    cache_models = (Region, District)
 
     def get_queryset(self):
         return Region.objects.prefetch_related(
@@ -22,23 +24,26 @@ class RegionsWithDistrictsListView(generics.ListAPIView):
 
 
 @custom_response
-class StaticPageDetailView(generics.RetrieveAPIView):
+class StaticPageDetailView(ResponseCacheMixin, generics.RetrieveAPIView):
     queryset = StaticPage.objects.filter(is_active=True)
     serializer_class = StaticPageDetailSerializer
     lookup_field = "slug"
+    cache_models = (StaticPage,)
 
 
 @custom_response
-class StaticPageListView(generics.ListAPIView):
+class StaticPageListView(ResponseCacheMixin, generics.ListAPIView):
     serializer_class = StaticPageListSerializer
+    cache_models = (StaticPage,)
 
     def get_queryset(self):
         return StaticPage.objects.filter(is_active=True).order_by('id')
 
 
 @custom_response
-class SettingDetailView(generics.RetrieveAPIView):
+class SettingDetailView(ResponseCacheMixin, generics.RetrieveAPIView):
     serializer_class = SettingSerializer
+    cache_models = (Setting,)
 
     def get_object(self):
         return Setting.get_settings()
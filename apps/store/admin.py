@@ -1,5 +1,7 @@
 # store/admin.py
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
 from modeltranslation.admin import TranslationAdmin
 from .models import (
@@ -8,6 +10,7 @@ from .models import (
     AdPhoto,
     FavoriteProduct,
     SavedSearch,
+    SavedSearchMatch,
     SearchCount,
     PopularSearch,
 )
@@ -96,20 +99,34 @@ class AdAdmin(TranslationAdmin):
 
     actions = ["make_active", "make_inactive", "make_top"]
 
+    @staticmethod
+    def set_status(queryset, status):
+        """
+        Holat `save()` orqali o'zgaradi: post_save signallari (hisoblagichlar,
+        saqlangan qidiruvlar, autocomplete, keshlar, updated_time) ishlaydi.
+        """
+        ads = list(queryset.exclude(status=status))
+        with transaction.atomic():
+            for ad in ads:
+                ad.status = status
+                ad.save(update_fields=["status", "updated_time"])
+        return len(ads)
+
     def make_active(self, request, queryset):
-        updated = queryset.update(status="active")
+        updated = self.set_status(queryset, "active")
         self.message_user(request, f"{updated} ta e'lon faollashtirildi.")
 
     make_active.short_description = "Tanlangan e'lonlarni faollashtirish"
 
     def make_inactive(self, request, queryset):
-        updated = queryset.update(status="inactive")
+        updated = self.set_status(queryset, "inactive")
         self.message_user(request, f"{updated} ta e'lon nofaol qilindi.")
 
     make_inactive.short_description = "Tanlangan e'lonlarni nofaol qilish"
 
     def make_top(self, request, queryset):
-        updated = queryset.update(is_top=True)
+        # ETag/Last-Modified yangilanishi uchun updated_time ham o'zgaradi
+        updated = queryset.update(is_top=True, updated_time=timezone.now())
         self.message_user(request, f"{updated} ta e'lon top qilindi.")
 
     make_top.short_description = "Tanlangan e'lonlarni top qilish"
@@ -190,12 +207,27 @@ class SavedSearchAdmin(admin.ModelAdmin):
         )
 
 
+@admin.register(SavedSearchMatch)
+class SavedSearchMatchAdmin(admin.ModelAdmin):
+    list_display = ["user", "saved_search", "ad", "is_seen", "created_time"]
+    list_filter = ["is_seen", "created_time"]
+    search_fields = ["user__first_name", "user__last_name", "ad__name"]
+    raw_id_fields = ["saved_search", "ad", "user"]
+
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request).select_related("user", "saved_search", "ad")
+        )
+
+
 @admin.register(SearchCount)
 class SearchCountAdmin(admin.ModelAdmin):
     list_display = ["category", "search_count", "updated_time"]
     list_filter = ["updated_time"]
     search_fields = ["category__name_uz", "category__name_ru"]
     ordering = ["-search_count"]
+    # Hisoblagichlar search_counter orqali F() bilan yoziladi
+    readonly_fields = ["search_count"]
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related("category")
@@ -203,21 +235,42 @@ class SearchCountAdmin(admin.ModelAdmin):
 
 @admin.register(PopularSearch)
 class PopularSearchAdmin(TranslationAdmin):
-    list_display = ["name", "search_count", "is_active", "updated_time"]
-    list_filter = ["is_active", "updated_time"]
+    list_display = ["name", "search_count", "is_active", "is_auto", "updated_time"]
+    list_filter = ["is_active", "is_auto", "updated_time"]
     search_fields = ["name_uz", "name_ru"]
-    ordering = ["-search_count"]
+    ordering = ["-trend_score", "-search_count"]
+    readonly_fields = ["search_count"]
 
     actions = ["make_active", "make_inactive"]
 
+    def save_model(self, request, obj, form, change):
+        # Admin holatini o'zgartirgan yozuv endi avtomatik boshqarilmaydi
+        if "is_active" in form.changed_data:
+            obj.is_auto = False
+        super().save_model(request, obj, form, change)
+
+    @staticmethod
+    def set_active(queryset, is_active):
+        """
+        `save()` orqali: post_save javob keshini va autocomplete indeksini
+        yangilaydi. Yozuv endi avtomatik boshqarilmaydi.
+        """
+        searches = list(queryset.exclude(is_active=is_active, is_auto=False))
+        with transaction.atomic():
+            for search in searches:
+                search.is_active = is_active
+                search.is_auto = False
+                search.save(update_fields=["is_active", "is_auto", "updated_time"])
+        return len(searches)
+
     def make_active(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = self.set_active(queryset, True)
         self.message_user(request, f"{updated} ta qidiruv faollashtirildi.")
 
     make_active.short_description = "Tanlangan qidiruvlarni faollashtirish"
 
     def make_inactive(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = self.set_active(queryset, False)
         self.message_user(request, f"{updated} ta qidiruv nofaol qilindi.")
 
     make_inactive.short_description = "Tanlangan qidiruvlarni nofaol qilish"
@@ -0,0 +1,169 @@
+"""
+Katalog va qidiruv o'qish endpointlarining async nusxalari (alohida
+`async/` yo'llarida). Filtrlar va tartiblash sync view'lardan olinadi, javob
+tarkibi bir xil. Keyset (`?cursor=`), ETag va javob keshi faqat sync
+versiyada.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, Sum
+from django.http import Http404
+
+from common.utils.async_views import AsyncAPIView, gather_queries
+
+from . import views
+from .autocomplete import autocomplete_index
+from .category_tree import get_category_tree
+from .count_cache import acached_count, count_digest
+from .models import Ad, Category, FavoriteProduct
+from .pagination import AdFeedPagination, SmallResultsSetPagination
+from .search import search_ads
+from .serializers import (
+    AdDetailSerializer,
+    AdListSerializer,
+    AutoCompleteSerializer,
+    CategoryWithChildrenSerializer,
+    SearchResultSerializer,
+    aget_liked_ad_ids,
+)
+from .trending import query_log
+from .view_counter import view_counter
+
+
+class CategoryWithChildrenView(AsyncAPIView):
+    use_replica = True
+
+    async def get(self, request):
+        tree = await sync_to_async(get_category_tree)()
+        serializer = CategoryWithChildrenSerializer(
+            tree.roots(),
+            many=True,
+            context=self.get_serializer_context(category_tree=tree),
+        )
+        return serializer.data
+
+
+class AdListView(AsyncAPIView):
+    use_replica = True
+    pagination_class = AdFeedPagination
+
+    def filter_queryset(self):
+        """
+        Sync view filtrlari (kategoriya daraxti, django-filter, qidiruv,
+        tartiblash). Forma tekshiruvi bazaga murojaat qilishi mumkin, shuning
+        uchun sync_to_async ichida chaqiriladi.
+        """
+        view = views.AdListView(request=self.request, args=(), kwargs={})
+        view.format_kwarg = None
+        queryset = view.filter_queryset(view.get_queryset())
+        filtered = bool(set(self.request.query_params) - view.unfiltered_params)
+        return queryset, count_digest(queryset), filtered
+
+    async def get_count(self, queryset, digest, filtered):
+        if not filtered:
+            result = await Category.objects.aaggregate(total=Sum("active_ad_count"))
+            return result["total"] or 0
+        return await acached_count(queryset, digest)
+
+    async def get(self, request):
+        queryset, digest, filtered = await sync_to_async(self.filter_queryset)()
+        count = await self.get_count(queryset, digest, filtered)
+        ads = await self.paginate(queryset, count)
+        serializer = AdListSerializer(
+            ads,
+            many=True,
+            context=self.get_serializer_context(
+                liked_ad_ids=await aget_liked_ad_ids(request, ads)
+            ),
+        )
+        return self.get_paginated_data(serializer.data)
+
+
+class AdDetailView(AsyncAPIView):
+    use_replica = True
+
+    async def get(self, request, slug):
+        queryset = views.AdDetailView.queryset.prefetch_related("photos")
+        try:
+            ad = await queryset.aget(slug=slug)
+        except Ad.DoesNotExist:
+            raise Http404
+        view_counter.record(ad.pk)
+        ad.view_count += view_counter.pending(ad.pk)
+
+        liked_ad_ids = set()
+        if (
+            request.user.is_authenticated
+            and await FavoriteProduct.objects.filter(user=request.user, ad=ad).aexists()
+        ):
+            liked_ad_ids.add(ad.pk)
+        serializer = AdDetailSerializer(
+            ad, context=self.get_serializer_context(liked_ad_ids=liked_ad_ids)
+        )
+        return serializer.data
+
+
+class CategoryProductSearchView(AsyncAPIView):
+    use_replica = True
+    pagination_class = SmallResultsSetPagination
+
+    async def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        results = []
+        if query:
+            query_log.record_request(request, query)
+            categories = Category.objects.filter(
+                Q(name__icontains=query) & Q(is_active=True)
+            )[:5]
+            ads = search_ads(
+                Ad.objects.filter(status="active").select_related("category"), query
+            )[:5]
+            # Ikki mustaqil so'rov parallel bajariladi
+            categories, ads = await gather_queries(
+                lambda: list(categories), lambda: list(ads)
+            )
+            results = [
+                {
+                    "id": category.id,
+                    "name": category.name,
+                    "type": "category",
+                    "icon": category.icon.url if category.icon else None,
+                }
+                for category in categories
+            ] + [
+                {
+                    "id": ad.id,
+                    "name": ad.name,
+                    "type": "product",
+                    "icon": (
+                        ad.category.icon.url
+                        if ad.category and ad.category.icon
+                        else None
+                    ),
+                }
+                for ad in ads
+            ]
+
+        page = await self.paginate(results, len(results))
+        serializer = SearchResultSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_data(serializer.data)
+
+
+class AutoCompleteSearchView(AsyncAPIView):
+    use_replica = True
+    pagination_class = SmallResultsSetPagination
+
+    async def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        results = []
+        if query:
+            # Indeks birinchi chaqiruvda bazadan quriladi
+            results = await sync_to_async(autocomplete_index.search)(query, limit=10)
+
+        page = await self.paginate(results, len(results))
+        serializer = AutoCompleteSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_data(serializer.data)
@@ -0,0 +1,287 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.translation import get_language
+
+from .search.base import tokenize
+
+logger = logging.getLogger(__name__)
+
+AD = "product"
+CATEGORY = "category"
+POPULAR = "popular"
+# Har bir nom uchun saqlanadigan so'z qo'shimchalari soni va uzunligi
+MAX_SUFFIXES = 8
+TERM_LENGTH = 40
+
+
+def normalize(text):
+    return " ".join(tokenize(text))
+
+
+def word_suffixes(text):
+    # "iPhone 15 Pro" -> "iphone 15 pro", "15 pro", "pro". Xotira cheklangan:
+    # dastlabki MAX_SUFFIXES ta so'zdan boshlanadi, har biri TERM_LENGTH gacha
+    tokens = tokenize(text)
+    return {
+        " ".join(tokens[i:])[:TERM_LENGTH]
+        for i in range(min(len(tokens), MAX_SUFFIXES))
+    }
+
+
+def matches_word_prefix(name, prefix):
+    """`prefix` nomdagi biror so'zdan boshlanadimi (qisqartirilgan term uchun)."""
+    return f" {normalize(name)}".find(f" {prefix}") >= 0
+
+
+class IndexData:
+    """Indeks ma'lumoti: qayta qurishda yangisi yasalib, butunlay almashtiriladi."""
+
+    def __init__(self, languages):
+        self.languages = languages
+        self.default_language = languages[0]
+        self.terms = {language: [] for language in languages}
+        self.entries = {}
+        self.entry_terms = {}
+        self.category_icons = {}
+
+    def add(self, kind, object_id, names, category_id, icon=None, bulk=False):
+        key = (kind, object_id)
+        if not bulk:
+            self.remove(key)
+        display = {
+            language: names.get(language) or names.get(self.default_language) or ""
+            for language in self.languages
+        }
+        terms = []
+        for language, name in display.items():
+            for term in word_suffixes(name):
+                if bulk:
+                    self.terms[language].append((term, key))
+                else:
+                    insort(self.terms[language], (term, key))
+                terms.append((language, term))
+        self.entries[key] = {
+            "names": display,
+            "category_id": category_id,
+            "icon": icon,
+        }
+        self.entry_terms[key] = terms
+
+    def remove(self, key):
+        for language, term in self.entry_terms.pop(key, []):
+            items = self.terms[language]
+            position = bisect_left(items, (term, key))
+            if position < len(items) and items[position] == (term, key):
+                del items[position]
+        self.entries.pop(key, None)
+
+    def update(self, kind, object_id, names, is_visible, category_id=None, icon=None):
+        if is_visible:
+            self.add(kind, object_id, names, category_id, icon)
+        else:
+            self.remove((kind, object_id))
+
+
+class PrefixIndex:
+    """
+    Avtoto'ldirish uchun xotiradagi prefiks indeks: har bir til uchun
+    `(term, key)` juftliklarining saralangan ro'yxati, qidiruv `bisect` bilan.
+    Faol e'lonlar, kategoriyalar va mashhur qidiruvlar nomlari indekslanadi.
+
+    Indeks signallar bilan yangilanadi. Boshqa workerlardagi o'zgarishlar
+    uchun u `AUTOCOMPLETE_REBUILD_INTERVAL` da bir fon thread'ida yangidan
+    quriladi va tayyor bo'lgach almashtiriladi; qurish paytidagi signal
+    o'zgarishlari yangi indeksga ham qo'llanadi.
+    """
+
+    def __init__(self, languages=None):
+        self.languages = tuple(languages or settings.MODELTRANSLATION_LANGUAGES)
+        self.default_language = self.languages[0]
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._data = IndexData(self.languages)
+        self._pending = None
+        self._refresh_thread = None
+        self.built_at = None
+
+    # Qurish
+    def load(self):
+        """Bazadan yangi IndexData; joriy indeks qurish davomida ishlayveradi."""
+        from .models import Ad, Category, PopularSearch
+
+        data = IndexData(self.languages)
+        name_fields = [f"name_{language}" for language in self.languages]
+        for row in Category.objects.values("id", "icon", "is_active", *name_fields):
+            data.category_icons[row["id"]] = row["icon"]
+            if row["is_active"]:
+                data.add(CATEGORY, row["id"], self._names(row), None, bulk=True)
+        for row in Ad.objects.filter(status="active").values(
+            "id", "category_id", *name_fields
+        ):
+            data.add(AD, row["id"], self._names(row), row["category_id"], bulk=True)
+        for row in PopularSearch.objects.filter(is_active=True).values(
+            "id", "icon", *name_fields
+        ):
+            data.add(POPULAR, row["id"], self._names(row), None, row["icon"], bulk=True)
+        for items in data.terms.values():
+            items.sort()
+        return data
+
+    def build(self):
+        with self._build_lock:
+            self._build()
+
+    def _build(self):
+        with self._lock:
+            self._pending = []
+        try:
+            data = self.load()
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+        with self._lock:
+            for change in pending:
+                change(data)
+            self._data = data
+            self.built_at = time.monotonic()
+
+    def ensure_built(self):
+        """
+        Birinchi marta indeks so'rov ichida quriladi (undan oldin qaytaradigan
+        narsa yo'q), keyingi qayta qurishlar so'rovni kutdirmaydi.
+        """
+        if self.built_at is None:
+            with self._build_lock:
+                if self.built_at is None:
+                    self._build()
+            return
+        interval = getattr(settings, "AUTOCOMPLETE_REBUILD_INTERVAL", None)
+        if interval and time.monotonic() - self.built_at > interval:
+            self.refresh_in_background()
+
+    def refresh_in_background(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh, name="autocomplete-rebuild", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _refresh(self):
+        from django.db import close_old_connections
+
+        try:
+            self.build()
+        except Exception:
+            logger.exception("Autocomplete index rebuild failed")
+        finally:
+            close_old_connections()
+
+    def _names(self, source):
+        get = source.get if isinstance(source, dict) else source.__dict__.get
+        return {language: get(f"name_{language}") or "" for language in self.languages}
+
+    # O'zgartirish
+    def _change(self, change):
+        """Joriy indeksga qo'llaydi va qurilayotgan indeks uchun eslab qoladi."""
+        with self._lock:
+            if self.built_at is None and self._pending is None:
+                return
+            change(self._data)
+            if self._pending is not None:
+                self._pending.append(change)
+
+    def _update(self, kind, instance, is_visible, category_id=None, icon=None):
+        # Qiymatlar hozir olinadi: o'chirilgach instance.pk None bo'ladi
+        object_id, names = instance.pk, self._names(instance)
+        self._change(
+            lambda data: data.update(
+                kind, object_id, names, is_visible, category_id, icon
+            )
+        )
+
+    def update_ad(self, ad, deleted=False):
+        self._update(
+            AD, ad, not deleted and ad.status == "active", category_id=ad.category_id
+        )
+
+    def update_category(self, category, deleted=False):
+        category_id = category.pk
+        icon = None if deleted else category.icon.name or None
+
+        def change(data):
+            if deleted:
+                data.category_icons.pop(category_id, None)
+            else:
+                data.category_icons[category_id] = icon
+
+        self._change(change)
+        self._update(CATEGORY, category, not deleted and category.is_active)
+
+    def update_popular_search(self, popular_search, deleted=False):
+        self._update(
+            POPULAR,
+            popular_search,
+            not deleted and popular_search.is_active,
+            icon=popular_search.icon.name or None,
+        )
+
+    # Qidiruv
+    @staticmethod
+    def _icon_url(data, entry, kind, object_id):
+        if kind == AD:
+            name = data.category_icons.get(entry["category_id"])
+        elif kind == CATEGORY:
+            name = data.category_icons.get(object_id)
+        else:
+            name = entry["icon"]
+        return default_storage.url(name) if name else None
+
+    def search(self, query, language=None, limit=10):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self.ensure_built()
+        language = (language or get_language() or "")[:2]
+        if language not in self.languages:
+            language = self.default_language
+
+        term_prefix = prefix[:TERM_LENGTH]
+        results = []
+        seen = set()
+        with self._lock:
+            data = self._data
+            items = data.terms[language]
+            position = bisect_left(items, (term_prefix,))
+            while position < len(items) and len(results) < limit:
+                term, key = items[position]
+                if not term.startswith(term_prefix):
+                    break
+                position += 1
+                if key in seen:
+                    continue
+                entry = data.entries[key]
+                if term_prefix != prefix and not matches_word_prefix(
+                    entry["names"][language], prefix
+                ):
+                    continue
+                seen.add(key)
+                kind, object_id = key
+                results.append(
+                    {
+                        "id": object_id,
+                        "name": entry["names"][language],
+                        "type": kind,
+                        "icon": self._icon_url(data, entry, kind, object_id),
+                    }
+                )
+        return results
+
+
+autocomplete_index = PrefixIndex()
@@ -0,0 +1,300 @@
+"""
+Endpointlar uchun benchmark: so'rovlar jarayon ichida Django test Client
+(WSGI) orqali yuboriladi, shuning uchun tarmoq emas, faqat ilova o'lchanadi.
+Natija JSON: bir nechta ishga tushirishni solishtirish mumkin.
+"""
+
+import math
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from random import Random
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from common.utils.request_metrics import RequestMetrics
+
+from .dataset import BRANDS, PHONE_PREFIX, PRODUCTS, Zipf
+
+
+class Scenario:
+    def __init__(self, name, path, params=None, method="get", user=None):
+        self.name = name
+        self.path = path
+        # dict yoki rng -> dict
+        self.params = params or {}
+        self.method = method
+        self.user = user
+
+    def build(self, rng):
+        path = self.path(rng) if callable(self.path) else self.path
+        params = self.params(rng) if callable(self.params) else self.params
+        return path, params
+
+
+def percentile(values, percent):
+    """Nearest-rank persentil (values saralangan)."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def default_scenarios(seed=42, password="password"):
+    """Yaratilgan ma'lumotlar to'plamidan parametrlar bilan ssenariylar."""
+    from .models import Ad, Category, FavoriteProduct
+
+    User = get_user_model()
+    users = User.objects.filter(phone_number__startswith=PHONE_PREFIX)
+    if not users.exists():
+        raise ValueError("Avval `generate_dataset` bilan ma'lumotlar yarating")
+
+    slugs = list(
+        Ad.objects.filter(status="active")
+        .order_by("-view_count")
+        .values_list("slug", flat=True)[:1000]
+    )
+    hot_ads = Zipf(slugs, 1.1, f"{seed}:benchmark-ads")
+    category_ids = list(
+        Category.objects.filter(is_active=True)
+        .order_by("-subtree_ad_count")
+        .values_list("pk", flat=True)[:50]
+    )
+    categories = Zipf(category_ids, 1.1, f"{seed}:benchmark-categories")
+    terms = [word for pair in PRODUCTS for word in pair] + BRANDS
+    favorite_user = (
+        FavoriteProduct.objects.filter(user__phone_number__startswith=PHONE_PREFIX)
+        .values_list("user", flat=True)
+        .order_by("user")
+        .first()
+    )
+    login_users = list(
+        users.order_by("pk").values_list("phone_number", flat=True)[:100]
+    )
+
+    ad_list = reverse("store:ad-list")
+    scenarios = [
+        Scenario("ad-list", ad_list),
+        Scenario(
+            "ad-list:category",
+            ad_list,
+            lambda rng: {"category": categories.choice(rng)},
+        ),
+        Scenario(
+            "ad-list:price",
+            ad_list,
+            lambda rng: {"min_price": rng.choice([0, 100_000, 1_000_000])}
+            | {"max_price": rng.choice([500_000, 5_000_000, 50_000_000])},
+        ),
+        Scenario("ad-list:search", ad_list, lambda rng: {"search": rng.choice(terms)}),
+        Scenario(
+            "ad-list:ordering",
+            ad_list,
+            lambda rng: {"ordering": rng.choice(["price", "-price", "-view_count"])},
+        ),
+        Scenario(
+            "ad-detail",
+            lambda rng: reverse(
+                "store:ad-detail", kwargs={"slug": hot_ads.choice(rng)}
+            ),
+        ),
+        Scenario("categories-with-children", reverse("store:categories-with-children")),
+        Scenario(
+            "autocomplete",
+            reverse("store:autocomplete-search"),
+            lambda rng: {"q": rng.choice(terms)[: rng.randint(2, 4)]},
+        ),
+        Scenario(
+            "category-product-search",
+            reverse("store:category-product-search"),
+            lambda rng: {"q": rng.choice(terms)},
+        ),
+        Scenario(
+            "login",
+            reverse("user-login"),
+            lambda rng: {"phone_number": rng.choice(login_users), "password": password},
+            method="post",
+        ),
+    ]
+    if favorite_user is not None:
+        scenarios.append(
+            Scenario("favorites", reverse("store:my-favorite-list"), user=favorite_user)
+        )
+    return scenarios
+
+
+class BenchmarkRunner:
+    def __init__(self, requests=200, warmup=20, memory_samples=10, seed=42):
+        self.requests = requests
+        self.warmup = warmup
+        self.memory_samples = memory_samples
+        self.seed = seed
+
+    def client_for(self, scenario):
+        client = Client()
+        if scenario.user is not None:
+            user = get_user_model().objects.get(pk=scenario.user)
+            token = RefreshToken.for_user(user).access_token
+            client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        return client
+
+    def send(self, client, scenario, rng):
+        path, params = scenario.build(rng)
+        if scenario.method == "get":
+            response = client.get(path, params)
+        else:
+            response = client.post(path, params, content_type="application/json")
+        # Test Client ulanishlarni yopmaydi; server kabi request_finished da
+        # CONN_MAX_AGE bo'yicha yopiladi (0 bo'lsa har so'rovdan keyin)
+        if not connection.in_atomic_block:
+            close_old_connections()
+        return response
+
+    def measure(self, scenario):
+        rng = Random(f"{self.seed}:{scenario.name}")
+        client = self.client_for(scenario)
+        for _ in range(self.warmup):
+            self.send(client, scenario, rng)
+
+        latencies, queries, db_time, errors = [], [], 0.0, 0
+        started = perf_counter()
+        for _ in range(self.requests):
+            metrics = RequestMetrics()
+            with ExitStack() as stack:
+                for db in connections.all():
+                    stack.enter_context(db.execute_wrapper(metrics.execute_wrapper))
+                request_started = perf_counter()
+                response = self.send(client, scenario, rng)
+                latencies.append(perf_counter() - request_started)
+            queries.append(metrics.queries)
+            db_time += metrics.db_time
+            errors += response.status_code >= 400
+        elapsed = perf_counter() - started
+
+        latencies.sort()
+        count = len(latencies) or 1
+        return {
+            "requests": self.requests,
+            "errors": errors,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "mean_ms": sum(latencies) / count * 1000,
+            "throughput_rps": self.requests / elapsed if elapsed else 0.0,
+            "queries_avg": sum(queries) / count,
+            "queries_max": max(queries, default=0),
+            "db_ms_avg": db_time / count * 1000,
+            "peak_memory_kb": self.peak_memory(client, scenario, rng),
+        }
+
+    def peak_memory(self, client, scenario, rng):
+        """Alohida o'tish: tracemalloc latency o'lchovlarini buzmasligi uchun."""
+        if not self.memory_samples:
+            return None
+        tracemalloc.start()
+        peak = 0
+        try:
+            for _ in range(self.memory_samples):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                self.send(client, scenario, rng)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+        return round(peak / 1024, 1)
+
+    @contextmanager
+    def conn_max_age(self, value):
+        """Barcha ulanishlar uchun vaqtincha CONN_MAX_AGE (None - o'zgartirmaslik)."""
+        if value is None:
+            yield
+            return
+        previous = {}
+        for db in connections.all():
+            previous[db.alias] = db.settings_dict["CONN_MAX_AGE"]
+            db.settings_dict["CONN_MAX_AGE"] = value
+            # close_at ulanish ochilganda hisoblanadi
+            if not db.in_atomic_block:
+                db.close()
+        try:
+            yield
+        finally:
+            for db in connections.all():
+                db.settings_dict["CONN_MAX_AGE"] = previous.get(
+                    db.alias, db.settings_dict["CONN_MAX_AGE"]
+                )
+
+    def run(self, scenarios, log=None, conn_max_ages=(None,)):
+        """
+        Bir nechta `conn_max_ages` berilsa har bir ssenariy har biri bilan
+        o'lchanadi, natija nomi `<ssenariy>@conn_max_age=<n>`.
+        """
+        log = log or (lambda message: None)
+        endpoints = {}
+        # DEBUG da SQL log va debug toolbar natijani buzadi
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+            for conn_max_age in conn_max_ages:
+                with self.conn_max_age(conn_max_age):
+                    for scenario in scenarios:
+                        name = scenario.name
+                        if conn_max_age is not None:
+                            name = f"{name}@conn_max_age={conn_max_age}"
+                        endpoints[name] = self.measure(scenario)
+                        log(name)
+        return {
+            "meta": {
+                "created": timezone.now().isoformat(),
+                "seed": self.seed,
+                "requests": self.requests,
+                "warmup": self.warmup,
+                "database": connection.vendor,
+                "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+                "debug": settings.DEBUG,
+                "dataset": dataset_size(),
+            },
+            "endpoints": endpoints,
+        }
+
+
+def dataset_size():
+    from .models import Ad, Category, FavoriteProduct
+
+    return {
+        "users": get_user_model().objects.count(),
+        "categories": Category.objects.count(),
+        "ads": Ad.objects.count(),
+        "favorites": FavoriteProduct.objects.count(),
+    }
+
+
+def compare(report, baseline, threshold=0.2, min_delta_ms=1.0):
+    """
+    Oldingi natija bilan solishtiradi: p95 `threshold` ulushdan (va
+    `min_delta_ms` dan) ko'proq oshgan, so'rovlar soni yoki xatolar
+    ko'paygan endpointlar ro'yxatini qaytaradi.
+    """
+    regressions = []
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        delta = current["p95_ms"] - previous["p95_ms"]
+        if delta > min_delta_ms and delta > previous["p95_ms"] * threshold:
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms"
+            )
+        if current["queries_max"] > previous["queries_max"]:
+            regressions.append(
+                f"{name}: queries {previous['queries_max']} -> {current['queries_max']}"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(
+                f"{name}: errors {previous['errors']} -> {current['errors']}"
+            )
+    return regressions
@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .category_tree import invalidate_category_tree
+
+ACTIVE = "active"
+
+
+def adjust(category_id, delta):
+    from .models import Category
+
+    if not category_id or not delta:
+        return
+    Category.objects.filter(pk=category_id).update(
+        active_ad_count=F("active_ad_count") + delta
+    )
+    adjust_subtree(category_id, delta)
+
+
+def adjust_subtree(category_id, delta):
+    """
+    Kategoriya va uning barcha ota kategoriyalaridagi umumiy sonni bitta
+    UPDATE bilan o'zgartiradi. Ajdodlar `path` dan olinadi, daraxt keshi
+    yuklanmaydi. Keshlangan daraxt va javoblar sonlarni ham saqlaydi,
+    shuning uchun ular tranzaksiya tugagach tozalanadi.
+    """
+    from .models import Category
+
+    if not category_id or not delta:
+        return
+    path = (
+        Category.objects.filter(pk=category_id).values_list("path", flat=True).first()
+    )
+    ids = [int(pk) for pk in (path or "").split("/") if pk] or [category_id]
+    Category.objects.filter(pk__in=ids).update(
+        subtree_ad_count=F("subtree_ad_count") + delta
+    )
+    transaction.on_commit(invalidate_category_tree)
+
+
+def ad_changed(old_state, new_state):
+    """`(status, category_id)` juftliklari bo'yicha hisoblagichlarni tuzatadi."""
+    old_status, old_category_id = old_state
+    new_status, new_category_id = new_state
+    was_active = old_status == ACTIVE
+    is_active = new_status == ACTIVE
+
+    if old_category_id == new_category_id:
+        adjust(new_category_id, int(is_active) - int(was_active))
+        return
+    if was_active:
+        adjust(old_category_id, -1)
+    if is_active:
+        adjust(new_category_id, 1)
+
+
+def recount():
+    from .models import Ad, Category
+
+    direct = dict(
+        Ad.objects.filter(status=ACTIVE)
+        .order_by()
+        .values("category_id")
+        .annotate(total=Count("id"))
+        .values_list("category_id", "total")
+    )
+    categories = list(
+        Category.objects.only("id", "parent_id", "active_ad_count", "subtree_ad_count")
+    )
+    parents = {category.id: category.parent_id for category in categories}
+    subtree = defaultdict(int)
+    for category_id, total in direct.items():
+        seen = set()
+        while category_id is not None and category_id not in seen:
+            seen.add(category_id)
+            subtree[category_id] += total
+            category_id = parents.get(category_id)
+
+    changed = []
+    for category in categories:
+        counts = (direct.get(category.id, 0), subtree[category.id])
+        if counts != (category.active_ad_count, category.subtree_ad_count):
+            category.active_ad_count, category.subtree_ad_count = counts
+            changed.append(category)
+
+    Category.objects.bulk_update(
+        changed, ["active_ad_count", "subtree_ad_count"], batch_size=500
+    )
+    invalidate_category_tree()
+    return len(changed)
@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from common.utils.response_cache import expire_response_cache
+
+CACHE_KEY = "store:category-tree"
+
+
+class CategoryTree:
+    """
+    Barcha kategoriyalar bitta so'rovda yuklanib, daraxt xotirada quriladi.
+    Avlod/ajdodlarni topish bazaga murojaat qilmaydi.
+    """
+
+    def __init__(self, categories):
+        self.nodes = {category.id: category for category in categories}
+        self.children_ids = defaultdict(list)
+        for category in categories:
+            self.children_ids[category.parent_id].append(category.id)
+
+    @classmethod
+    def build(cls):
+        from .models import Category
+
+        # Daraxt keshlanadi, shuning uchun nusxadan emas, asosiy bazadan
+        return cls(list(Category.objects.using(DEFAULT_DB_ALIAS)))
+
+    def get(self, category_id):
+        return self.nodes.get(category_id)
+
+    def is_active(self, category_id):
+        category = self.nodes.get(category_id)
+        return category is not None and category.is_active
+
+    def sorted_categories(self, ids, active_only=True):
+        categories = [
+            self.nodes[category_id]
+            for category_id in ids
+            if not active_only or self.nodes[category_id].is_active
+        ]
+        return sorted(categories, key=lambda category: (category.order, category.name))
+
+    def roots(self, active_only=True):
+        return self.sorted_categories(self.children_ids[None], active_only)
+
+    def children(self, category_id, active_only=True):
+        if active_only and not self.is_active(category_id):
+            return []
+        return self.sorted_categories(self.children_ids[category_id], active_only)
+
+    def descendant_ids(self, category_id, include_self=True, active_only=True):
+        if category_id not in self.nodes or (
+            active_only and not self.is_active(category_id)
+        ):
+            return []
+        ids = [category_id] if include_self else []
+        stack = list(self.children_ids[category_id])
+        while stack:
+            child_id = stack.pop()
+            if active_only and not self.is_active(child_id):
+                continue
+            ids.append(child_id)
+            stack.extend(self.children_ids[child_id])
+        return ids
+
+    def ancestor_ids(self, category_id):
+        ids = []
+        category = self.nodes.get(category_id)
+        while category is not None and category.parent_id is not None:
+            if category.parent_id in ids:
+                break
+            ids.append(category.parent_id)
+            category = self.nodes.get(category.parent_id)
+        return ids
+
+
+def get_category_tree():
+    tree = cache.get(CACHE_KEY)
+    if tree is None:
+        tree = CategoryTree.build()
+        cache.set(
+            CACHE_KEY, tree, getattr(settings, "CATEGORY_TREE_CACHE_TIMEOUT", 300)
+        )
+    return tree
+
+
+def invalidate_category_tree():
+    from .models import Category
+
+    cache.delete(CACHE_KEY)
+    # Hisoblagichlar `update()` bilan o'zgaradi, signal bermaydi
+    expire_response_cache(Category)
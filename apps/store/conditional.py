@@ -0,0 +1,132 @@
+import hashlib
+
+from django.db.models import Exists, OuterRef, Value
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+from .models import FavoriteProduct
+from .serializers import get_liked_ad_ids
+
+
+def make_etag(*parts, weak=False):
+    digest = hashlib.sha1("\n".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalAdDetailMixin:
+    """
+    E'lon sahifasi uchun ETag/Last-Modified. Validatorlar bitta yengil
+    so'rovda (`updated_time` va foydalanuvchi yoqtirganmi) olinadi; mos
+    kelsa serializer ishlamasdan 304 qaytadi. Rasm o'zgarishlari e'lonning
+    `updated_time` ini yangilaydi. `view_count` validatorga kirmaydi.
+    """
+
+    def get_ad_validators(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        user = self.request.user
+        if user.is_authenticated:
+            is_liked = Exists(
+                FavoriteProduct.objects.filter(ad=OuterRef("pk"), user=user)
+            )
+        else:
+            is_liked = Value(False)
+        validators = (
+            queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .annotate(is_liked=is_liked)
+            .values("pk", "updated_time", "is_liked")
+            .first()
+        )
+        if validators is None:
+            raise Http404
+        validators["etag"] = make_etag(
+            validators["pk"],
+            validators["updated_time"].isoformat(),
+            int(validators["is_liked"]),
+            get_language(),
+        )
+        return validators
+
+    def ad_requested(self, pk):
+        """304 bo'lsa ham chaqiriladi (masalan, ko'rishni hisoblash uchun)."""
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_ad_validators()
+        self.ad_requested(validators["pk"])
+        response = get_conditional_response(
+            request._request,
+            etag=validators["etag"],
+            last_modified=int(validators["updated_time"].timestamp()),
+        )
+        if response is None:
+            self.liked_ad_ids = {validators["pk"]} if validators["is_liked"] else set()
+            response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, validators["etag"], validators["updated_time"])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "liked_ad_ids", None) is not None:
+            context["liked_ad_ids"] = self.liked_ad_ids
+        return context
+
+
+class ConditionalAdListMixin:
+    """
+    Ro'yxat sahifasi uchun kuchsiz ETag: sahifadagi e'lonlar `id` va
+    `updated_time` lari, yoqtirilganlar va sahifalash holatidan olinadi.
+    Sahifa so'rovi bajariladi, lekin mos kelsa serializatsiya qilinmaydi.
+    """
+
+    ad_attr = None
+
+    def get_page_ad(self, obj):
+        return getattr(obj, self.ad_attr) if self.ad_attr else obj
+
+    def get_page_state(self):
+        paginator = self.paginator
+        if paginator is None:
+            return ()
+        if getattr(paginator, "keyset", None):
+            return (paginator.total, paginator.next_link, paginator.previous_link)
+        page = paginator.page
+        return (page.paginator.count, page.number)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(page if page is not None else queryset)
+        ads = [self.get_page_ad(obj) for obj in objects]
+        self.liked_ad_ids = get_liked_ad_ids(request, ads)
+
+        last_modified = max((ad.updated_time for ad in ads), default=None)
+        etag = make_etag(
+            get_language(),
+            *self.get_page_state(),
+            *(f"{ad.pk}:{ad.updated_time.isoformat()}" for ad in ads),
+            sorted(self.liked_ad_ids),
+            weak=True,
+        )
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            serializer = self.get_serializer(objects, many=True)
+            if page is not None:
+                response = self.get_paginated_response(serializer.data)
+            else:
+                response = Response(serializer.data)
+        return set_validators(response, etag, last_modified)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "liked_ad_ids", None) is not None:
+            context["liked_ad_ids"] = self.liked_ad_ids
+        return context
@@ -0,0 +1,63 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import DEFAULT_DB_ALIAS
+
+VERSION_KEY = "store:count-version"
+COUNT_KEY = "store:count:{version}:{digest}"
+
+
+def count_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def expire_counts():
+    """E'lon, kategoriya yoki sevimlilar o'zgarsa barcha keshlangan sonlar eskiradi."""
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def count_digest(queryset):
+    """Normallashtirilgan so'rov (tartiblash va select_related olib tashlangan)."""
+    try:
+        sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    except EmptyResultSet:
+        # Masalan `__in=[]`: so'rov bajarilmaydi, son 0
+        sql, params = "", ()
+    return hashlib.sha1(f"{sql}\n{params!r}".encode()).hexdigest()
+
+
+def cached_count(queryset):
+    """`COUNT(*)` natijasini normallashtirilgan so'rov bo'yicha qisqa muddat keshlaydi."""
+    key = COUNT_KEY.format(version=count_version(), digest=count_digest(queryset))
+    count = cache.get(key)
+    if count is None:
+        # Keshlanadigan son nusxadan emas, asosiy bazadan
+        count = queryset.using(DEFAULT_DB_ALIAS).count()
+        cache.set(key, count, getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 30))
+    return count
+
+
+async def acached_count(queryset, digest):
+    """
+    `cached_count` ning async varianti. SQL kompilyatsiyasi bazaga ulanishi
+    mumkin, shuning uchun `digest` (count_digest) sync qismda hisoblanadi.
+    """
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        await cache.aset(VERSION_KEY, version, None)
+    key = COUNT_KEY.format(version=version, digest=digest)
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.using(DEFAULT_DB_ALIAS).acount()
+        await cache.aset(
+            key, count, getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 30)
+        )
+    return count
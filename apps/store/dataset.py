@@ -0,0 +1,617 @@
+"""
+Yuklama va masshtab sinovlari uchun sun'iy bozor ma'lumotlari.
+
+Barcha tasodifiy qiymatlar `seed` dan olinadi: har bir bo'lak o'z
+`Random(f"{seed}:{jadval}:{bo'lak}")` generatoriga ega, shuning uchun natija
+workerlar soniga bog'liq emas. Mashhurlik Zipf taqsimotiga bo'ysunadi:
+bir nechta kategoriya, sotuvchi va e'lon trafikning katta qismini oladi.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+from random import Random
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+from django.utils.text import slugify
+
+# Haqiqiy operatorlarda yo'q prefiks: yaratilgan foydalanuvchilarni ajratadi
+PHONE_PREFIX = "+99800"
+
+REGIONS = [
+    ("Toshkent shahri", "Город Ташкент"),
+    ("Toshkent viloyati", "Ташкентская область"),
+    ("Samarqand", "Самарканд"),
+    ("Farg'ona", "Фергана"),
+    ("Andijon", "Андижан"),
+    ("Namangan", "Наманган"),
+    ("Buxoro", "Бухара"),
+    ("Qashqadaryo", "Кашкадарья"),
+    ("Surxondaryo", "Сурхандарья"),
+    ("Xorazm", "Хорезм"),
+    ("Navoiy", "Навои"),
+    ("Jizzax", "Джизак"),
+    ("Sirdaryo", "Сырдарья"),
+    ("Qoraqalpog'iston", "Каракалпакстан"),
+]
+
+TOP_CATEGORIES = [
+    ("Elektronika", "Электроника"),
+    ("Transport", "Транспорт"),
+    ("Ko'chmas mulk", "Недвижимость"),
+    ("Uy va bog'", "Дом и сад"),
+    ("Kiyim-kechak", "Одежда"),
+    ("Bolalar dunyosi", "Детский мир"),
+    ("Sport va hobbi", "Спорт и хобби"),
+    ("Hayvonlar", "Животные"),
+    ("Ish", "Работа"),
+    ("Xizmatlar", "Услуги"),
+    ("Biznes uchun", "Для бизнеса"),
+    ("Go'zallik", "Красота"),
+]
+
+SUBCATEGORY_WORDS = [
+    ("telefonlar", "телефоны"),
+    ("aksessuarlar", "аксессуары"),
+    ("ehtiyot qismlar", "запчасти"),
+    ("mebel", "мебель"),
+    ("texnika", "техника"),
+    ("asboblar", "инструменты"),
+    ("poyabzal", "обувь"),
+    ("o'yinchoqlar", "игрушки"),
+    ("kitoblar", "книги"),
+    ("jihozlar", "оборудование"),
+    ("ijara", "аренда"),
+    ("boshqalar", "другое"),
+]
+
+PRODUCTS = [
+    ("telefon", "телефон"),
+    ("noutbuk", "ноутбук"),
+    ("televizor", "телевизор"),
+    ("muzlatgich", "холодильник"),
+    ("kir yuvish mashinasi", "стиральная машина"),
+    ("divan", "диван"),
+    ("stol", "стол"),
+    ("velosiped", "велосипед"),
+    ("avtomobil", "автомобиль"),
+    ("kvartira", "квартира"),
+    ("kurtka", "куртка"),
+    ("krossovka", "кроссовки"),
+    ("soat", "часы"),
+    ("planshet", "планшет"),
+    ("konditsioner", "кондиционер"),
+    ("kolyaska", "коляска"),
+    ("mushuk", "кошка"),
+    ("it", "собака"),
+    ("kamera", "камера"),
+    ("printer", "принтер"),
+]
+
+BRANDS = [
+    "Samsung",
+    "Apple",
+    "Xiaomi",
+    "Artel",
+    "LG",
+    "Chevrolet",
+    "Huawei",
+    "Lenovo",
+    "HP",
+    "Sony",
+    "Bosch",
+    "Nike",
+    "Adidas",
+    "Canon",
+    "Acer",
+]
+
+CONDITIONS = [
+    ("yangi", "новый"),
+    ("ishlatilgan", "б/у"),
+    ("a'lo holatda", "в отличном состоянии"),
+    ("kafolat bilan", "с гарантией"),
+    ("arzon", "недорого"),
+    ("sotiladi", "продаётся"),
+]
+
+FIRST_NAMES = [
+    "Aziz",
+    "Dilshod",
+    "Jasur",
+    "Sardor",
+    "Bekzod",
+    "Nodira",
+    "Malika",
+    "Gulnora",
+    "Shahzoda",
+    "Otabek",
+    "Umid",
+    "Kamola",
+    "Rustam",
+    "Zarina",
+]
+LAST_NAMES = [
+    "Karimov",
+    "Aliyev",
+    "Rahimov",
+    "Yusupov",
+    "Toshmatov",
+    "Qodirov",
+    "Ismoilov",
+    "Nazarov",
+    "Saidov",
+    "Ergashev",
+]
+
+AD_STATUSES = (
+    (["active"] * 85) + (["inactive"] * 5) + (["pending"] * 7) + (["rejected"] * 3)
+)
+
+
+class Zipf:
+    """Elementni Zipf taqsimoti bo'yicha tanlaydi: k-o'rin ehtimoli ~ 1 / k**s."""
+
+    def __init__(self, items, s, seed):
+        self.items = list(items)
+        # Mashhurlik id tartibiga bog'liq bo'lmasin
+        Random(seed).shuffle(self.items)
+        self.cum_weights = list(
+            accumulate(1 / rank**s for rank in range(1, len(self.items) + 1))
+        )
+
+    def choice(self, rng):
+        return rng.choices(self.items, cum_weights=self.cum_weights)[0]
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    auto_now/auto_now_add ni vaqtincha o'chiradi: bulk_create da berilgan
+    sanalar saqlanadi (aks holda barcha yozuvlar "hozir" bo'lib qoladi).
+    """
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            flags = (
+                getattr(field, "auto_now", False),
+                getattr(field, "auto_now_add", False),
+            )
+            if any(flags):
+                changed.append((field, flags))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class DatasetGenerator:
+    def __init__(
+        self,
+        users=10_000,
+        seller_ratio=0.2,
+        categories=200,
+        category_depth=3,
+        districts_per_region=10,
+        ads=100_000,
+        max_photos=4,
+        favorites=200_000,
+        saved_searches=20_000,
+        days=365,
+        zipf=1.1,
+        seed=42,
+        batch_size=5000,
+        workers=1,
+        password="password",
+        log=None,
+    ):
+        self.counts = {
+            "users": users,
+            "categories": categories,
+            "ads": ads,
+            "favorites": favorites,
+            "saved_searches": saved_searches,
+        }
+        self.seller_ratio = seller_ratio
+        self.category_depth = category_depth
+        self.districts_per_region = districts_per_region
+        self.max_photos = max_photos
+        self.days = days
+        self.zipf = zipf
+        self.seed = seed
+        self.batch_size = batch_size
+        self.workers = workers
+        self.password = password
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def rng(self, name, index=0):
+        return Random(f"{self.seed}:{name}:{index}")
+
+    @staticmethod
+    def make_uuid(rng):
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def in_batches(self, name, total, func):
+        """`func(rng, start, stop)` ni bo'laklar bo'yicha (parallel) bajaradi."""
+        chunks = [
+            (index, start, min(start + self.batch_size, total))
+            for index, start in enumerate(range(0, total, self.batch_size))
+        ]
+
+        def run(chunk):
+            index, start, stop = chunk
+            return func(self.rng(name, index), start, stop)
+
+        def run_in_thread(chunk):
+            try:
+                return run(chunk)
+            finally:
+                connection.close()
+
+        started = perf_counter()
+        if self.workers > 1 and connection.vendor != "sqlite":
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(run_in_thread, chunks))
+        else:
+            # SQLite bitta yozuvchiga ruxsat beradi
+            results = [run(chunk) for chunk in chunks]
+        self.log(f"{name}: {total} ta, {perf_counter() - started:.1f} s")
+        return results
+
+    def generate(self):
+        from common.models import District, Region
+
+        from .models import Ad, AdPhoto, Category, FavoriteProduct, SavedSearch
+
+        User = get_user_model()
+        if User.objects.filter(phone_number__startswith=PHONE_PREFIX).exists():
+            raise ValueError(
+                f"{PHONE_PREFIX} raqamli foydalanuvchilar allaqachon bor: "
+                "ma'lumotlar to'plami yaratilgan"
+            )
+        with explicit_timestamps(
+            User, Region, District, Category, Ad, AdPhoto, FavoriteProduct, SavedSearch
+        ):
+            self.create_regions()
+            self.create_categories()
+            self.create_users()
+            active_ads = self.create_ads()
+            self.create_favorites(active_ads)
+            self.create_saved_searches()
+        self.refresh_derived_data()
+
+    def stamp(self, rng):
+        return self.now - timedelta(days=self.days) * rng.random()
+
+    def create_regions(self):
+        from common.models import District, Region
+
+        rng = self.rng("regions")
+        regions = Region.objects.bulk_create(
+            [
+                Region(
+                    guid=self.make_uuid(rng),
+                    name_uz=name_uz,
+                    name_ru=name_ru,
+                    created_time=self.now,
+                    updated_time=self.now,
+                )
+                for name_uz, name_ru in REGIONS
+            ]
+        )
+        districts = District.objects.bulk_create(
+            [
+                District(
+                    guid=self.make_uuid(rng),
+                    region=region,
+                    name_uz=f"{region.name_uz} {number}-tuman",
+                    name_ru=f"{region.name_ru}, район {number}",
+                    created_time=self.now,
+                    updated_time=self.now,
+                )
+                for region in regions
+                for number in range(1, self.districts_per_region + 1)
+            ]
+        )
+        self.districts_by_region = {}
+        for district in districts:
+            self.districts_by_region.setdefault(district.region_id, []).append(
+                district.pk
+            )
+        # Poytaxt va yirik viloyatlar e'lonlarning ko'p qismini oladi
+        self.region_picker = Zipf(
+            [region.pk for region in regions], 1.0, f"{self.seed}:regions"
+        )
+        self.log(f"regions: {len(regions)} ta, districts: {len(districts)} ta")
+
+    def create_categories(self):
+        """Har bir darajada ota kategoriyalar orasida Zipf bo'yicha taqsimlanadi."""
+        from .models import Category
+
+        rng = self.rng("categories")
+        total = max(self.counts["categories"], len(TOP_CATEGORIES))
+        level = Category.objects.bulk_create(
+            [
+                self.category(rng, name_uz, name_ru, None, order)
+                for order, (name_uz, name_ru) in enumerate(TOP_CATEGORIES)
+            ]
+        )
+        self.set_paths(level, {})
+        created = list(level)
+        paths = {category.pk: category.path for category in level}
+        for depth in range(1, self.category_depth):
+            remaining = total - len(created)
+            if remaining <= 0:
+                break
+            levels_left = self.category_depth - depth
+            size = remaining if levels_left == 1 else remaining // 2
+            parents = Zipf(level, self.zipf, f"{self.seed}:categories:{depth}")
+            children = []
+            for order in range(size):
+                parent = parents.choice(rng)
+                word_uz, word_ru = rng.choice(SUBCATEGORY_WORDS)
+                children.append(
+                    self.category(
+                        rng,
+                        f"{parent.name_uz} {word_uz} {order + 1}",
+                        f"{parent.name_ru} {word_ru} {order + 1}",
+                        parent,
+                        order,
+                    )
+                )
+            level = Category.objects.bulk_create(children)
+            self.set_paths(level, paths)
+            paths.update((category.pk, category.path) for category in level)
+            created.extend(level)
+
+        parent_ids = {category.parent_id for category in created}
+        self.leaf_picker = Zipf(
+            [category.pk for category in created if category.pk not in parent_ids],
+            self.zipf,
+            f"{self.seed}:leaf-categories",
+        )
+        self.category_picker = Zipf(
+            [category.pk for category in created],
+            self.zipf,
+            f"{self.seed}:all-categories",
+        )
+        self.log(f"categories: {len(created)} ta")
+
+    def category(self, rng, name_uz, name_ru, parent, order):
+        from .models import Category
+
+        guid = self.make_uuid(rng)
+        return Category(
+            guid=guid,
+            name_uz=name_uz,
+            name_ru=name_ru,
+            slug=f"{slugify(name_uz)[:40]}-{guid.hex[:8]}",
+            parent=parent,
+            order=order,
+            created_time=self.now,
+            updated_time=self.now,
+        )
+
+    @staticmethod
+    def set_paths(categories, parent_paths):
+        from .models import Category
+
+        for category in categories:
+            category.path = f"{parent_paths.get(category.parent_id, '')}{category.pk}/"
+        Category.objects.bulk_update(categories, ["path"])
+
+    def create_users(self):
+        User = get_user_model()
+        total = self.counts["users"]
+        if total >= 10**7:
+            raise ValueError("Foydalanuvchilar soni 10 000 000 dan kam bo'lishi kerak")
+        password = make_password(self.password)
+
+        def create(rng, start, stop):
+            users = []
+            for index in range(start, stop):
+                is_seller = rng.random() < self.seller_ratio
+                joined = self.stamp(rng)
+                users.append(
+                    User(
+                        guid=self.make_uuid(rng),
+                        phone_number=f"{PHONE_PREFIX}{index:07d}",
+                        full_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                        password=password,
+                        role="seller" if is_seller else "customer",
+                        status="approved" if is_seller else "pending",
+                        project_name=f"Do'kon {index}" if is_seller else None,
+                        category_id=(
+                            self.category_picker.choice(rng) if is_seller else None
+                        ),
+                        created_time=joined,
+                        updated_time=joined,
+                    )
+                )
+            User.objects.bulk_create(users)
+
+        self.in_batches("users", total, create)
+        generated = User.objects.filter(phone_number__startswith=PHONE_PREFIX)
+        self.user_ids = list(generated.order_by("pk").values_list("pk", flat=True))
+        seller_ids = list(
+            generated.filter(role="seller").order_by("pk").values_list("pk", flat=True)
+        )
+        # Sotuvchilar kuch qonuni bo'yicha: ozchiligi e'lonlarning ko'pini joylaydi
+        self.seller_picker = Zipf(
+            seller_ids or self.user_ids, self.zipf, f"{self.seed}:sellers"
+        )
+
+    def create_ads(self):
+        from .models import Ad, AdPhoto
+
+        total = self.counts["ads"]
+        start_time = self.now - timedelta(days=self.days)
+        span = self.now - start_time
+
+        def create(rng, start, stop):
+            ads, photos = [], []
+            for index in range(start, stop):
+                ad = self.ad(rng, index)
+                # id tartibi joylash vaqtiga mos (haqiqiy jadvaldagi kabi)
+                ad.published_at = start_time + span * ((index + rng.random()) / total)
+                ad.created_time = ad.updated_time = ad.published_at
+                images = [
+                    f"ads_photos/generated/{rng.randrange(1000)}.jpg"
+                    for _ in range(rng.randint(0, self.max_photos))
+                ]
+                ad.main_image = images[0] if images else ""
+                ads.append(ad)
+                photos.append(images)
+            Ad.objects.bulk_create(ads)
+            AdPhoto.objects.bulk_create(
+                [
+                    AdPhoto(
+                        guid=self.make_uuid(rng),
+                        ad=ad,
+                        image=image,
+                        is_main=order == 0,
+                        order=order,
+                        created_time=ad.published_at,
+                        updated_time=ad.published_at,
+                    )
+                    for ad, images in zip(ads, photos)
+                    for order, image in enumerate(images)
+                ]
+            )
+            return [ad.pk for ad in ads if ad.status == "active"]
+
+        return [pk for chunk in self.in_batches("ads", total, create) for pk in chunk]
+
+    def ad(self, rng, index):
+        from .models import Ad
+
+        category_id = self.leaf_picker.choice(rng)
+        region_id = self.region_picker.choice(rng)
+        product_uz, product_ru = PRODUCTS[category_id % len(PRODUCTS)]
+        if rng.random() < 0.3:
+            product_uz, product_ru = rng.choice(PRODUCTS)
+        brand = rng.choice(BRANDS)
+        condition_uz, condition_ru = rng.choice(CONDITIONS)
+        ad = Ad(
+            guid=self.make_uuid(rng),
+            name_uz=f"{brand} {product_uz} {condition_uz}",
+            name_ru=f"{brand} {product_ru} {condition_ru}",
+            description_uz=(
+                f"{brand} {product_uz}, {condition_uz}. "
+                f"Narxi kelishiladi. E'lon #{index}."
+            ),
+            description_ru=(
+                f"{brand} {product_ru}, {condition_ru}. "
+                f"Цена договорная. Объявление #{index}."
+            ),
+            category_id=category_id,
+            seller_id=self.seller_picker.choice(rng),
+            region_id=region_id,
+            district_id=rng.choice(self.districts_by_region[region_id]),
+            # Narxlar log-normal: ko'pi arzon, ozchiligi juda qimmat
+            price=int(rng.lognormvariate(14, 1.5)) // 1000 * 1000 + 1000,
+            status=rng.choice(AD_STATUSES),
+            is_top=rng.random() < 0.03,
+            view_count=int(rng.paretovariate(1.2) * 10),
+        )
+        ad.slug = ad.suffixed_slug(16)
+        return ad
+
+    def create_favorites(self, active_ads):
+        from .models import FavoriteProduct
+
+        if not active_ads:
+            return
+        # Issiq e'lonlar va faol foydalanuvchilar sevimlilarning ko'p qismini beradi
+        ads = Zipf(active_ads, self.zipf, f"{self.seed}:hot-ads")
+        users = Zipf(self.user_ids, 0.8, f"{self.seed}:active-users")
+
+        def create(rng, start, stop):
+            favorites = []
+            for _ in range(start, stop):
+                stamp = self.stamp(rng)
+                favorites.append(
+                    FavoriteProduct(
+                        guid=self.make_uuid(rng),
+                        user_id=users.choice(rng),
+                        ad_id=ads.choice(rng),
+                        created_time=stamp,
+                        updated_time=stamp,
+                    )
+                )
+            # Takroriy (user, ad) juftliklari tashlab yuboriladi
+            FavoriteProduct.objects.bulk_create(favorites, ignore_conflicts=True)
+
+        self.in_batches("favorites", self.counts["favorites"], create)
+
+    def create_saved_searches(self):
+        from .models import SavedSearch
+
+        def create(rng, start, stop):
+            searches = []
+            for _ in range(start, stop):
+                price_min = price_max = None
+                if rng.random() < 0.5:
+                    price_min = int(rng.lognormvariate(13, 1.5)) // 1000 * 1000
+                    price_max = price_min * rng.randint(2, 10)
+                stamp = self.stamp(rng)
+                product = rng.choice(PRODUCTS)[rng.randrange(2)]
+                searches.append(
+                    SavedSearch(
+                        guid=self.make_uuid(rng),
+                        user_id=rng.choice(self.user_ids),
+                        category_id=(
+                            self.category_picker.choice(rng)
+                            if rng.random() < 0.7
+                            else None
+                        ),
+                        region_id=(
+                            self.region_picker.choice(rng)
+                            if rng.random() < 0.5
+                            else None
+                        ),
+                        search_query=product if rng.random() < 0.4 else "",
+                        price_min=price_min,
+                        price_max=price_max,
+                        created_time=stamp,
+                        updated_time=stamp,
+                    )
+                )
+            SavedSearch.objects.bulk_create(searches)
+
+        self.in_batches("saved_searches", self.counts["saved_searches"], create)
+
+    def refresh_derived_data(self):
+        """bulk_create signallarsiz ishlaydi: hisoblagich va indekslar qayta quriladi."""
+        from common.models import Region
+        from common.utils.response_cache import expire_response_cache
+
+        from . import category_counts
+        from .category_tree import invalidate_category_tree
+        from .count_cache import expire_counts
+        from .models import Category, SearchCount
+        from .search import get_search_backend
+
+        SearchCount.objects.bulk_create(
+            [
+                SearchCount(category_id=pk)
+                for pk in Category.objects.values_list("pk", flat=True)
+            ],
+            ignore_conflicts=True,
+        )
+        category_counts.recount()
+        indexed = get_search_backend().rebuild()
+        invalidate_category_tree()
+        expire_counts()
+        expire_response_cache(Category)
+        expire_response_cache(Region)
+        self.log(f"search index: {indexed} ta e'lon")
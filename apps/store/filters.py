@@ -1,18 +1,80 @@
 import django_filters
 from django import forms
+from django.db.models import CharField, Exists, ExpressionWrapper, F, OuterRef, Q
+from rest_framework import filters
+from .category_tree import get_category_tree
 from .models import Ad, Category
+from .search import search_ads
+from .trending import query_log
+
+
+def filter_category_subtrees(queryset, category_ids):
+    """
+    Kategoriyalar va ularning faol avlodlari (`category` va `category_ids`
+    uchun bitta qoida). Avlodlar indekslangan `category__path` oralig'i bilan
+    tanlanadi; nofaol kategoriya va uning butun shoxi chiqmaydi, xuddi
+    kategoriya daraxti javoblaridagidek.
+    """
+    tree = get_category_tree()
+    categories = filter(None, map(tree.get, category_ids))
+    ranges = [category.subtree_path_range for category in categories if category.path]
+    if not ranges:
+        return queryset.none()
+
+    in_subtree = Q()
+    inactive = Q()
+    for path_from, path_to in ranges:
+        in_subtree |= Q(category__path__gte=path_from, category__path__lt=path_to)
+        inactive |= Q(path__gte=path_from, path__lt=path_to)
+    # E'lon kategoriyasining o'zi yoki biror ajdodi nofaol
+    hidden_by = (
+        Category.objects.filter(inactive, is_active=False)
+        .annotate(
+            ad_path=ExpressionWrapper(
+                OuterRef("category__path"), output_field=CharField()
+            )
+        )
+        .filter(ad_path__startswith=F("path"))
+    )
+    return queryset.filter(in_subtree).exclude(Exists(hidden_by))
+
+
+class AdSearchFilter(filters.SearchFilter):
+    """`?search=` ni qidiruv backendi orqali bajaradi (natija reyting bo'yicha)."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        query_log.record_request(request, query)
+        return search_ads(queryset, query)
+
+
+class AdOrderingFilter(filters.OrderingFilter):
+    """Qidiruv paytida `ordering` berilmasa, reyting tartibini saqlaydi."""
+
+    def get_default_ordering(self, view):
+        if self.get_search_query(view):
+            return None
+        return super().get_default_ordering(view)
+
+    def get_search_query(self, view):
+        return (
+            view.request.query_params.get(AdSearchFilter.search_param, "").strip()
+            or view.request.query_params.get("name", "").strip()
+        )
 
 
 class AdFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(
-        field_name="name",
-        lookup_expr="icontains",
+        method="filter_search",
         widget=forms.TextInput(attrs={"placeholder": "Mahsulot nomini kiriting"}),
     )
 
     category = django_filters.ModelChoiceFilter(
         queryset=Category.objects.filter(is_active=True),
         empty_label="Barcha kategoriyalar",
+        method="filter_category_subtree",
     )
 
     min_price = django_filters.NumberFilter(
@@ -39,13 +101,7 @@ class AdFilter(django_filters.FilterSet):
         widget=forms.TextInput(attrs={"placeholder": "Tuman nomi"}),
     )
 
-    is_new = django_filters.BooleanFilter(
-        field_name="is_new", widget=forms.CheckboxInput()
-    )
-
-    is_top = django_filters.BooleanFilter(
-        field_name="is_top", widget=forms.CheckboxInput()
-    )
+    is_top = django_filters.BooleanFilter(field_name="is_top")
 
     published_after = django_filters.DateFilter(
         field_name="published_at",
@@ -59,6 +115,14 @@ class AdFilter(django_filters.FilterSet):
         widget=forms.DateInput(attrs={"type": "date"}),
     )
 
+    def filter_search(self, queryset, name, value):
+        if self.request is not None:
+            query_log.record_request(self.request, value)
+        return search_ads(queryset, value)
+
+    def filter_category_subtree(self, queryset, name, value):
+        return filter_category_subtrees(queryset, [value.pk])
+
     class Meta:
         model = Ad
         fields = [
@@ -68,7 +132,7 @@ class AdFilter(django_filters.FilterSet):
             "max_price",
             "region",
             "district",
-            "is_new",
+            "is_top",
             "published_after",
             "published_before",
         ]
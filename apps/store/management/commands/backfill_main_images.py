@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from store.models import Ad
+from store.photos import refresh_main_images
+
+
+class Command(BaseCommand):
+    help = "E'lonlardagi main_image nusxasini rasmlar jadvalidan qayta to'ldiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Bitta UPDATE dagi e'lonlar soni",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = list(Ad.objects.order_by("pk").values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start : start + batch_size]
+            updated += refresh_main_images(
+                Ad.objects.filter(pk__gte=batch[0], pk__lte=batch[-1])
+            )
+        self.stdout.write(self.style.SUCCESS(f"{updated} ta e'lon yangilandi."))
@@ -0,0 +1,97 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.benchmark import BenchmarkRunner, compare, default_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Asosiy endpointlarni generate_dataset ma'lumotlarida o'lchaydi: "
+        "p50/p95/p99, throughput, SQL so'rovlar va xotira. Natija JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument(
+            "--memory-samples",
+            type=int,
+            default=10,
+            help="Xotira cho'qqisi uchun alohida so'rovlar (0 - o'lchamaslik)",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--password", default="password")
+        parser.add_argument(
+            "--only", default="", help="Vergul bilan ajratilgan ssenariy nomlari"
+        )
+        parser.add_argument(
+            "--conn-max-age",
+            default="",
+            help="Vergul bilan CONN_MAX_AGE qiymatlari, masalan 0,60 (har biri "
+            "bilan alohida o'lchanadi)",
+        )
+        parser.add_argument("--output", help="JSON natija yoziladigan fayl")
+        parser.add_argument("--baseline", help="Solishtirish uchun oldingi JSON")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="p95 shu ulushdan ko'p oshsa regressiya",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scenarios = default_scenarios(options["seed"], options["password"])
+        except ValueError as exc:
+            raise CommandError(exc)
+        only = {name for name in options["only"].split(",") if name}
+        if only:
+            scenarios = [scenario for scenario in scenarios if scenario.name in only]
+
+        runner = BenchmarkRunner(
+            requests=options["requests"],
+            warmup=options["warmup"],
+            memory_samples=options["memory_samples"],
+            seed=options["seed"],
+        )
+        try:
+            conn_max_ages = [
+                int(value) for value in options["conn_max_age"].split(",") if value
+            ] or [None]
+        except ValueError:
+            raise CommandError("--conn-max-age butun sonlar ro'yxati bo'lishi kerak")
+        report = runner.run(
+            scenarios,
+            log=lambda name: self.stderr.write(f"{name}..."),
+            conn_max_ages=conn_max_ages,
+        )
+        self.print_table(report)
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+            regressions = compare(report, baseline, options["threshold"])
+            if regressions:
+                raise CommandError("Regressiyalar:\n" + "\n".join(regressions))
+            self.stderr.write(self.style.SUCCESS("Regressiya yo'q."))
+
+    def print_table(self, report):
+        self.stderr.write(
+            f"{'endpoint':<40} {'p50':>7} {'p95':>7} {'p99':>7} {'rps':>7} "
+            f"{'sql':>5} {'KiB':>8} {'err':>4}"
+        )
+        for name, row in report["endpoints"].items():
+            memory = row["peak_memory_kb"]
+            self.stderr.write(
+                f"{name:<40} {row['p50_ms']:>7.1f} {row['p95_ms']:>7.1f} "
+                f"{row['p99_ms']:>7.1f} {row['throughput_rps']:>7.1f} "
+                f"{row['queries_avg']:>5.1f} "
+                f"{'-' if memory is None else memory:>8} {row['errors']:>4}"
+            )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.search_counter import popular_search_counter, search_counter
+
+
+class Command(BaseCommand):
+    help = (
+        "Yig'ilgan qidiruv hisoblagichlarini bazaga yozadi (shutdown paytida "
+        "ishlatiladi). Faqat umumiy store (SQLiteFileStore) bilan ishlaydi."
+    )
+
+    def handle(self, *args, **options):
+        # Trend sketchi (query_log) har doim jarayon ichida, u workerning
+        # o'zida chiqishda yoziladi
+        counters = (search_counter, popular_search_counter)
+        local = [counter for counter in counters if not counter.is_shared]
+        if local:
+            raise CommandError(
+                f"SEARCH_COUNT_BUFFER store ({type(local[0].store).__name__}) "
+                "jarayon ichida: bu buyruq boshqa workerlardagi qidiruvlarni "
+                "ko'rmaydi. SQLiteFileStore kabi umumiy store sozlang."
+            )
+        flushed = sum(counter.flush() for counter in counters)
+        self.stdout.write(self.style.SUCCESS(f"{flushed} ta qidiruv yozildi."))
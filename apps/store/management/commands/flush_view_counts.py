@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.view_counter import view_counter
+
+
+class Command(BaseCommand):
+    help = (
+        "Yig'ilgan e'lon ko'rishlarini bazaga yozadi (shutdown paytida ishlatiladi). "
+        "Faqat umumiy store (SQLiteFileStore) bilan ishlaydi: LocalMemoryStore "
+        "qiymatlari har bir workerning o'zida, ular chiqishda o'zi yozadi."
+    )
+
+    def handle(self, *args, **options):
+        if not view_counter.is_shared:
+            raise CommandError(
+                f"VIEW_COUNT_BUFFER store ({type(view_counter.store).__name__}) "
+                "jarayon ichida: bu buyruq boshqa workerlardagi ko'rishlarni "
+                "ko'rmaydi. SQLiteFileStore kabi umumiy store sozlang."
+            )
+        flushed = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f"{flushed} ta ko'rish yozildi."))
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from store.dataset import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Yuklama sinovlari uchun sun'iy foydalanuvchi, kategoriya, e'lon, rasm, "
+        "sevimli va saqlangan qidiruvlarni yaratadi (uz va ru tarjimalari bilan)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument(
+            "--seller-ratio", type=float, default=0.2, help="Sotuvchilar ulushi"
+        )
+        parser.add_argument("--categories", type=int, default=200)
+        parser.add_argument(
+            "--category-depth", type=int, default=3, help="Daraxt chuqurligi"
+        )
+        parser.add_argument("--districts-per-region", type=int, default=10)
+        parser.add_argument("--ads", type=int, default=100_000)
+        parser.add_argument(
+            "--max-photos", type=int, default=4, help="E'londagi rasmlar (0..N)"
+        )
+        parser.add_argument("--favorites", type=int, default=200_000)
+        parser.add_argument("--saved-searches", type=int, default=20_000)
+        parser.add_argument(
+            "--days", type=int, default=365, help="E'lonlar shuncha kunga yoyiladi"
+        )
+        parser.add_argument(
+            "--zipf", type=float, default=1.1, help="Mashhurlik taqsimoti darajasi"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Parallel yozuvchilar (SQLite da doim 1)",
+        )
+        parser.add_argument("--password", default="password")
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(
+            users=options["users"],
+            seller_ratio=options["seller_ratio"],
+            categories=options["categories"],
+            category_depth=options["category_depth"],
+            districts_per_region=options["districts_per_region"],
+            ads=options["ads"],
+            max_photos=options["max_photos"],
+            favorites=options["favorites"],
+            saved_searches=options["saved_searches"],
+            days=options["days"],
+            zipf=options["zipf"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            password=options["password"],
+            log=self.stdout.write,
+        )
+        try:
+            if options["workers"] > 1:
+                generator.generate()
+            else:
+                # Bitta tranzaksiya SQLite da ancha tez
+                with transaction.atomic():
+                    generator.generate()
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS("Ma'lumotlar to'plami yaratildi."))
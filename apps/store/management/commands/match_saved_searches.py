@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store.models import Ad
+from store.saved_searches import match_backlog
+
+
+class Command(BaseCommand):
+    help = "Faol e'lonlarni saqlangan qidiruvlar bilan qayta solishtiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Faqat oxirgi N kunda joylangan e'lonlar",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Bitta indeks quriladigan e'lonlar soni",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Ad.objects.all()
+        if options["days"] is not None:
+            queryset = queryset.filter(
+                published_at__gte=timezone.now() - timedelta(days=options["days"])
+            )
+        matched = match_backlog(queryset, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{matched} ta moslik topildi."))
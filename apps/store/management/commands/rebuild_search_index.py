@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "E'lonlar qidiruv indeksini qaytadan quradi."
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{indexed} ta e'lon indekslandi."))
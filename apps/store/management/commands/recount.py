@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store import category_counts
+
+
+class Command(BaseCommand):
+    help = "Kategoriyalardagi faol e'lonlar sonini qaytadan hisoblaydi."
+
+    def handle(self, *args, **options):
+        changed = category_counts.recount()
+        self.stdout.write(self.style.SUCCESS(f"{changed} ta kategoriya yangilandi."))
@@ -0,0 +1,7 @@
+from django.db import models
+
+
+class AdQuerySet(models.QuerySet):
+    def for_list(self):
+        # Asosiy rasm Ad.main_image da, store_adphoto ga so'rov kerak emas
+        return self.select_related("seller", "category", "region", "district")
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("store", "0002_alter_category_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ad",
+            name="address",
+            field=models.CharField(blank=True, max_length=500, verbose_name="Address"),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="district",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="common.district",
+                verbose_name="District",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="is_top",
+            field=models.BooleanField(default=False, verbose_name="Top ad"),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="region",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="common.region",
+                verbose_name="Region",
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="order",
+            field=models.PositiveIntegerField(default=0, verbose_name="Order"),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["is_top", "published_at"], name="store_ad_is_top_2c0a3b_idx"
+            ),
+        ),
+    ]
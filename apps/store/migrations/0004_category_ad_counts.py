@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:00
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_ad_counts(apps, schema_editor):
+    Ad = apps.get_model("store", "Ad")
+    Category = apps.get_model("store", "Category")
+
+    direct = dict(
+        Ad.objects.filter(status="active")
+        .values("category_id")
+        .annotate(total=Count("id"))
+        .values_list("category_id", "total")
+    )
+    categories = list(Category.objects.all())
+    parents = {category.id: category.parent_id for category in categories}
+    subtree = defaultdict(int)
+    for category_id, total in direct.items():
+        seen = set()
+        while category_id is not None and category_id not in seen:
+            seen.add(category_id)
+            subtree[category_id] += total
+            category_id = parents.get(category_id)
+
+    for category in categories:
+        category.active_ad_count = direct.get(category.id, 0)
+        category.subtree_ad_count = subtree[category.id]
+    Category.objects.bulk_update(
+        categories, ["active_ad_count", "subtree_ad_count"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0003_restore_ad_location_and_category_order"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="active_ad_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Active ads"
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="subtree_ad_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Active ads with subcategories"
+            ),
+        ),
+        migrations.RunPython(fill_ad_counts, migrations.RunPython.noop),
+    ]
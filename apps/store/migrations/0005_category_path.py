@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:03
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    Category = apps.get_model("store", "Category")
+
+    categories = list(Category.objects.only("id", "parent_id"))
+    children = defaultdict(list)
+    for category in categories:
+        children[category.parent_id].append(category)
+
+    stack = [(category, "") for category in children[None]]
+    while stack:
+        category, parent_path = stack.pop()
+        category.path = f"{parent_path}{category.id}/"
+        stack.extend((child, category.path) for child in children[category.id])
+    Category.objects.bulk_update(categories, ["path"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0004_category_ad_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+SQLITE_TABLE = "store_ad_fts"
+POSTGRES_INDEX = "store_ad_search_gin"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            "name_uz, name_ru, description_uz, description_ru, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_TABLE} "
+            "(rowid, name_uz, name_ru, description_uz, description_ru) "
+            "SELECT id, COALESCE(name_uz, ''), COALESCE(name_ru, ''), "
+            "COALESCE(description_uz, ''), COALESCE(description_ru, '') "
+            "FROM store_ad"
+        )
+    elif vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+        from store.search.postgres import ad_search_vector
+
+        Ad = apps.get_model("store", "Ad")
+        schema_editor.add_index(Ad, GinIndex(ad_search_vector(), name=POSTGRES_INDEX))
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0005_category_path"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
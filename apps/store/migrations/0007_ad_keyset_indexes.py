@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("store", "0006_ad_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["status", "-is_top", "-published_at", "-id"],
+                name="store_ad_status_ce6015_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["status", "price", "id"], name="store_ad_status_0e9af3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["status", "view_count", "id"], name="store_ad_status_a340cc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["seller", "-published_at", "-id"],
+                name="store_ad_seller__c2c527_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_main_images(apps, schema_editor):
+    Ad = apps.get_model("store", "Ad")
+    AdPhoto = apps.get_model("store", "AdPhoto")
+
+    Ad.objects.update(
+        main_image=Coalesce(
+            Subquery(
+                AdPhoto.objects.filter(ad=OuterRef("pk"), is_main=True)
+                .order_by("order")
+                .values("image")[:1]
+            ),
+            Value(""),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0007_ad_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ad",
+            name="main_image",
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                upload_to="ads_photos/",
+                verbose_name="Main image",
+            ),
+        ),
+        migrations.RunPython(fill_main_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:31
+
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_trend_scores(apps, schema_editor):
+    # Mavjud sonlar hozirgi og'irlik bilan boshlang'ich skor bo'ladi
+    half_life = getattr(settings, "SEARCH_TREND_HALF_LIFE_DAYS", 7) * 24 * 3600
+    epoch = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    weight = 2 ** ((datetime.now(timezone.utc) - epoch).total_seconds() / half_life)
+    for model_name in ("SearchCount", "PopularSearch"):
+        model = apps.get_model("store", model_name)
+        model.objects.update(trend_score=F("search_count") * weight)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0008_ad_main_image"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="popularsearch",
+            options={
+                "ordering": ["-trend_score", "-search_count"],
+                "verbose_name": "Popular search",
+                "verbose_name_plural": "Popular searches",
+            },
+        ),
+        migrations.AddField(
+            model_name="popularsearch",
+            name="trend_score",
+            field=models.FloatField(
+                db_index=True, default=0, editable=False, verbose_name="Trend score"
+            ),
+        ),
+        migrations.AddField(
+            model_name="searchcount",
+            name="trend_score",
+            field=models.FloatField(
+                db_index=True, default=0, editable=False, verbose_name="Trend score"
+            ),
+        ),
+        migrations.RunPython(seed_trend_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0009_search_trend_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="popularsearch",
+            name="is_auto",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Added from search traffic"
+            ),
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_task"),
+        ("store", "0010_popularsearch_is_auto"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedSearchMatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "guid",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                (
+                    "created_time",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Yaratilgan vaqti"
+                    ),
+                ),
+                (
+                    "updated_time",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Yangilangan vaqti"
+                    ),
+                ),
+                ("is_seen", models.BooleanField(default=False, verbose_name="Seen")),
+            ],
+            options={
+                "verbose_name": "Saved search match",
+                "verbose_name_plural": "Saved search matches",
+                "ordering": ["-created_time"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="savedsearch",
+            index=models.Index(
+                fields=["category", "region", "price_min", "price_max"],
+                name="store_saved_categor_e0289b_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="savedsearchmatch",
+            name="ad",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="saved_search_matches",
+                to="store.ad",
+                verbose_name="Ad",
+            ),
+        ),
+        migrations.AddField(
+            model_name="savedsearchmatch",
+            name="saved_search",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="matches",
+                to="store.savedsearch",
+                verbose_name="Saved search",
+            ),
+        ),
+        migrations.AddField(
+            model_name="savedsearchmatch",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="saved_search_matches",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="User",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="savedsearchmatch",
+            index=models.Index(
+                fields=["user", "-created_time"], name="store_saved_user_id_812034_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="savedsearchmatch",
+            unique_together={("saved_search", "ad")},
+        ),
+    ]
@@ -0,0 +1,33 @@
+import math
+
+from django.db import migrations
+
+
+def scores_to_log2(apps, schema_editor):
+    # Skor endi yig'indining log2 qiymati sifatida saqlanadi
+    for model_name in ("SearchCount", "PopularSearch"):
+        model = apps.get_model("store", model_name)
+        rows = list(model.objects.filter(trend_score__gt=0).only("trend_score"))
+        for row in rows:
+            row.trend_score = max(math.log2(row.trend_score), 0.0)
+        model.objects.bulk_update(rows, ["trend_score"], batch_size=500)
+
+
+def scores_from_log2(apps, schema_editor):
+    for model_name in ("SearchCount", "PopularSearch"):
+        model = apps.get_model("store", model_name)
+        rows = list(model.objects.filter(trend_score__gt=0).only("trend_score"))
+        for row in rows:
+            row.trend_score = 2 ** min(row.trend_score, 1000.0)
+        model.objects.bulk_update(rows, ["trend_score"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0011_saved_search_match"),
+    ]
+
+    operations = [
+        migrations.RunPython(scores_to_log2, scores_from_log2),
+    ]
@@ -1,11 +1,36 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.urls import reverse
 from common.base_models import BaseModel
+from .managers import AdQuerySet
+from .search_counter import popular_search_counter, search_counter
+from .view_counter import view_counter
 
 
-class Category(BaseModel):
+class ManagedFieldsMixin:
+    """
+    MANAGED_FIELDS faqat queryset.update() orqali yangilanadi: to'liq save()
+    xotiradagi eski qiymat bilan bazadagisini bosib ketmasligi uchun ular
+    update_fields dan chiqariladi.
+    """
+
+    MANAGED_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MANAGED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Category(ManagedFieldsMixin, BaseModel):
     name = models.CharField(max_length=200, verbose_name="Name")
     slug = models.SlugField(unique=True, blank=True)
     icon = models.ImageField(upload_to="category_icons/", blank=True, null=True)
@@ -18,6 +43,19 @@ class Category(BaseModel):
         verbose_name="Parent category",
     )
     is_active = models.BooleanField(default=True, verbose_name="Active")
+    order = models.PositiveIntegerField(default=0, verbose_name="Order")
+    active_ad_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Active ads"
+    )
+    subtree_ad_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Active ads with subcategories"
+    )
+    # Materialized path: "1/5/12/" — ajdodlar id'lari, oxirida o'zi
+    path = models.CharField(
+        max_length=255, blank=True, default="", editable=False, db_index=True
+    )
+
+    MANAGED_FIELDS = ("active_ad_count", "subtree_ad_count", "path")
 
     class Meta:
         verbose_name = "Category"
@@ -27,24 +65,63 @@ class Category(BaseModel):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_parent_id = instance.__dict__.get("parent_id")
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        self.update_path()
+
+    def update_path(self):
+        paths = dict(
+            Category.objects.filter(pk__in=[self.pk, self.parent_id]).values_list(
+                "id", "path"
+            )
+        )
+        parent_path = paths.get(self.parent_id, "") if self.parent_id else ""
+        old_path = paths.get(self.pk, "")
+        new_path = f"{parent_path}{self.pk}/"
+        if old_path == new_path:
+            self.path = new_path
+            return
+
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1))
+            )
+        else:
+            Category.objects.filter(pk=self.pk).update(path=new_path)
+        self.path = new_path
+
+    @property
+    def subtree_path_range(self):
+        # "1/5/" bilan boshlanadigan yo'llar: "1/5/" <= path < "1/50"
+        return self.path, self.path[:-1] + chr(ord("/") + 1)
 
     @property
     def product_count(self):
-        return self.ads.filter(status="active").count()
+        if getattr(settings, "CATEGORY_PRODUCT_COUNT_ROLLUP", False):
+            return self.subtree_ad_count
+        return self.active_ad_count
 
     def get_all_children(self):
-        children = []
-        for child in self.children.all():
-            children.append(child)
-            children.extend(child.get_all_children())
-        return children
+        from .category_tree import get_category_tree
+
+        tree = get_category_tree()
+        return [
+            tree.get(category_id)
+            for category_id in tree.descendant_ids(
+                self.id, include_self=False, active_only=False
+            )
+        ]
 
 
-class Ad(BaseModel):
+class Ad(ManagedFieldsMixin, BaseModel):
     STATUS_CHOICES = [
         ("active", "Active"),
         ("inactive", "Inactive"),
@@ -68,13 +145,38 @@ class Ad(BaseModel):
         related_name="ads",
         verbose_name="Seller",
     )
+    region = models.ForeignKey(
+        "common.Region",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Region",
+    )
+    district = models.ForeignKey(
+        "common.District",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="District",
+    )
+    address = models.CharField(max_length=500, blank=True, verbose_name="Address")
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="pending", verbose_name="Status"
     )
+    is_top = models.BooleanField(default=False, verbose_name="Top ad")
     view_count = models.PositiveIntegerField(default=0, verbose_name="View count")
+    # Asosiy rasm yo'li nusxasi: ro'yxatlar store_adphoto ga murojaat qilmaydi
+    main_image = models.ImageField(
+        upload_to="ads_photos/", blank=True, editable=False, verbose_name="Main image"
+    )
 
     published_at = models.DateTimeField(auto_now_add=True, verbose_name="Published at")
 
+    objects = AdQuerySet.as_manager()
+
+    MANAGED_FIELDS = ("main_image",)
+    SLUG_SUFFIX_LENGTHS = (8, 16)
+
     class Meta:
         ordering = ["-published_at"]
         indexes = [
@@ -82,37 +184,69 @@ class Ad(BaseModel):
             models.Index(fields=["category", "status"]),
             models.Index(fields=["seller", "status"]),
             models.Index(fields=["price"]),
+            models.Index(fields=["is_top", "published_at"]),
             models.Index(fields=[ "published_at"]),
+            # Keyset pagination: ORDER BY ustunlari + `id` bir indeksda
+            models.Index(fields=["status", "-is_top", "-published_at", "-id"]),
+            models.Index(fields=["status", "price", "id"]),
+            models.Index(fields=["status", "view_count", "id"]),
+            models.Index(fields=["seller", "-published_at", "-id"]),
         ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance.count_state
+        return instance
+
+    @property
+    def count_state(self):
+        return self.__dict__.get("status"), self.__dict__.get("category_id")
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = self.generate_unique_slug()
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+
+        # Parallel yaratishda ikkala so'rov bir xil slug tanlashi mumkin:
+        # unique buzilsa guid dan uzunroq qo'shimcha bilan qayta uriniladi
+        self.slug = self.generate_unique_slug()
+        for suffix_length in self.SLUG_SUFFIX_LENGTHS:
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if not Ad.objects.filter(slug=self.slug).exists():
+                    raise
+                self.slug = self.suffixed_slug(suffix_length)
         super().save(*args, **kwargs)
 
-    def generate_unique_slug(self):
-        base_slug = slugify(self.name)
-        slug = base_slug
-        counter = 1
+    def base_slug(self):
+        max_length = self._meta.get_field("slug").max_length
+        return slugify(self.name)[:max_length].strip("-") or "ad"
 
-        while Ad.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
+    def suffixed_slug(self, length):
+        max_length = self._meta.get_field("slug").max_length
+        base_slug = self.base_slug()[: max_length - length - 1].strip("-")
+        return f"{base_slug}-{self.guid.hex[:length]}"
 
+    def generate_unique_slug(self):
+        """Ko'pi bilan bitta tekshiruv: nom band bo'lsa guid qo'shimchasi olinadi."""
+        slug = self.base_slug()
+        if Ad.objects.filter(slug=slug).exists():
+            slug = self.suffixed_slug(self.SLUG_SUFFIX_LENGTHS[0])
         return slug
 
-
     @property
     def main_photo(self):
-        main_photo = self.photos.filter(is_main=True).first()
-        return main_photo.image if main_photo else None
+        return self.main_image or None
 
     def increment_view_count(self):
-        self.view_count += 1
-        self.save(update_fields=["view_count"])
+        view_counter.record(self.pk)
 
 
 class AdPhoto(BaseModel):
@@ -206,12 +340,51 @@ class SavedSearch(BaseModel):
         verbose_name = "Saved search"
         verbose_name_plural = "Saved searches"
         ordering = ["-created_time"]
+        indexes = [
+            # Yangi e'lon uchun nomzodlar (kategoriya, viloyat) kaliti bo'yicha olinadi
+            models.Index(fields=["category", "region", "price_min", "price_max"]),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.search_query or 'Search'}"
 
 
-class SearchCount(BaseModel):
+class SavedSearchMatch(BaseModel):
+    saved_search = models.ForeignKey(
+        SavedSearch,
+        on_delete=models.CASCADE,
+        related_name="matches",
+        verbose_name="Saved search",
+    )
+    ad = models.ForeignKey(
+        Ad,
+        on_delete=models.CASCADE,
+        related_name="saved_search_matches",
+        verbose_name="Ad",
+    )
+    # Tanlovlarda user bo'yicha JOIN qilmaslik uchun nusxa
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="saved_search_matches",
+        verbose_name="User",
+    )
+    is_seen = models.BooleanField(default=False, verbose_name="Seen")
+
+    class Meta:
+        verbose_name = "Saved search match"
+        verbose_name_plural = "Saved search matches"
+        ordering = ["-created_time"]
+        unique_together = [("saved_search", "ad")]
+        indexes = [
+            models.Index(fields=["user", "-created_time"]),
+        ]
+
+    def __str__(self):
+        return f"{self.saved_search} - {self.ad.name}"
+
+
+class SearchCount(ManagedFieldsMixin, BaseModel):
     category = models.OneToOneField(
         Category,
         on_delete=models.CASCADE,
@@ -219,6 +392,12 @@ class SearchCount(BaseModel):
         verbose_name="Category",
     )
     search_count = models.PositiveIntegerField(default=0, verbose_name="Search count")
+    # So'nuvchi trend skori, log2 da (store.search_counter ga qarang)
+    trend_score = models.FloatField(
+        default=0, editable=False, db_index=True, verbose_name="Trend score"
+    )
+
+    MANAGED_FIELDS = ("search_count", "trend_score")
 
     class Meta:
         verbose_name = "Search statistic"
@@ -229,26 +408,32 @@ class SearchCount(BaseModel):
         return f"{self.category.name} - {self.search_count}"
 
     def increment(self):
-        self.search_count += 1
-        self.save(update_fields=["search_count"])
+        search_counter.record(self.category_id)
 
 
-class PopularSearch(BaseModel):
+class PopularSearch(ManagedFieldsMixin, BaseModel):
     name = models.CharField(max_length=200, unique=True, verbose_name="Name")
     icon = models.ImageField(
         upload_to="search_icons/", blank=True, null=True, verbose_name="Icon"
     )
     search_count = models.PositiveIntegerField(default=0, verbose_name="Search count")
+    trend_score = models.FloatField(
+        default=0, editable=False, db_index=True, verbose_name="Trend score"
+    )
     is_active = models.BooleanField(default=True, verbose_name="Active")
+    is_auto = models.BooleanField(
+        default=False, editable=False, verbose_name="Added from search traffic"
+    )
+
+    MANAGED_FIELDS = ("search_count", "trend_score")
 
     class Meta:
         verbose_name = "Popular search"
         verbose_name_plural = "Popular searches"
-        ordering = ["-search_count"]
+        ordering = ["-trend_score", "-search_count"]
 
     def __str__(self):
         return self.name
 
     def increment(self):
-        self.search_count += 1
-        self.save(update_fields=["search_count"])
+        popular_search_counter.record(self.pk)
@@ -1,4 +1,17 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .count_cache import cached_count
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -16,4 +29,183 @@ class SmallResultsSetPagination(PageNumberPagination):
 class LargeResultsSetPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = "page_size"
-    max_page_size = 200
\ No newline at end of file
+    max_page_size = 200
+
+
+class CachedCountPaginator(DjangoPaginator):
+    def __init__(self, *args, count_func, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_func = count_func
+
+    @cached_property
+    def count(self):
+        return self.count_func(self.object_list)
+
+
+class CachedCountPagination(StandardResultsSetPagination):
+    """
+    `PageNumberPagination` bilan bir xil javob, lekin umumiy son har so'rovda
+    `COUNT(*)` qilinmaydi. View `get_fast_count()` qaytarsa (masalan,
+    filtrsiz lenta uchun hisoblagichlar yig'indisi) o'sha ishlatiladi,
+    aks holda son filtrlar bo'yicha keshdan olinadi.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    @property
+    def django_paginator_class(self):
+        return partial(CachedCountPaginator, count_func=self.get_count)
+
+    def get_count(self, queryset):
+        get_fast_count = getattr(self.view, "get_fast_count", None)
+        if get_fast_count is not None:
+            count = get_fast_count()
+            if count is not None:
+                return count
+        return cached_count(queryset)
+
+
+class AdFeedPagination(CachedCountPagination):
+    """
+    Odatda sahifa raqami bo'yicha ishlaydi. `?cursor=` berilsa (bo'sh bo'lsa
+    ham) keyset rejimiga o'tadi: `COUNT(*)` va `OFFSET` ishlatilmaydi, har bir
+    sahifa tartiblash indeksi bo'yicha `WHERE (...) < (...)` bilan olinadi.
+    Umumiy son faqat `?with_count=1` bo'lganda qaytariladi.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    keyset_fields = ("is_top", "published_at", "price", "view_count", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.view = view
+        if self.cursor_query_param in request.query_params:
+            ordering = self.get_keyset_ordering(queryset)
+            if ordering is not None:
+                self.keyset = True
+                return self.paginate_keyset(queryset, request, ordering)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        response = {
+            "next": self.next_link,
+            "previous": self.previous_link,
+            "results": data,
+        }
+        if self.total is not None:
+            response = {"count": self.total, **response}
+        return Response(response)
+
+    def get_keyset_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            return None
+        if any(field.lstrip("-") not in self.keyset_fields for field in ordering):
+            return None
+        if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            ordering.append("-id" if ordering and ordering[-1][0] == "-" else "id")
+        return ordering
+
+    def paginate_keyset(self, queryset, request, ordering):
+        self.request = request
+        page_size = self.get_page_size(request)
+        model = queryset.model
+        position, reverse = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        if position is not None:
+            position = self.parse_position(model, ordering, position)
+
+        self.total = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.total = self.get_count(queryset)
+
+        if reverse:
+            queryset = queryset.order_by(*[self.flip(field) for field in ordering])
+        else:
+            queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.position_filter(model, ordering, position, reverse)
+            )
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = position is not None if not reverse else has_more
+        self.next_link = (
+            self.encode_cursor(model, ordering, rows[-1], False)
+            if rows and has_next
+            else None
+        )
+        self.previous_link = (
+            self.encode_cursor(model, ordering, rows[0], True)
+            if rows and has_previous
+            else None
+        )
+        return rows
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def parse_position(model, ordering, position):
+        """Cursor qiymatlarini maydon turlariga o'tkazadi; buzilgan cursor 404."""
+        if len(position) != len(ordering):
+            raise NotFound("Noto'g'ri cursor")
+        try:
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound("Noto'g'ri cursor")
+        # None bilan taqqoslab bo'lmaydi (`__gt=None` ValueError beradi)
+        if None in values:
+            raise NotFound("Noto'g'ri cursor")
+        return values
+
+    @staticmethod
+    def position_filter(model, ordering, position, reverse):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, model, ordering, obj, reverse):
+        position = [
+            model._meta.get_field(field.lstrip("-")).value_to_string(obj)
+            for field in ordering
+        ]
+        token = urlsafe_b64encode(
+            json.dumps({"p": position, "r": reverse}).encode()
+        ).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, token):
+        if not token:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(token.encode()))
+            if not isinstance(data["p"], list):
+                raise ValueError
+            return data["p"], bool(data["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Noto'g'ri cursor")
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# AdPhoto signallari (asosiy rasmni tuzatish, e'lonni "touch" qilish) shu
+# blok ichida o'chiriladi: set_ad_photos bularni o'zi bir marta bajaradi
+photo_signals_muted = ContextVar("photo_signals_muted", default=False)
+
+
+@contextmanager
+def mute_photo_signals():
+    token = photo_signals_muted.set(True)
+    try:
+        yield
+    finally:
+        photo_signals_muted.reset(token)
+
+
+def main_image_subquery():
+    from .models import AdPhoto
+
+    return Coalesce(
+        Subquery(
+            AdPhoto.objects.filter(ad=OuterRef("pk"), is_main=True)
+            .order_by("order")
+            .values("image")[:1]
+        ),
+        Value(""),
+    )
+
+
+def sync_main_photo(ad_id, main_photo_id=None):
+    """
+    E'londa bitta asosiy rasm bo'lishini ta'minlaydi: `main_photo_id` berilsa
+    u qoladi, asosiy rasm bo'lmasa birinchisi tanlanadi. Keyin main_image
+    nusxasi yangilanadi. Yozish tranzaksiyasi ichida chaqiriladi.
+    """
+    from .models import Ad, AdPhoto
+
+    photos = AdPhoto.objects.filter(ad_id=ad_id)
+    if main_photo_id and photos.filter(pk=main_photo_id, is_main=True).exists():
+        photos.filter(is_main=True).exclude(pk=main_photo_id).update(is_main=False)
+    elif not photos.filter(is_main=True).exists():
+        first_photo = photos.order_by("order", "pk").first()
+        if first_photo:
+            photos.filter(pk=first_photo.pk).update(is_main=True)
+    Ad.objects.filter(pk=ad_id).update(
+        main_image=main_image_subquery(), updated_time=timezone.now()
+    )
+
+
+def refresh_main_images(queryset):
+    """`Ad.main_image` ni rasmlar jadvalidan bitta UPDATE bilan tiklaydi."""
+    return queryset.update(main_image=main_image_subquery())
+
+
+def set_ad_photos(ad, images, created=False):
+    """
+    E'lon rasmlarini `images` ro'yxatiga moslaydi: birinchisi asosiy, tartib
+    ro'yxatdagidek. Rasmlar soniga bog'liq bo'lmagan sondagi so'rov bilan
+    ishlaydi: mavjudlari saqlanadi, yangilari `bulk_create`, keraksizlari
+    bitta `delete()` bilan o'chiriladi.
+    """
+    from .models import Ad, AdPhoto
+
+    images = list(dict.fromkeys(images))
+    existing = {} if created else {photo.image.name: photo for photo in ad.photos.all()}
+
+    to_create, to_update = [], []
+    for order, image in enumerate(images):
+        is_main = order == 0
+        photo = existing.pop(image, None)
+        if photo is None:
+            to_create.append(AdPhoto(ad=ad, image=image, is_main=is_main, order=order))
+        elif (photo.is_main, photo.order) != (is_main, order):
+            photo.is_main, photo.order = is_main, order
+            to_update.append(photo)
+
+    if not (to_create or to_update or existing):
+        return
+
+    with transaction.atomic(), mute_photo_signals():
+        if existing:
+            AdPhoto.objects.filter(pk__in=[p.pk for p in existing.values()]).delete()
+        if to_update:
+            AdPhoto.objects.bulk_update(to_update, ["is_main", "order"])
+        if to_create:
+            AdPhoto.objects.bulk_create(to_create)
+        ad.main_image = images[0] if images else ""
+        fields = {"main_image": ad.main_image}
+        if not created:
+            fields["updated_time"] = timezone.now()
+        Ad.objects.filter(pk=ad.pk).update(**fields)
@@ -0,0 +1,147 @@
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+
+from django.db.models import Q
+
+from .search.base import SEARCH_FIELDS, tokenize
+
+IndexedSearch = namedtuple(
+    "IndexedSearch", ["pk", "user_id", "price_min", "price_max", "tokens"]
+)
+
+
+def ancestor_ids(category):
+    """Kategoriya va uning ajdodlari id'lari (materialized path'dan)."""
+    if not category.path:
+        return [category.pk]
+    return [int(part) for part in category.path.split("/") if part]
+
+
+def ad_search_text(ad):
+    return " ".join(getattr(ad, field) or "" for field in SEARCH_FIELDS).lower()
+
+
+class SavedSearchIndex:
+    """
+    Saqlangan qidiruvlarning xotiradagi teskari indeksi: kalit
+    (kategoriya, viloyat), None - "istalgan". Har bir kalit ichida qidiruvlar
+    price_min bo'yicha saralangan, shuning uchun e'lon narxidan qimmat
+    boshlanadiganlari bisect bilan tashlab yuboriladi.
+    """
+
+    def __init__(self, searches):
+        buckets = defaultdict(list)
+        for search in searches:
+            buckets[(search.category_id, search.region_id)].append(
+                IndexedSearch(
+                    search.pk,
+                    search.user_id,
+                    search.price_min,
+                    search.price_max,
+                    tokenize(search.search_query),
+                )
+            )
+        self._buckets = {}
+        for key, items in buckets.items():
+            items.sort(key=self._price_key)
+            self._buckets[key] = ([self._price_key(item) for item in items], items)
+
+    @staticmethod
+    def _price_key(search):
+        return -1 if search.price_min is None else search.price_min
+
+    def __len__(self):
+        return sum(len(items) for _, items in self._buckets.values())
+
+    def match(self, ad):
+        text = None
+        for category_id in (None, *ancestor_ids(ad.category)):
+            for region_id in {None, ad.region_id}:
+                bucket = self._buckets.get((category_id, region_id))
+                if bucket is None:
+                    continue
+                prices, items = bucket
+                for search in items[: bisect_right(prices, ad.price)]:
+                    if search.user_id == ad.seller_id:
+                        continue
+                    if search.price_max is not None and search.price_max < ad.price:
+                        continue
+                    if search.tokens:
+                        if text is None:
+                            text = ad_search_text(ad)
+                        # SimpleSearchBackend kabi: har bir so'z matnda uchrashi kerak
+                        if not all(token in text for token in search.tokens):
+                            continue
+                    yield search
+
+
+def candidate_searches(ads):
+    """E'lonlarga mos kelishi mumkin bo'lgan qidiruvlar (to'liq skan emas)."""
+    from .models import SavedSearch
+
+    category_ids, region_ids = set(), set()
+    for ad in ads:
+        category_ids.update(ancestor_ids(ad.category))
+        if ad.region_id:
+            region_ids.add(ad.region_id)
+    prices = [ad.price for ad in ads]
+    return (
+        SavedSearch.objects.filter(
+            Q(category__isnull=True) | Q(category_id__in=category_ids),
+            Q(region__isnull=True) | Q(region_id__in=region_ids),
+            Q(price_min__isnull=True) | Q(price_min__lte=max(prices)),
+            Q(price_max__isnull=True) | Q(price_max__gte=min(prices)),
+        )
+        .order_by()
+        .only(
+            "pk",
+            "user_id",
+            "category_id",
+            "region_id",
+            "search_query",
+            "price_min",
+            "price_max",
+        )
+    )
+
+
+def match_ads(ads, batch_size=1000):
+    """
+    Faol e'lonlarni saqlangan qidiruvlar bilan solishtirib, mosliklarni
+    SavedSearchMatch ga yozadi. Takror chaqirish xavfsiz.
+    """
+    from .models import SavedSearchMatch
+
+    ads = [ad for ad in ads if ad.status == "active"]
+    if not ads:
+        return 0
+    index = SavedSearchIndex(candidate_searches(ads).iterator(chunk_size=2000))
+    matches = [
+        SavedSearchMatch(saved_search_id=search.pk, user_id=search.user_id, ad=ad)
+        for ad in ads
+        for search in index.match(ad)
+    ]
+    SavedSearchMatch.objects.bulk_create(
+        matches, batch_size=batch_size, ignore_conflicts=True
+    )
+    return len(matches)
+
+
+def match_backlog(queryset=None, batch_size=500):
+    """Faol e'lonlarni pk bo'yicha bo'laklab qayta tekshiradi."""
+    from .models import Ad
+
+    queryset = (queryset if queryset is not None else Ad.objects.all()).filter(
+        status="active"
+    )
+    matched, last_pk = 0, 0
+    while True:
+        ads = list(
+            queryset.filter(pk__gt=last_pk)
+            .select_related("category")
+            .order_by("pk")[:batch_size]
+        )
+        if not ads:
+            return matched
+        matched += match_ads(ads)
+        last_pk = ads[-1].pk
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    "sqlite": "store.search.sqlite.SQLiteFTSBackend",
+    "postgresql": "store.search.postgres.PostgresFTSBackend",
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "STORE_SEARCH_BACKEND", None) or BACKENDS.get(
+            connection.vendor, "store.search.base.SimpleSearchBackend"
+        )
+        _backend = import_string(path)()
+    return _backend
+
+
+def search_ads(queryset, query):
+    return get_search_backend().search(queryset, query)
@@ -0,0 +1,35 @@
+import re
+
+from django.db.models import Q
+
+SEARCH_FIELDS = ("name_uz", "name_ru", "description_uz", "description_ru")
+NAME_FIELDS = ("name_uz", "name_ru")
+
+
+def tokenize(query):
+    return re.findall(r"\w+", (query or "").lower())
+
+
+class SimpleSearchBackend:
+    """FTS bo'lmagan bazalar uchun: eski `icontains` qidiruvi, reytingsiz."""
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        condition = Q()
+        for token in tokens:
+            token_condition = Q()
+            for field in SEARCH_FIELDS:
+                token_condition |= Q(**{f"{field}__icontains": token})
+            condition &= token_condition
+        return queryset.filter(condition)
+
+    def index_ad(self, ad):
+        pass
+
+    def remove_ad(self, ad_id):
+        pass
+
+    def rebuild(self):
+        return 0
@@ -0,0 +1,36 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+from .base import SimpleSearchBackend, tokenize
+
+CONFIG = "simple"
+
+
+def ad_search_vector():
+    # Migratsiyadagi GIN indeks aynan shu ifoda ustida qurilgan
+    return SearchVector("name_uz", "name_ru", weight="A", config=CONFIG) + SearchVector(
+        "description_uz", "description_ru", weight="B", config=CONFIG
+    )
+
+
+class PostgresFTSBackend(SimpleSearchBackend):
+    """
+    PostgreSQL `tsvector` qidiruvi. Indeks ifodaviy GIN indeks bo'lgani uchun
+    baza uni o'zi yangilab boradi, signallar kerak emas.
+    """
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        search_query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens),
+            search_type="raw",
+            config=CONFIG,
+        )
+        vector = ad_search_vector()
+        return (
+            queryset.annotate(search_document=vector)
+            .filter(search_document=search_query)
+            .annotate(search_rank=SearchRank(vector, search_query))
+            .order_by("-search_rank")
+        )
@@ -0,0 +1,62 @@
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .base import SEARCH_FIELDS, SimpleSearchBackend, tokenize
+
+TABLE = "store_ad_fts"
+
+
+class SQLiteFTSBackend(SimpleSearchBackend):
+    """
+    SQLite FTS5 indeksi (`store_ad_fts`, rowid = e'lon id'si).
+    Indeks signallar orqali yangilanadi, natijalar bm25 bo'yicha tartiblanadi.
+    """
+
+    def match_expression(self, query):
+        return " ".join(f'"{token}"*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        table = queryset.model._meta.db_table
+        return (
+            queryset.filter(
+                pk__in=RawSQL(
+                    f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [expression]
+                )
+            )
+            .annotate(
+                search_rank=RawSQL(
+                    f"SELECT bm25({TABLE}, 10.0, 10.0, 1.0, 1.0) FROM {TABLE} "
+                    f'WHERE {TABLE} MATCH %s AND rowid = "{table}"."id"',
+                    [expression],
+                )
+            )
+            .order_by("search_rank")
+        )
+
+    def index_ad(self, ad):
+        columns = ", ".join(SEARCH_FIELDS)
+        placeholders = ", ".join(["%s"] * (len(SEARCH_FIELDS) + 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [ad.pk])
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, {columns}) VALUES ({placeholders})",
+                [ad.pk, *(getattr(ad, field) or "" for field in SEARCH_FIELDS)],
+            )
+
+    def remove_ad(self, ad_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [ad_id])
+
+    def rebuild(self):
+        columns = ", ".join(SEARCH_FIELDS)
+        coalesced = ", ".join(f"COALESCE({field}, '')" for field in SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, {columns}) "
+                f"SELECT id, {coalesced} FROM store_ad"
+            )
+            return cursor.rowcount
@@ -0,0 +1,106 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest, Least, Log, Power
+from django.utils import timezone
+
+from common.utils.counter_buffer import CounterBuffer
+
+# Trend skori: har bir qidiruv 2 ** ((t - TREND_EPOCH) / yarim_yemirilish)
+# og'irlik bilan qo'shiladi. Barcha skorlar bir xil hozirgi og'irlikka
+# bo'linsa so'nish hosil bo'ladi, shuning uchun tartiblash uchun bazadagi
+# qiymat yetarli. Og'irlik vaqt o'tishi bilan float dan oshib ketadi, shuning
+# uchun bazada yig'indining log2 qiymati saqlanadi (0 - qidiruv bo'lmagan).
+TREND_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def trend_exponent(now=None):
+    """Hozirgi og'irlikning log2 qiymati."""
+    half_life = getattr(settings, "SEARCH_TREND_HALF_LIFE_DAYS", 7) * 24 * 3600
+    now = now or timezone.now()
+    return (now - TREND_EPOCH).total_seconds() / half_life
+
+
+def trend_increment(amount, now=None):
+    """`now` paytidagi `amount` ta qidiruvning skori."""
+    return math.log2(amount) + trend_exponent(now)
+
+
+def add_trend_score(field, score):
+    """
+    log2(2 ** field + 2 ** score) ni oshib ketmasdan hisoblaydigan ifoda:
+    max + log2(1 + 2 ** (min - max)).
+    """
+    high = Greatest(F(field), Value(score))
+    low = Least(F(field), Value(score))
+    return Case(
+        When(**{f"{field}__lte": 0}, then=Value(score)),
+        default=high + Log(2, Value(1.0) + Power(2, low - high)),
+    )
+
+
+def decayed_score(trend_score, now=None):
+    """Bazadagi skorni hozirgi vaqtdagi so'ngan qidiruvlar soniga aylantiradi."""
+    if trend_score <= 0:
+        return 0.0
+    return 2 ** (trend_score - trend_exponent(now))
+
+
+class SearchCounterBuffer(CounterBuffer):
+    settings_name = "SEARCH_COUNT_BUFFER"
+    key_field = "pk"
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def write(self, counts):
+        now = timezone.now()
+        batch_size = self.options["BATCH_SIZE"]
+        for amount, keys in self.group_by_amount(counts).items():
+            for i in range(0, len(keys), batch_size):
+                self.get_queryset().filter(
+                    **{f"{self.key_field}__in": keys[i : i + batch_size]}
+                ).update(
+                    search_count=F("search_count") + amount,
+                    trend_score=add_trend_score(
+                        "trend_score", trend_increment(amount, now)
+                    ),
+                )
+
+
+class CategorySearchCounter(SearchCounterBuffer):
+    namespace = "category_searches"
+    key_field = "category_id"
+
+    def get_queryset(self):
+        from .models import SearchCount
+
+        return SearchCount.objects.all()
+
+    def write(self, counts):
+        from .models import Category, SearchCount
+
+        # Yetishmayotgan SearchCount qatorlari bitta INSERT bilan yaratiladi
+        category_ids = Category.objects.filter(pk__in=list(counts)).values_list(
+            "pk", flat=True
+        )
+        SearchCount.objects.bulk_create(
+            [SearchCount(category_id=category_id) for category_id in category_ids],
+            ignore_conflicts=True,
+        )
+        super().write(counts)
+
+
+class PopularSearchCounter(SearchCounterBuffer):
+    namespace = "popular_searches"
+
+    def get_queryset(self):
+        from .models import PopularSearch
+
+        return PopularSearch.objects.all()
+
+
+search_counter = CategorySearchCounter()
+popular_search_counter = PopularSearchCounter()
@@ -1,20 +1,47 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models.manager import BaseManager
+
+from common.utils.image_variants import ImageVariantsField
 from .models import (
     Category,
     Ad,
     AdPhoto,
     FavoriteProduct,
     SavedSearch,
+    SavedSearchMatch,
     SearchCount,
     PopularSearch,
 )
+from .photos import set_ad_photos
 
 User = get_user_model()
 
 
+def get_liked_ad_ids(request, ads):
+    if not (request and request.user.is_authenticated) or not ads:
+        return set()
+    return set(
+        FavoriteProduct.objects.filter(
+            user=request.user, ad_id__in=[ad.id for ad in ads]
+        ).values_list("ad_id", flat=True)
+    )
+
+
+async def aget_liked_ad_ids(request, ads):
+    if not (request and request.user.is_authenticated) or not ads:
+        return set()
+    return {
+        ad_id
+        async for ad_id in FavoriteProduct.objects.filter(
+            user=request.user, ad_id__in=[ad.id for ad in ads]
+        ).values_list("ad_id", flat=True)
+    }
+
+
 class CategorySerializer(serializers.ModelSerializer):
     product_count = serializers.ReadOnlyField()
+    icon_variants = ImageVariantsField(source="icon")
 
     class Meta:
         model = Category
@@ -23,6 +50,7 @@ class CategorySerializer(serializers.ModelSerializer):
             "name",
             "slug",
             "icon",
+            "icon_variants",
             "parent",
             "is_active",
             "order",
@@ -36,6 +64,7 @@ class CategorySerializer(serializers.ModelSerializer):
 class CategoryWithChildrenSerializer(serializers.ModelSerializer):
     children = serializers.SerializerMethodField()
     product_count = serializers.ReadOnlyField()
+    icon_variants = ImageVariantsField(source="icon")
 
     class Meta:
         model = Category
@@ -44,6 +73,7 @@ class CategoryWithChildrenSerializer(serializers.ModelSerializer):
             "name",
             "slug",
             "icon",
+            "icon_variants",
             "parent",
             "is_active",
             "order",
@@ -61,7 +91,11 @@ class CategoryWithChildrenSerializer(serializers.ModelSerializer):
         ]
 
     def get_children(self, obj):
-        children = obj.children.filter(is_active=True).order_by("order", "name")
+        tree = self.context.get("category_tree")
+        if tree is not None:
+            children = tree.children(obj.id)
+        else:
+            children = obj.children.filter(is_active=True).order_by("order", "name")
         return CategorySerializer(children, many=True, context=self.context).data
 
 
@@ -75,30 +109,58 @@ class UserSerializer(serializers.ModelSerializer):
 
 class SellerSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
+    profile_photo_variants = ImageVariantsField(source="profile_photo")
 
     class Meta:
         model = User
-        fields = ["id", "full_name", "phone_number", "profile_photo"]
+        fields = [
+            "id",
+            "full_name",
+            "phone_number",
+            "profile_photo",
+            "profile_photo_variants",
+        ]
         read_only_fields = ["id", "full_name"]
 
     def get_full_name(self, obj):
-        return (
-            obj.get_full_name()
-            if hasattr(obj, "get_full_name")
-            else f"{obj.first_name} {obj.last_name}".strip()
-        )
+        if hasattr(obj, "get_full_name"):
+            return obj.get_full_name()
+        return getattr(obj, "full_name", "")
 
 
 class AdPhotoSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField(source="image")
 
     class Meta:
         model = AdPhoto
-        fields = ["id", "ad", "image", "is_main", "order", "created_time", "updated_time"]
+        fields = [
+            "id",
+            "ad",
+            "image",
+            "variants",
+            "is_main",
+            "order",
+            "created_time",
+            "updated_time",
+        ]
         read_only_fields = ["created_time", "updated_time"]
 
 
+class AdListBatchSerializer(serializers.ListSerializer):
+    """Sahifadagi barcha e'lonlar uchun `is_liked` ni bitta so'rovda aniqlaydi."""
+
+    def to_representation(self, data):
+        ads = list(data.all() if isinstance(data, BaseManager) else data)
+        if "liked_ad_ids" not in self.context:
+            self.context["liked_ad_ids"] = get_liked_ad_ids(
+                self.context.get("request"), ads
+            )
+        return super().to_representation(ads)
+
+
 class AdListSerializer(serializers.ModelSerializer):
     photo = serializers.SerializerMethodField()
+    photo_variants = ImageVariantsField(source="main_image")
     seller = SellerSerializer(read_only=True)
     address = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
@@ -111,6 +173,7 @@ class AdListSerializer(serializers.ModelSerializer):
             "slug",
             "price",
             "photo",
+            "photo_variants",
             "published_at",
             "address",
             "seller",
@@ -128,6 +191,7 @@ class AdListSerializer(serializers.ModelSerializer):
             "address",
             "updated_time",
         ]
+        list_serializer_class = AdListBatchSerializer
 
     def get_photo(self, obj):
         main_photo = obj.main_photo
@@ -149,6 +213,9 @@ class AdListSerializer(serializers.ModelSerializer):
         return ", ".join(address_parts)
 
     def get_is_liked(self, obj):
+        liked_ad_ids = self.context.get("liked_ad_ids")
+        if liked_ad_ids is not None:
+            return obj.id in liked_ad_ids
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return obj.favorited_by.filter(user=request.user).exists()
@@ -204,6 +271,9 @@ class AdDetailSerializer(serializers.ModelSerializer):
         return ", ".join(address_parts)
 
     def get_is_liked(self, obj):
+        liked_ad_ids = self.context.get("liked_ad_ids")
+        if liked_ad_ids is not None:
+            return obj.id in liked_ad_ids
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return obj.favorited_by.filter(user=request.user).exists()
@@ -239,10 +309,7 @@ class AdCreateUpdateSerializer(serializers.ModelSerializer):
         photos_data = validated_data.pop("photos", [])
         validated_data["seller"] = self.context["request"].user
         ad = Ad.objects.create(**validated_data)
-
-        for i, photo_url in enumerate(photos_data):
-            AdPhoto.objects.create(ad=ad, image=photo_url, is_main=(i == 0), order=i)
-
+        set_ad_photos(ad, photos_data, created=True)
         return ad
 
     def update(self, instance, validated_data):
@@ -253,15 +320,21 @@ class AdCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
 
         if photos_data is not None:
-            instance.photos.all().delete()
-            for i, photo_url in enumerate(photos_data):
-                AdPhoto.objects.create(
-                    ad=instance, image=photo_url, is_main=(i == 0), order=i
-                )
+            set_ad_photos(instance, photos_data)
 
         return instance
 
 
+class FavoriteProductBatchSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        favorites = list(data.all() if isinstance(data, BaseManager) else data)
+        if "liked_ad_ids" not in self.context:
+            self.context["liked_ad_ids"] = get_liked_ad_ids(
+                self.context.get("request"), [favorite.ad for favorite in favorites]
+            )
+        return super().to_representation(favorites)
+
+
 class FavoriteProductSerializer(serializers.ModelSerializer):
     product = AdListSerializer(source="ad", read_only=True)
     ad = serializers.PrimaryKeyRelatedField(queryset=Ad.objects.all(), write_only=True)
@@ -278,6 +351,7 @@ class FavoriteProductSerializer(serializers.ModelSerializer):
             "updated_time",
         ]
         read_only_fields = ["id", "user", "created_time", "updated_time", "product"]
+        list_serializer_class = FavoriteProductBatchSerializer
 
     def create(self, validated_data):
         request = self.context.get("request")
@@ -316,6 +390,17 @@ class SavedSearchSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class SavedSearchMatchSerializer(serializers.ModelSerializer):
+    product = AdListSerializer(source="ad", read_only=True)
+
+    class Meta:
+        model = SavedSearchMatch
+        fields = ["id", "saved_search", "product", "is_seen", "created_time"]
+        read_only_fields = fields
+        # FavoriteProduct kabi `.ad` li obyektlar: is_liked bitta so'rovda
+        list_serializer_class = FavoriteProductBatchSerializer
+
+
 class SearchCountSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
 
@@ -326,6 +411,7 @@ class SearchCountSerializer(serializers.ModelSerializer):
 
 
 class PopularSearchSerializer(serializers.ModelSerializer):
+    icon_variants = ImageVariantsField(source="icon")
 
     class Meta:
         model = PopularSearch
@@ -333,6 +419,7 @@ class PopularSearchSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "icon",
+            "icon_variants",
             "search_count",
             "is_active",
             "created_time",
@@ -370,4 +457,5 @@ class SearchResultSerializer(serializers.Serializer):
 class AutoCompleteSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
+    type = serializers.CharField()
     icon = serializers.URLField(required=False)
\ No newline at end of file
@@ -1,32 +1,175 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import Category, SearchCount, AdPhoto
+from . import category_counts, tasks
+from .autocomplete import autocomplete_index
+from .category_tree import invalidate_category_tree
+from .count_cache import expire_counts
+from .photos import photo_signals_muted, sync_main_photo
+from .search import get_search_backend
+from .search.base import SEARCH_FIELDS
+from .models import (
+    Ad,
+    Category,
+    AdPhoto,
+    PopularSearch,
+    FavoriteProduct,
+)
 
 
 @receiver(post_save, sender=Category)
 def create_search_count(sender, instance, created, **kwargs):
     if created:
-        SearchCount.objects.get_or_create(category=instance)
+        tasks.create_search_count.delay(instance.id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_category_tree(sender, **kwargs):
+    invalidate_category_tree()
 
 
 @receiver(post_save, sender=AdPhoto)
-def manage_main_photo(sender, instance, created, **kwargs):
-    if instance.is_main:
-        AdPhoto.objects.filter(ad=instance.ad, is_main=True).exclude(
-            id=instance.id
-        ).update(is_main=False)
-    else:
-        if not AdPhoto.objects.filter(ad=instance.ad, is_main=True).exists():
-            first_photo = AdPhoto.objects.filter(ad=instance.ad).first()
-            if first_photo:
-                first_photo.is_main = True
-                first_photo.save()
+def manage_main_photo(sender, instance, created, raw=False, **kwargs):
+    # Asosiy rasm invarianti navbatga qoldirilmaydi: yozish bilan bir tranzaksiyada
+    if raw or photo_signals_muted.get():
+        return
+    with transaction.atomic():
+        sync_main_photo(instance.ad_id, instance.id if instance.is_main else None)
 
 
 @receiver(post_delete, sender=AdPhoto)
 def manage_main_photo_on_delete(sender, instance, **kwargs):
-    if instance.is_main:
-        next_photo = AdPhoto.objects.filter(ad=instance.ad).first()
-        if next_photo:
-            next_photo.is_main = True
-            next_photo.save()
+    if photo_signals_muted.get():
+        return
+    with transaction.atomic():
+        sync_main_photo(instance.ad_id)
+
+
+@receiver(pre_save, sender=Ad)
+def remember_ad_count_state(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or hasattr(instance, "_loaded_state"):
+        return
+    instance._loaded_state = (
+        Ad.objects.filter(pk=instance.pk).values_list("status", "category_id").first()
+    ) or (None, None)
+
+
+@receiver(post_save, sender=Ad)
+def queue_saved_search_matching(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    # update_category_ad_counts dan oldin: u _loaded_state ni yangilaydi
+    if raw or instance.status != "active":
+        return
+    if update_fields is not None and "status" not in update_fields:
+        return
+    old_status = None if created else instance._loaded_state[0]
+    if old_status != "active":
+        tasks.match_saved_searches.delay(instance.pk)
+
+
+@receiver(post_save, sender=Ad)
+def update_category_ad_counts(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    if update_fields is not None and not {"status", "category", "category_id"} & set(
+        update_fields
+    ):
+        return
+    old_state = (None, None) if created else instance._loaded_state
+    category_counts.ad_changed(old_state, instance.count_state)
+    instance._loaded_state = instance.count_state
+
+
+@receiver(post_delete, sender=Ad)
+def update_category_ad_counts_on_delete(sender, instance, **kwargs):
+    state = getattr(instance, "_loaded_state", instance.count_state)
+    category_counts.ad_changed(state, (None, None))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_parent(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or hasattr(instance, "_loaded_parent_id"):
+        return
+    instance._loaded_parent_id = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list("parent_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Category)
+def move_category_ad_counts(sender, instance, created, raw=False, **kwargs):
+    old_parent_id = getattr(instance, "_loaded_parent_id", instance.parent_id)
+    instance._loaded_parent_id = instance.parent_id
+    if raw or created or old_parent_id == instance.parent_id:
+        return
+    subtree_ad_count = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list("subtree_ad_count", flat=True)
+        .first()
+    )
+    category_counts.adjust_subtree(old_parent_id, -subtree_ad_count)
+    category_counts.adjust_subtree(instance.parent_id, subtree_ad_count)
+
+
+@receiver(post_save, sender=Ad)
+def index_ad_for_search(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"name", "description", *SEARCH_FIELDS} & set(
+        update_fields
+    ):
+        return
+    get_search_backend().index_ad(instance)
+
+
+@receiver(post_delete, sender=Ad)
+def remove_ad_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_ad(instance.pk)
+
+
+@receiver(post_save, sender=Ad)
+def update_autocomplete_ad(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete_index.update_ad(instance)
+
+
+@receiver(post_delete, sender=Ad)
+def remove_autocomplete_ad(sender, instance, **kwargs):
+    autocomplete_index.update_ad(instance, deleted=True)
+
+
+@receiver(post_save, sender=Category)
+def update_autocomplete_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete_index.update_category(instance)
+
+
+@receiver(post_delete, sender=Category)
+def remove_autocomplete_category(sender, instance, **kwargs):
+    autocomplete_index.update_category(instance, deleted=True)
+
+
+@receiver(post_save, sender=PopularSearch)
+def update_autocomplete_popular_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete_index.update_popular_search(instance)
+
+
+@receiver(post_delete, sender=PopularSearch)
+def remove_autocomplete_popular_search(sender, instance, **kwargs):
+    autocomplete_index.update_popular_search(instance, deleted=True)
+
+
+@receiver(post_save, sender=Ad)
+@receiver(post_delete, sender=Ad)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=FavoriteProduct)
+@receiver(post_delete, sender=FavoriteProduct)
+def expire_cached_counts(sender, **kwargs):
+    expire_counts()
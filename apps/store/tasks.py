@@ -0,0 +1,19 @@
+from common.utils.tasks import task
+
+
+@task
+def create_search_count(category_id):
+    from .models import Category, SearchCount
+
+    if Category.objects.filter(pk=category_id).exists():
+        SearchCount.objects.get_or_create(category_id=category_id)
+
+
+@task
+def match_saved_searches(ad_id):
+    from .models import Ad
+    from .saved_searches import match_ads
+
+    ad = Ad.objects.select_related("category").filter(pk=ad_id).first()
+    if ad is not None:
+        match_ads([ad])
@@ -1,11 +1,23 @@
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 from PIL import Image
 import io
+import json
 import tempfile
+import threading
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from unittest.mock import patch
 
 from .models import (
     Category,
@@ -13,10 +25,25 @@ from .models import (
     AdPhoto,
     FavoriteProduct,
     SavedSearch,
+    SavedSearchMatch,
     SearchCount,
     PopularSearch,
 )
+from .category_tree import get_category_tree, invalidate_category_tree
+from . import async_views, category_counts
+from .autocomplete import autocomplete_index
+from .benchmark import compare
+from .search import search_ads
+from .search_counter import (
+    decayed_score,
+    popular_search_counter,
+    search_counter,
+    trend_increment,
+)
+from .trending import SpaceSavingStore, normalize_query, query_log
+from .view_counter import SQLiteFileStore, ViewCountBuffer, view_counter
 from common.models import Region, District
+from common.testing import QueryBudgetMixin
 
 User = get_user_model()
 
@@ -189,6 +216,7 @@ class StoreEndpointsTests(APITestCase):
         self.assertEqual(response.data["data"]["name"], self.ad.name)
         self.assertEqual(response.data["data"]["price"], self.ad.price)
 
+        view_counter.flush()
         self.ad.refresh_from_db()
         self.assertEqual(self.ad.view_count, 1)
 
@@ -557,4 +585,1545 @@ class StoreEndpointsTests(APITestCase):
                 try:
                     os.remove(os.path.join(temp_dir, filename))
                 except:
-                    pass
\ No newline at end of file
+                    pass
+
+class AdListQueryCountTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Buyer", phone_number="+998901111111", password="testpass123"
+        )
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+
+    def create_ads(self, count):
+        ads = []
+        for i in range(count):
+            ad = Ad.objects.create(
+                name=f"Phone {len(ads)} {Ad.objects.count()}",
+                description="Phone",
+                category=self.category,
+                price=100000 + i,
+                seller=self.seller,
+                status="active",
+            )
+            AdPhoto.objects.create(ad=ad, image=f"ads_photos/{ad.id}.jpg", is_main=True)
+            FavoriteProduct.objects.create(user=self.user, ad=ad)
+            ads.append(ad)
+        return ads
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_ad_list_query_count_does_not_grow_with_page_size(self):
+        self.client.force_authenticate(self.user)
+        url = reverse("store:ad-list")
+
+        self.create_ads(2)
+        small_page_queries, _ = self.count_queries(url)
+        self.create_ads(8)
+        large_page_queries, response = self.count_queries(url)
+
+        self.assertEqual(small_page_queries, large_page_queries)
+        results = response.data["results"]
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(ad["is_liked"] for ad in results))
+        self.assertTrue(all(ad["photo"].endswith(".jpg") for ad in results))
+
+    def test_favorite_list_query_count_does_not_grow_with_page_size(self):
+        self.client.force_authenticate(self.user)
+        url = reverse("store:my-favorite-list")
+
+        self.create_ads(2)
+        small_page_queries, _ = self.count_queries(url)
+        self.create_ads(8)
+        large_page_queries, response = self.count_queries(url)
+
+        self.assertEqual(small_page_queries, large_page_queries)
+        self.assertTrue(all(f["product"]["is_liked"] for f in response.data["results"]))
+
+    def test_anonymous_ad_list_is_not_liked(self):
+        self.create_ads(3)
+        _, response = self.count_queries(reverse("store:ad-list"))
+
+        self.assertFalse(any(ad["is_liked"] for ad in response.data["results"]))
+
+
+@override_settings(VIEW_COUNT_BUFFER={"FLUSH_INTERVAL": None})
+class ViewCountBufferTests(APITestCase):
+
+    def setUp(self):
+        view_counter.store.drain()
+        seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        category = Category.objects.create(name="Phones")
+        self.ad = Ad.objects.create(
+            name="iPhone 15",
+            description="Phone",
+            category=category,
+            price=100000,
+            seller=seller,
+            status="active",
+        )
+
+    def test_detail_view_does_not_write(self):
+        url = reverse("store:ad-detail", kwargs={"slug": self.ad.slug})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["view_count"], 2)
+        self.assertFalse(
+            any(q["sql"].lstrip().upper().startswith("UPDATE") for q in queries)
+        )
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.view_count, 0)
+
+    def test_flush_applies_buffered_increments(self):
+        for _ in range(3):
+            view_counter.record(self.ad.pk)
+
+        self.assertEqual(view_counter.flush(), 3)
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.view_count, 3)
+        self.assertEqual(view_counter.pending(self.ad.pk), 0)
+
+    @override_settings(VIEW_COUNT_BUFFER={"FLUSH_INTERVAL": 0})
+    def test_zero_interval_writes_immediately(self):
+        view_counter.record(self.ad.pk)
+
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.view_count, 1)
+        self.assertEqual(view_counter.pending(self.ad.pk), 0)
+
+    def test_exit_flush_is_registered_without_worker(self):
+        buffer = ViewCountBuffer()
+        with patch("common.utils.counter_buffer.atexit.register") as register:
+            buffer.record(self.ad.pk)
+            buffer.record(self.ad.pk)
+
+        register.assert_called_once_with(buffer._flush_at_exit)
+        self.assertIsNone(buffer._worker)
+        buffer._flush_at_exit()
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.view_count, 2)
+
+    def test_sqlite_file_store_counts_keys_periodically(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteFileStore(f"{directory}/views.sqlite3", size_check_every=2)
+
+            self.assertEqual([store.add(key) for key in (1, 2, 3, 4)], [0, 2, 2, 4])
+            store.drain()
+            self.assertEqual(store.add(5), 0)
+
+    def test_sqlite_file_store_is_drained(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteFileStore(f"{directory}/views.sqlite3")
+            store.add(self.ad.pk)
+            store.add(self.ad.pk, 2)
+
+            self.assertEqual(store.get(self.ad.pk), 3)
+            self.assertEqual(store.drain(), {self.ad.pk: 3})
+            self.assertEqual(store.drain(), {})
+
+    def test_flush_command_requires_shared_store(self):
+        view_counter.record(self.ad.pk)
+        with self.assertRaisesMessage(CommandError, "LocalMemoryStore"):
+            call_command("flush_view_counts", stdout=io.StringIO())
+        view_counter.store.drain()
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteFileStore(f"{directory}/views.sqlite3")
+            store.add(self.ad.pk, 2)
+            with patch.object(view_counter, "_store", store):
+                call_command("flush_view_counts", stdout=io.StringIO())
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.view_count, 2)
+
+
+class CategoryAdCountTests(APITestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.parent = Category.objects.create(name="Electronics")
+        self.child = Category.objects.create(name="Phones", parent=self.parent)
+        self.other = Category.objects.create(name="Cars")
+
+    def create_ad(self, category, status="active"):
+        return Ad.objects.create(
+            name="Ad",
+            description="Ad",
+            category=category,
+            price=100000,
+            seller=self.seller,
+            status=status,
+        )
+
+    def assertCounts(self, category, active, subtree):
+        category.refresh_from_db()
+        self.assertEqual(
+            (category.active_ad_count, category.subtree_ad_count), (active, subtree)
+        )
+
+    def test_counts_follow_ad_create_status_change_move_and_delete(self):
+        ad = self.create_ad(self.child)
+        self.create_ad(self.child, status="pending")
+        self.assertCounts(self.child, 1, 1)
+        self.assertCounts(self.parent, 0, 1)
+
+        ad = Ad.objects.get(pk=ad.pk)
+        ad.status = "inactive"
+        ad.save()
+        self.assertCounts(self.child, 0, 0)
+        self.assertCounts(self.parent, 0, 0)
+
+        ad.status = "active"
+        ad.category = self.other
+        ad.save()
+        self.assertCounts(self.other, 1, 1)
+        self.assertCounts(self.parent, 0, 0)
+
+        ad.delete()
+        self.assertCounts(self.other, 0, 0)
+
+    def test_moving_category_moves_rollup_count(self):
+        self.create_ad(self.child)
+        self.child.parent = self.other
+        self.child.save()
+
+        self.assertCounts(self.parent, 0, 0)
+        self.assertCounts(self.other, 0, 1)
+
+    def test_ad_write_refreshes_category_tree_cache(self):
+        grandchild = Category.objects.create(name="Android", parent=self.child)
+        get_category_tree()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                category_counts.adjust_subtree(grandchild.pk, 1)
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(get_category_tree().get(self.parent.pk).subtree_ad_count, 1)
+        self.assertCounts(grandchild, 0, 1)
+        self.assertCounts(self.child, 0, 1)
+        self.assertCounts(self.parent, 0, 1)
+        self.assertCounts(self.other, 0, 0)
+
+    def test_recount_repairs_drift(self):
+        self.create_ad(self.child)
+        self.create_ad(self.child)
+        Category.objects.update(active_ad_count=7, subtree_ad_count=7)
+
+        call_command("recount", stdout=io.StringIO())
+
+        self.assertCounts(self.child, 2, 2)
+        self.assertCounts(self.parent, 0, 2)
+        self.assertCounts(self.other, 0, 0)
+
+    def test_category_list_query_count_does_not_grow_with_categories(self):
+        url = reverse("store:category-list")
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        for i in range(5):
+            self.create_ad(Category.objects.create(name=f"Category {i}"))
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+
+        self.assertEqual(len(small), len(large))
+        counts = {c["name"]: c["product_count"] for c in response.data["results"]}
+        self.assertEqual(counts["Category 0"], 1)
+
+    @override_settings(CATEGORY_PRODUCT_COUNT_ROLLUP=True)
+    def test_rollup_product_count(self):
+        self.create_ad(self.child)
+        self.parent.refresh_from_db()
+
+        self.assertEqual(self.parent.product_count, 1)
+
+
+class CategoryTreeTests(APITestCase):
+
+    def setUp(self):
+        invalidate_category_tree()
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.root = Category.objects.create(name="Electronics")
+        self.child = Category.objects.create(name="Phones", parent=self.root)
+        self.grandchild = Category.objects.create(name="Smartphones", parent=self.child)
+        self.hidden = Category.objects.create(
+            name="Hidden", parent=self.root, is_active=False
+        )
+
+    def test_descendants_and_ancestors_without_queries(self):
+        tree = get_category_tree()
+
+        with self.assertNumQueries(0):
+            self.assertCountEqual(
+                tree.descendant_ids(self.root.id),
+                [self.root.id, self.child.id, self.grandchild.id],
+            )
+            self.assertEqual(
+                tree.ancestor_ids(self.grandchild.id), [self.child.id, self.root.id]
+            )
+            self.assertCountEqual(
+                [c.id for c in self.root.get_all_children()],
+                [self.child.id, self.grandchild.id, self.hidden.id],
+            )
+
+    def test_tree_is_invalidated_on_category_change(self):
+        get_category_tree()
+        extra = Category.objects.create(name="Tablets", parent=self.root)
+
+        self.assertIn(extra.id, get_category_tree().descendant_ids(self.root.id))
+
+        extra.delete()
+        self.assertNotIn(extra.id, get_category_tree().nodes)
+
+    def test_categories_with_children_query_count_is_constant(self):
+        url = reverse("store:categories-with-children")
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        for i in range(5):
+            Category.objects.create(name=f"Root {i}")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+
+        self.assertLessEqual(len(large), len(small))
+        electronics = next(c for c in response.data if c["name"] == "Electronics")
+        self.assertEqual([c["name"] for c in electronics["children"]], ["Phones"])
+
+    def test_sub_category_list_by_parent(self):
+        response = self.client.get(
+            reverse("store:sub-category-list"), {"parent__id": self.root.id}
+        )
+
+        self.assertEqual([c["name"] for c in response.data], ["Phones"])
+
+    def test_ad_list_category_ids_include_descendants(self):
+        ad = Ad.objects.create(
+            name="Pixel",
+            description="Phone",
+            category=self.grandchild,
+            price=100000,
+            seller=self.seller,
+            status="active",
+        )
+
+        response = self.client.get(
+            reverse("store:ad-list"), {"category_ids": str(self.root.id)}
+        )
+
+        self.assertEqual([a["id"] for a in response.data["results"]], [ad.id])
+
+
+class CategorySubtreeFilterTests(APITestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.root = Category.objects.create(name="Electronics")
+        self.child = Category.objects.create(name="Phones", parent=self.root)
+        self.grandchild = Category.objects.create(name="Smartphones", parent=self.child)
+        self.other = Category.objects.create(name="Cars")
+        self.ads = {
+            category.name: Ad.objects.create(
+                name=f"{category.name} ad",
+                description="Ad",
+                category=category,
+                price=100000,
+                seller=self.seller,
+                status="active",
+            )
+            for category in [self.root, self.grandchild, self.other]
+        }
+
+    def test_paths_are_materialized(self):
+        self.grandchild.refresh_from_db()
+
+        self.assertEqual(
+            self.grandchild.path, f"{self.root.id}/{self.child.id}/{self.grandchild.id}/"
+        )
+
+    def test_moving_category_rewrites_descendant_paths(self):
+        self.child.parent = self.other
+        self.child.save()
+        self.grandchild.refresh_from_db()
+
+        self.assertTrue(self.grandchild.path.startswith(f"{self.other.id}/"))
+
+    def test_category_filter_includes_subtree(self):
+        response = self.client.get(reverse("store:ad-list"), {"category": self.root.id})
+
+        self.assertCountEqual(
+            [ad["id"] for ad in response.data["results"]],
+            [self.ads["Electronics"].id, self.ads["Smartphones"].id],
+        )
+
+    def test_inactive_branch_is_excluded_by_both_filters(self):
+        self.child.is_active = False
+        self.child.save()
+        url = reverse("store:ad-list")
+
+        for params in ({"category": self.root.id}, {"category_ids": self.root.id}):
+            response = self.client.get(url, params)
+            self.assertEqual(
+                [ad["id"] for ad in response.data["results"]],
+                [self.ads["Electronics"].id],
+            )
+        response = self.client.get(url, {"category_ids": self.child.id})
+        self.assertEqual(response.data["results"], [])
+
+    def test_category_filter_uses_path_range(self):
+        get_category_tree()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("store:ad-list"), {"category": self.root.id})
+
+        path_from, path_to = self.root.subtree_path_range
+        sql = "\n".join(query["sql"] for query in queries)
+        self.assertIn(f"\"path\" >= '{path_from}'", sql)
+        self.assertIn(f"\"path\" < '{path_to}'", sql)
+
+
+class AdSearchTests(APITestCase):
+
+    def setUp(self):
+        seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        category = Category.objects.create(name="Phones")
+        defaults = {"category": category, "price": 100000, "seller": seller}
+        self.in_description = Ad.objects.create(
+            name_uz="Telefon g'ilofi",
+            name_ru="Чехол",
+            description_uz="iPhone uchun",
+            status="active",
+            **defaults,
+        )
+        self.in_name = Ad.objects.create(
+            name_uz="iPhone 15 Pro",
+            name_ru="Айфон 15 Про",
+            description_uz="Yangi",
+            status="active",
+            **defaults,
+        )
+        self.inactive = Ad.objects.create(
+            name_uz="iPhone 11", description_uz="Eski", status="inactive", **defaults
+        )
+
+    def search(self, query):
+        return list(search_ads(Ad.objects.filter(status="active"), query))
+
+    def test_results_are_ranked_name_first(self):
+        self.assertEqual(self.search("iphone"), [self.in_name, self.in_description])
+
+    def test_russian_translation_prefix_is_searchable(self):
+        self.assertEqual(self.search("айф"), [self.in_name])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.in_name.name_uz = "Samsung S24"
+        self.in_name.name_ru = "Самсунг"
+        self.in_name.save()
+        self.assertEqual(self.search("samsung"), [self.in_name])
+
+        self.in_name.delete()
+        self.assertEqual(self.search("samsung"), [])
+
+    def test_ad_list_search_keeps_rank_order(self):
+        response = self.client.get(reverse("store:ad-list"), {"search": "iphone"})
+
+        self.assertEqual(
+            [ad["id"] for ad in response.data["results"]],
+            [self.in_name.id, self.in_description.id],
+        )
+
+
+class AutoCompleteIndexTests(APITestCase):
+
+    def setUp(self):
+        seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(
+            name_uz="Telefonlar", name_ru="Телефоны", icon="category_icons/phone.png"
+        )
+        self.ad = Ad.objects.create(
+            name_uz="iPhone 15 Pro",
+            name_ru="Айфон 15 Про",
+            description="Yangi",
+            category=self.category,
+            price=100000,
+            seller=seller,
+            status="active",
+        )
+        self.popular = PopularSearch.objects.create(name_uz="Televizor")
+        autocomplete_index.build()
+
+    def test_prefix_search_without_queries(self):
+        with self.assertNumQueries(0):
+            results = autocomplete_index.search("tele", language="uz")
+
+        self.assertEqual(
+            [(r["type"], r["id"]) for r in results],
+            [("category", self.category.id), ("popular", self.popular.id)],
+        )
+        self.assertEqual(results[0]["icon"], "/media/category_icons/phone.png")
+
+    def test_word_prefix_and_language(self):
+        self.assertEqual(
+            [r["name"] for r in autocomplete_index.search("про", language="ru")],
+            ["Айфон 15 Про"],
+        )
+        self.assertEqual(
+            [r["name"] for r in autocomplete_index.search("15 p", language="uz")],
+            ["iPhone 15 Pro"],
+        )
+
+    def test_index_follows_signals(self):
+        self.ad.status = "inactive"
+        self.ad.save()
+        self.assertEqual(autocomplete_index.search("iphone", language="uz"), [])
+
+        self.category.name_uz = "Smartfonlar"
+        self.category.save()
+        self.assertEqual(autocomplete_index.search("telefon", language="uz"), [])
+        self.assertEqual(len(autocomplete_index.search("smart", language="uz")), 1)
+
+        self.popular.delete()
+        self.assertEqual(autocomplete_index.search("telev", language="uz"), [])
+
+    @override_settings(AUTOCOMPLETE_REBUILD_INTERVAL=1)
+    def test_rebuild_runs_in_background(self):
+        data = autocomplete_index.load()
+        started, release = threading.Event(), threading.Event()
+
+        def load():
+            started.set()
+            release.wait(5)
+            return data
+
+        autocomplete_index.built_at -= 10
+        with patch.object(autocomplete_index, "load", load):
+            with self.assertNumQueries(0):
+                results = autocomplete_index.search("telev", language="uz")
+            self.assertEqual(len(results), 1)
+            self.assertTrue(started.wait(5))
+            # Qurish paytidagi o'zgarish yangi indeksga ham o'tadi
+            self.popular.delete()
+            release.set()
+            autocomplete_index._refresh_thread.join(5)
+
+        self.assertEqual(autocomplete_index.search("telev", language="uz"), [])
+        self.assertEqual(len(autocomplete_index.search("tele", language="uz")), 1)
+
+    def test_long_prefix(self):
+        # TERM_LENGTH dan uzun so'rov nomning o'zi bilan tekshiriladi
+        self.ad.name_uz = "Apple iPhone 15 Pro Max 256GB titanium natural yangi"
+        self.ad.save()
+
+        self.assertEqual(
+            [
+                r["id"]
+                for r in autocomplete_index.search(
+                    "iphone 15 pro max 256gb titanium natural yan", language="uz"
+                )
+            ],
+            [self.ad.id],
+        )
+        self.assertEqual(
+            autocomplete_index.search(
+                "iphone 15 pro max 256gb titanium natural eski", language="uz"
+            ),
+            [],
+        )
+
+    def test_endpoint(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("store:autocomplete-search"),
+                {"q": "айф"},
+                HTTP_ACCEPT_LANGUAGE="ru",
+            )
+
+        self.assertEqual(
+            [(r["id"], r["name"], r["type"]) for r in response.data["results"]],
+            [(self.ad.id, "Айфон 15 Про", "product")],
+        )
+
+
+class AdKeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+        for i in range(7):
+            Ad.objects.create(
+                name=f"Phone {i}",
+                description="Phone",
+                category=self.category,
+                price=100000 + (i % 3),
+                seller=self.seller,
+                status="active",
+                is_top=i in (2, 5),
+            )
+        # Bir xil vaqt: tartib faqat `id` bilan ajraladi
+        Ad.objects.update(published_at=timezone.now())
+        self.url = reverse("store:ad-list")
+
+    def walk(self, params):
+        ids = []
+        response = self.client.get(self.url, {"cursor": "", **params})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(ad["id"] for ad in response.data["results"])
+            if not response.data["next"]:
+                return ids, response
+            response = self.client.get(response.data["next"])
+
+    def test_cursor_pages_match_offset_order(self):
+        for ordering in ("", "price", "-view_count"):
+            params = {"page_size": 3}
+            if ordering:
+                params["ordering"] = ordering
+            ids, _ = self.walk(params)
+            offset_response = self.client.get(self.url, {**params, "page_size": 100})
+            expected = [ad["id"] for ad in offset_response.data["results"]]
+            self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(self.url, {"cursor": "", "page_size": 3})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_count_is_optional(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"cursor": ""})
+        self.assertNotIn("count", response.data)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+
+        response = self.client.get(self.url, {"cursor": "", "with_count": 1})
+        self.assertEqual(response.data["count"], 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        for data in (
+            {"p": ["notabool", "x", "y"], "r": False},
+            {"p": ["1"], "r": False},
+            {"p": "123", "r": False},
+            {"p": [True, "2026-01-01T00:00:00Z", None], "r": False},
+        ):
+            token = urlsafe_b64encode(json.dumps(data).encode()).decode()
+            response = self.client.get(self.url, {"cursor": token})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CachedCountPaginationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            full_name="Buyer", phone_number="+998901111111", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+        self.ads = [self.create_ad(100000 + i) for i in range(3)]
+
+    def create_ad(self, price):
+        return Ad.objects.create(
+            name=f"Phone {price}",
+            description="Phone",
+            category=self.category,
+            price=price,
+            seller=self.user,
+            status="active",
+        )
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        count_queries = [q for q in queries if "COUNT(" in q["sql"]]
+        return response, count_queries
+
+    def test_unfiltered_feed_uses_category_counters(self):
+        response, count_queries = self.get(reverse("store:ad-list"))
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(count_queries, [])
+
+    def test_filtered_count_is_cached_until_ads_change(self):
+        url = reverse("store:ad-list")
+        params = {"min_price": 100001}
+
+        response, count_queries = self.get(url, params)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(count_queries), 1)
+
+        response, count_queries = self.get(url, params)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(count_queries, [])
+
+        self.create_ad(200000)
+        response, count_queries = self.get(url, params)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(count_queries), 1)
+
+    def test_favorite_count_expires_on_write(self):
+        self.client.force_authenticate(self.user)
+        url = reverse("store:my-favorite-list")
+        FavoriteProduct.objects.create(user=self.user, ad=self.ads[0])
+        self.get(url)
+
+        FavoriteProduct.objects.create(user=self.user, ad=self.ads[1])
+        response, _ = self.get(url)
+
+        self.assertEqual(response.data["count"], 2)
+
+
+class CategoryResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+
+    def test_product_count_change_invalidates_category_list(self):
+        child = Category.objects.create(name="Smart", parent=self.category)
+        list_url = reverse("store:category-list")
+        tree_url = reverse("store:categories-with-children")
+        self.client.get(list_url)
+        self.client.get(tree_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ad.objects.create(
+                name="Phone",
+                description="Phone",
+                category=child,
+                price=100000,
+                seller=self.user,
+                status="active",
+            )
+
+        categories = self.client.get(list_url).data["results"]
+        roots = self.client.get(tree_url).data
+
+        counts = {
+            category["name"]: category["product_count"] for category in categories
+        }
+        self.assertEqual(counts, {"Phones": 0, "Smart": 1})
+        self.assertEqual(roots[0]["children"][0]["product_count"], 1)
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Buyer", phone_number="+998901111111", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+        self.ad = Ad.objects.create(
+            name="Phone",
+            description="Phone",
+            category=self.category,
+            price=100000,
+            seller=self.user,
+            status="active",
+        )
+        self.url = reverse("store:ad-detail", kwargs={"slug": self.ad.slug})
+
+    def test_detail_not_modified_after_single_query(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+
+    def test_detail_etag_changes_with_photos_likes_and_language(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(
+            self.client.get(self.url, HTTP_ACCEPT_LANGUAGE="uz")["ETag"],
+            self.client.get(self.url, HTTP_ACCEPT_LANGUAGE="ru")["ETag"],
+        )
+
+        AdPhoto.objects.create(ad=self.ad, image="ads_photos/1.jpg", is_main=True)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(self.url)["ETag"]
+        FavoriteProduct.objects.create(user=self.user, ad=self.ad)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["is_liked"])
+
+    def test_list_weak_etag(self):
+        url = reverse("store:ad-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.ad.price = 90000
+        self.ad.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AdSlugTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+
+    def create_ad(self, name):
+        return Ad.objects.create(
+            name=name,
+            description="Phone",
+            category=self.category,
+            price=100000,
+            seller=self.user,
+            status="active",
+        )
+
+    def test_duplicate_names_use_single_lookup(self):
+        for _ in range(5):
+            self.create_ad("iPhone 13")
+
+        with CaptureQueriesContext(connection) as queries:
+            ad = self.create_ad("iPhone 13")
+
+        slug_lookups = [
+            q for q in queries if '"slug" =' in q["sql"] and "SELECT" in q["sql"]
+        ]
+        self.assertEqual(len(slug_lookups), 1)
+        self.assertEqual(ad.slug, f"iphone-13-{ad.guid.hex[:8]}")
+        self.assertEqual(Ad.objects.filter(slug__startswith="iphone-13").count(), 6)
+
+    def test_slug_fallback_and_length(self):
+        self.assertEqual(self.create_ad("Айфон").slug, "ad")
+        self.assertTrue(self.create_ad("Айфон").slug.startswith("ad-"))
+        self.assertLessEqual(len(self.create_ad("x" * 300).slug), 50)
+        self.assertLessEqual(len(self.create_ad("x" * 300).slug), 50)
+
+    def test_retries_when_slug_is_taken_concurrently(self):
+        self.create_ad("iPhone 13")
+
+        with patch.object(Ad, "generate_unique_slug", return_value="iphone-13"):
+            ad = self.create_ad("iPhone 13")
+
+        self.assertEqual(ad.slug, f"iphone-13-{ad.guid.hex[:8]}")
+
+
+class AdPhotoBulkTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+        self.client.force_authenticate(self.user)
+
+    def photo_urls(self, count, start=0):
+        return [f"https://cdn.example.com/{i}.jpg" for i in range(start, start + count)]
+
+    def create_ad(self, photos):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("store:ad-create"),
+                {
+                    "name": "Phone",
+                    "description": "Phone",
+                    "category": self.category.id,
+                    "price": 100000,
+                    "photos": photos,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Ad.objects.get(pk=response.data["id"]), len(queries)
+
+    def test_create_query_count_does_not_grow_with_photos(self):
+        _, one_photo_queries = self.create_ad(self.photo_urls(1))
+        ad, ten_photo_queries = self.create_ad(self.photo_urls(10))
+
+        self.assertEqual(one_photo_queries, ten_photo_queries)
+        self.assertEqual(
+            list(ad.photos.order_by("order").values_list("order", "is_main")),
+            [(i, i == 0) for i in range(10)],
+        )
+
+    def test_update_diffs_photos(self):
+        ad, _ = self.create_ad(self.photo_urls(3))
+        kept = ad.photos.get(image=self.photo_urls(1, start=2)[0])
+
+        response = self.client.patch(
+            reverse("store:my-ad-detail", kwargs={"pk": ad.pk}),
+            {"photos": self.photo_urls(2, start=2)},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        photos = list(ad.photos.order_by("order"))
+        self.assertEqual(photos[0].pk, kept.pk)
+        self.assertTrue(photos[0].is_main)
+        self.assertEqual(
+            [photo.image.name for photo in photos], self.photo_urls(2, start=2)
+        )
+        self.assertEqual(ad.photos.filter(is_main=True).count(), 1)
+
+
+class AdMainImageTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Seller", phone_number="+998902222222", password="testpass123"
+        )
+        self.category = Category.objects.create(name="Phones")
+        self.ad = Ad.objects.create(
+            name="Phone",
+            description="Phone",
+            category=self.category,
+            price=100000,
+            seller=self.user,
+            status="active",
+        )
+
+    def test_photo_changes_update_main_image(self):
+        # Worker ishlamasa ham invariant saqlanadi
+        first = AdPhoto.objects.create(ad=self.ad, image="ads_photos/1.jpg", order=0)
+        AdPhoto.objects.create(ad=self.ad, image="ads_photos/2.jpg", order=1)
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.main_image.name, "ads_photos/1.jpg")
+        self.assertEqual(self.ad.photos.filter(is_main=True).count(), 1)
+
+        AdPhoto.objects.create(
+            ad=self.ad, image="ads_photos/3.jpg", order=2, is_main=True
+        )
+        self.assertEqual(
+            list(self.ad.photos.filter(is_main=True).values_list("image", flat=True)),
+            ["ads_photos/3.jpg"],
+        )
+
+        AdPhoto.objects.get(image="ads_photos/3.jpg").delete()
+        first.delete()
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.main_image.name, "ads_photos/2.jpg")
+        self.assertEqual(self.ad.photos.filter(is_main=True).count(), 1)
+
+    def test_stale_instance_save_keeps_main_image(self):
+        AdPhoto.objects.create(ad=self.ad, image="ads_photos/1.jpg", is_main=True)
+        self.ad.price = 90000
+        self.ad.save()
+
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.main_image.name, "ads_photos/1.jpg")
+
+    def test_list_does_not_query_photos(self):
+        AdPhoto.objects.create(ad=self.ad, image="ads_photos/1.jpg", is_main=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("store:ad-list"))
+
+        self.assertTrue(response.data["results"][0]["photo"].endswith("1.jpg"))
+        self.assertFalse(any("store_adphoto" in q["sql"] for q in queries))
+
+    def test_backfill_command(self):
+        AdPhoto.objects.create(ad=self.ad, image="ads_photos/1.jpg", is_main=True)
+        Ad.objects.update(main_image="")
+
+        call_command("backfill_main_images", stdout=io.StringIO())
+
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.main_image.name, "ads_photos/1.jpg")
+
+
+@override_settings(SEARCH_COUNT_BUFFER={"FLUSH_INTERVAL": None})
+class SearchCounterTests(APITestCase):
+
+    def setUp(self):
+        search_counter.store.drain()
+        popular_search_counter.store.drain()
+        self.category = Category.objects.create(name="Phones")
+        self.url = reverse(
+            "store:search-count-increase", kwargs={"id": self.category.id}
+        )
+
+    def test_endpoint_buffers_increments(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["search_count"], 2)
+        self.assertEqual(response.data["category"]["id"], self.category.id)
+        self.assertFalse(
+            any(q["sql"].lstrip().upper().startswith("UPDATE") for q in queries)
+        )
+
+        search_counter.flush()
+        self.assertEqual(SearchCount.objects.get().search_count, 2)
+
+    def test_unknown_category(self):
+        url = reverse("store:search-count-increase", kwargs={"id": 0})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_instances_do_not_lose_counts(self):
+        first = PopularSearch.objects.create(name="iphone")
+        second = PopularSearch.objects.get(pk=first.pk)
+
+        first.increment()
+        second.increment()
+        popular_search_counter.flush()
+        second.is_active = False
+        second.save()
+
+        self.assertEqual(PopularSearch.objects.get().search_count, 2)
+
+    def test_popular_searches_rank_by_decayed_score(self):
+        month_ago = timezone.now() - timedelta(days=30)
+        old = PopularSearch.objects.create(name="old")
+        fresh = PopularSearch.objects.create(name="fresh")
+        PopularSearch.objects.filter(pk=old.pk).update(
+            search_count=10, trend_score=trend_increment(10, month_ago)
+        )
+        for _ in range(3):
+            fresh.increment()
+        popular_search_counter.flush()
+
+        self.assertEqual(list(PopularSearch.objects.all()), [fresh, old])
+        self.assertAlmostEqual(
+            decayed_score(PopularSearch.objects.get(pk=old.pk).trend_score),
+            10 / 2 ** (30 / 7),
+        )
+
+    @override_settings(SEARCH_TREND_HALF_LIFE_DAYS=0.5)
+    def test_trend_score_does_not_overflow(self):
+        far_future = timezone.now() + timedelta(days=365 * 50)
+        search = PopularSearch.objects.create(name="phone")
+        for _ in range(3):
+            search.increment()
+        with patch("store.search_counter.timezone.now", return_value=far_future):
+            popular_search_counter.flush()
+            search.increment()
+            popular_search_counter.flush()
+
+        search.refresh_from_db()
+        self.assertEqual(search.search_count, 4)
+        self.assertAlmostEqual(decayed_score(search.trend_score, far_future), 4)
+
+
+@override_settings(
+    SEARCH_COUNT_BUFFER={"FLUSH_INTERVAL": None},
+    TRENDING_SEARCHES={"FLUSH_INTERVAL": None, "TOP_K": 2, "CANDIDATE_MIN_COUNT": 2},
+)
+class TrendingSearchTests(APITestCase):
+
+    def setUp(self):
+        query_log.store.drain()
+        popular_search_counter.store.drain()
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  iPhone   15, Pro! "), "iphone 15 pro")
+        self.assertIsNone(normalize_query("a"))
+        self.assertIsNone(normalize_query("?!"))
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        store = SpaceSavingStore(capacity=3)
+        for i in range(200):
+            store.add("hot")
+            store.add(f"cold-{i}")
+
+        counts = store.drain()
+        self.assertLessEqual(len(counts), 3)
+        self.assertEqual(counts["hot"], 200)
+        self.assertEqual(store.drain(), {})
+
+    def test_flush_upserts_top_terms_per_language(self):
+        curated = PopularSearch.objects.create(name_uz="iPhone", name_ru="iPhone")
+        for _ in range(3):
+            query_log.record("iphone", language="uz")
+            query_log.record("Velosiped", language="uz")
+        query_log.record("divan", language="uz")
+        for _ in range(2):
+            query_log.record("телефон", language="ru")
+
+        query_log.flush()
+
+        curated.refresh_from_db()
+        self.assertEqual(curated.search_count, 3)
+        self.assertFalse(curated.is_auto)
+        bike = PopularSearch.objects.get(name_uz="velosiped")
+        self.assertTrue(bike.is_auto)
+        self.assertFalse(bike.is_active)
+        self.assertEqual(bike.search_count, 3)
+        self.assertEqual(
+            PopularSearch.objects.get(name_ru="телефон").search_count, 2
+        )
+        self.assertFalse(PopularSearch.objects.filter(name_uz="divan").exists())
+
+    def test_candidates_activate_after_total_min_count(self):
+        options = {"FLUSH_INTERVAL": None, "CANDIDATE_MIN_COUNT": 2, "MIN_COUNT": 5}
+        with override_settings(TRENDING_SEARCHES={**options, "ACTIVATE": True}):
+            # Har bir yozish (jarayon) chegaradan past, jami esa yetadi
+            for _ in range(3):
+                query_log.record("velosiped", language="uz")
+            query_log.flush()
+            bike = PopularSearch.objects.get(name_uz="velosiped")
+            self.assertFalse(bike.is_active)
+
+            for _ in range(3):
+                query_log.record("velosiped", language="uz")
+            query_log.flush()
+            bike.refresh_from_db()
+            self.assertTrue(bike.is_active)
+
+            PopularSearch.objects.filter(pk=bike.pk).update(
+                is_active=False, is_auto=False
+            )
+            for _ in range(3):
+                query_log.record("velosiped", language="uz")
+            query_log.flush()
+            bike.refresh_from_db()
+            self.assertFalse(bike.is_active)
+
+    def test_admin_activation_refreshes_popular_searches(self):
+        from django.contrib.admin.sites import site
+
+        from .admin import PopularSearchAdmin
+
+        cache.clear()
+        search = PopularSearch.objects.create(
+            name_uz="velosiped", name_ru="велосипед", is_active=False, is_auto=True
+        )
+        autocomplete_index.build()
+        url = reverse("store:popular-search")
+        self.assertEqual(self.client.get(url).data["results"], [])
+        model_admin = PopularSearchAdmin(PopularSearch, site)
+
+        with patch.object(PopularSearchAdmin, "message_user"):
+            model_admin.make_active(None, PopularSearch.objects.filter(pk=search.pk))
+
+        search.refresh_from_db()
+        self.assertFalse(search.is_auto)
+        results = self.client.get(url).data["results"]
+        self.assertEqual([result["id"] for result in results], [search.pk])
+        suggestions = autocomplete_index.search("velo", language="uz")
+        self.assertEqual(
+            [(r["type"], r["id"]) for r in suggestions], [("popular", search.pk)]
+        )
+
+    def test_ad_search_records_first_page_only(self):
+        url = reverse("store:ad-list")
+        self.client.get(url, {"search": "Velosiped"})
+        self.client.get(url, {"search": "Velosiped", "page": 2})
+
+        self.assertEqual(list(query_log.store.drain().values()), [1])
+
+
+class SavedSearchMatchTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Buyer", phone_number="+998903333333", password="testpass123"
+        )
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998904444444", password="testpass123"
+        )
+        self.region = Region.objects.create(name="Tashkent")
+        self.other_region = Region.objects.create(name="Samarkand")
+        self.parent = Category.objects.create(name="Electronics")
+        self.category = Category.objects.create(name="Phones", parent=self.parent)
+
+        def saved_search(**kwargs):
+            return SavedSearch.objects.create(user=self.user, **kwargs)
+
+        self.matching = [
+            saved_search(category=self.parent),
+            saved_search(region=self.region, search_query="iPhone"),
+            saved_search(category=self.category, price_min=500, price_max=1500),
+        ]
+        self.other = [
+            saved_search(region=self.other_region),
+            saved_search(search_query="samsung"),
+            saved_search(category=self.category, price_min=1500),
+            SavedSearch.objects.create(user=self.seller),
+        ]
+
+    def create_ad(self, status="active"):
+        return Ad.objects.create(
+            name="iPhone 15",
+            description="Yangi telefon",
+            category=self.category,
+            region=self.region,
+            price=1000,
+            seller=self.seller,
+            status=status,
+        )
+
+    def run_tasks(self):
+        call_command("run_tasks", once=True, workers=1, stdout=io.StringIO())
+
+    def matched_ids(self):
+        return set(SavedSearchMatch.objects.values_list("saved_search_id", flat=True))
+
+    def test_activation_matches_candidates(self):
+        ad = self.create_ad(status="pending")
+        self.run_tasks()
+        self.assertFalse(SavedSearchMatch.objects.exists())
+
+        ad.status = "active"
+        ad.save()
+        self.run_tasks()
+
+        self.assertEqual(self.matched_ids(), {search.pk for search in self.matching})
+        self.assertEqual(
+            set(SavedSearchMatch.objects.values_list("user_id", flat=True)),
+            {self.user.pk},
+        )
+
+    def test_admin_activation_runs_save_hooks(self):
+        from django.contrib.admin.sites import site
+
+        from .admin import AdAdmin
+
+        ad = self.create_ad(status="pending")
+        yesterday = timezone.now() - timedelta(days=1)
+        Ad.objects.filter(pk=ad.pk).update(updated_time=yesterday)
+        self.run_tasks()
+        model_admin = AdAdmin(Ad, site)
+
+        with patch.object(AdAdmin, "message_user"):
+            model_admin.make_active(None, Ad.objects.filter(pk=ad.pk))
+        self.run_tasks()
+
+        ad.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.active_ad_count, 1)
+        self.assertGreater(ad.updated_time, yesterday)
+        self.assertEqual(self.matched_ids(), {search.pk for search in self.matching})
+        self.assertEqual(
+            [result["id"] for result in autocomplete_index.search("iphone")], [ad.pk]
+        )
+
+    def test_backlog_is_idempotent(self):
+        self.create_ad()
+        SavedSearchMatch.objects.all().delete()
+
+        call_command("match_saved_searches", batch_size=1, stdout=io.StringIO())
+        call_command("match_saved_searches", stdout=io.StringIO())
+
+        self.assertEqual(SavedSearchMatch.objects.count(), len(self.matching))
+
+    def test_feed(self):
+        ad = self.create_ad()
+        self.run_tasks()
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(reverse("store:saved-search-matches"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], len(self.matching))
+        self.assertEqual(response.data["results"][0]["product"]["id"], ad.id)
+
+        response = self.client.post(reverse("store:saved-search-matches-seen"))
+        self.assertEqual(response.data["updated"], len(self.matching))
+        self.assertFalse(SavedSearchMatch.objects.filter(is_seen=False).exists())
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """REQUEST_METRICS["BUDGETS"] dagi chegaralar sahifa hajmiga bog'liq emas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Buyer", phone_number="+998905555555", password="testpass123"
+        )
+        self.seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998906666666", password="testpass123"
+        )
+        region = Region.objects.create(name="Tashkent")
+        district = District.objects.create(name="Chilonzor", region=region)
+        parent = Category.objects.create(name="Electronics")
+        category = Category.objects.create(name="Phones", parent=parent)
+        SavedSearch.objects.create(user=self.user, category=parent)
+        for i in range(12):
+            self.ad = Ad.objects.create(
+                name=f"Phone {i}",
+                description="Phone",
+                category=category,
+                region=region,
+                district=district,
+                price=100000 + i,
+                seller=self.seller,
+                status="active",
+            )
+            AdPhoto.objects.create(
+                ad=self.ad, image=f"ads_photos/{self.ad.id}.jpg", is_main=True
+            )
+            FavoriteProduct.objects.create(user=self.user, ad=self.ad)
+        call_command("run_tasks", once=True, workers=1, stdout=io.StringIO())
+        cache.clear()
+
+    def get(self, view_name, **kwargs):
+        with self.assertQueryBudget(view_name):
+            response = self.client.get(reverse(view_name, kwargs=kwargs))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_public_endpoints(self):
+        self.get("store:ad-list")
+        self.get("store:ad-detail", slug=self.ad.slug)
+        self.get("store:category-list")
+        self.get("store:categories-with-children")
+        self.get("store:popular-search")
+
+    def test_user_endpoints(self):
+        self.client.force_authenticate(self.user)
+        self.get("store:ad-list")
+        self.get("store:my-favorite-list")
+        self.get("store:saved-search-matches")
+
+        self.client.force_authenticate(self.seller)
+        self.get("store:my-ad-list")
+
+
+class DatasetGeneratorTests(APITestCase):
+
+    def generate(self, **options):
+        call_command(
+            "generate_dataset",
+            users=30,
+            categories=20,
+            ads=120,
+            favorites=200,
+            saved_searches=20,
+            batch_size=50,
+            stdout=io.StringIO(),
+            **options,
+        )
+
+    def test_generates_consistent_translated_rows(self):
+        self.generate()
+
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Ad.objects.count(), 120)
+        self.assertEqual(SavedSearch.objects.count(), 20)
+        self.assertTrue(FavoriteProduct.objects.exists())
+        self.assertFalse(Ad.objects.filter(name_uz="").exists())
+        self.assertFalse(Ad.objects.filter(name_ru="").exists())
+        self.assertFalse(Category.objects.filter(path="").exists())
+        self.assertTrue(Category.objects.filter(parent__parent__isnull=False).exists())
+
+        active = Ad.objects.filter(status="active").count()
+        self.assertEqual(
+            sum(Category.objects.values_list("active_ad_count", flat=True)), active
+        )
+        self.assertEqual(
+            sum(
+                Category.objects.filter(parent=None).values_list(
+                    "subtree_ad_count", flat=True
+                )
+            ),
+            active,
+        )
+        with_photos = Ad.objects.exclude(main_image="")
+        self.assertEqual(
+            with_photos.count(),
+            AdPhoto.objects.filter(is_main=True).count(),
+        )
+        self.assertEqual(
+            search_ads(Ad.objects.all(), "yangi").count(),
+            Ad.objects.filter(name_uz__contains="yangi").count(),
+        )
+
+    def test_same_seed_gives_same_data(self):
+        self.generate(seed=7)
+        first = list(Ad.objects.order_by("pk").values_list("slug", "price"))
+        with self.assertRaises(CommandError):
+            self.generate(seed=7)
+
+        User.objects.filter(phone_number__startswith="+99800").delete()
+        Category.objects.all().delete()
+        Region.objects.all().delete()
+        self.generate(seed=7)
+
+        self.assertEqual(
+            list(Ad.objects.order_by("pk").values_list("slug", "price")), first
+        )
+
+
+class BenchmarkTests(APITestCase):
+
+    def test_reports_every_endpoint_without_errors(self):
+        call_command(
+            "generate_dataset",
+            users=20,
+            categories=10,
+            ads=60,
+            favorites=50,
+            saved_searches=0,
+            stdout=io.StringIO(),
+        )
+        output = tempfile.NamedTemporaryFile(suffix=".json")
+        call_command(
+            "benchmark",
+            requests=5,
+            warmup=1,
+            memory_samples=1,
+            output=output.name,
+            stderr=io.StringIO(),
+        )
+        with open(output.name) as file:
+            report = json.load(file)
+
+        self.assertEqual(report["meta"]["dataset"]["ads"], 60)
+        self.assertIn("ad-detail", report["endpoints"])
+        for name, row in report["endpoints"].items():
+            self.assertEqual(row["errors"], 0, name)
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+            self.assertGreater(row["queries_avg"] + row["throughput_rps"], 0)
+
+        self.assertEqual(compare(report, report), [])
+
+    def test_compares_conn_max_age_values(self):
+        call_command(
+            "generate_dataset",
+            users=5,
+            categories=5,
+            ads=10,
+            favorites=0,
+            saved_searches=0,
+            stdout=io.StringIO(),
+        )
+        conn_max_age = connection.settings_dict["CONN_MAX_AGE"]
+        output = tempfile.NamedTemporaryFile(suffix=".json")
+        call_command(
+            "benchmark",
+            only="ad-list",
+            conn_max_age="0,60",
+            requests=2,
+            warmup=0,
+            memory_samples=0,
+            output=output.name,
+            stderr=io.StringIO(),
+        )
+        with open(output.name) as file:
+            endpoints = json.load(file)["endpoints"]
+
+        self.assertEqual(
+            sorted(endpoints),
+            ["ad-list@conn_max_age=0", "ad-list@conn_max_age=60"],
+        )
+        self.assertEqual(connection.settings_dict["CONN_MAX_AGE"], conn_max_age)
+
+    def test_compare_flags_slower_endpoints(self):
+        row = {"p95_ms": 10.0, "queries_max": 2, "errors": 0}
+        baseline = {"endpoints": {"ad-list": row}}
+        report = {"endpoints": {"ad-list": {**row, "p95_ms": 15.0, "queries_max": 3}}}
+
+        self.assertEqual(len(compare(report, baseline, threshold=0.2)), 2)
+        self.assertEqual(compare(baseline, baseline), [])
+        self.assertEqual(compare(report, {"endpoints": {}}), [])
+
+    def test_requires_generated_dataset(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark", stdout=io.StringIO())
+
+
+class AsyncViewTests(APITestCase):
+    """Async nusxalar sync endpointlar bilan bir xil javob qaytaradi."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Buyer", phone_number="+998905555555", password="testpass123"
+        )
+        seller = User.objects.create_user(
+            full_name="Seller", phone_number="+998906666666", password="testpass123"
+        )
+        region = Region.objects.create(name="Tashkent")
+        parent = Category.objects.create(name="Electronics")
+        self.category = Category.objects.create(name="Phones", parent=parent)
+        for i in range(25):
+            self.ad = Ad.objects.create(
+                name=f"Phone {i}",
+                description="Smartphone",
+                category=self.category,
+                region=region,
+                price=100000 + i,
+                seller=seller,
+                status="active",
+            )
+        FavoriteProduct.objects.create(user=self.user, ad=self.ad)
+        call_command("run_tasks", once=True, workers=1, stdout=io.StringIO())
+        cache.clear()
+
+    def assertSameResponse(self, view_name, params=None, kwargs=None, ignore=()):
+        sync = self.client.get(reverse(f"store:{view_name}", kwargs=kwargs), params)
+        response = self.client.get(
+            reverse(f"store:async-{view_name}", kwargs=kwargs), params
+        )
+        self.assertEqual(response.status_code, sync.status_code)
+        expected = json.loads(
+            sync.content.decode().replace("/list/ads/", "/async/list/ads/")
+        )
+        data = response.json()
+        for key in ignore:
+            expected.pop(key)
+            data.pop(key)
+        self.assertEqual(data, expected)
+        return data
+
+    def test_ad_list_matches_sync_view(self):
+        self.assertSameResponse("ad-list")
+        data = self.assertSameResponse(
+            "ad-list", {"page": 2, "page_size": 10, "min_price": 100010}
+        )
+        self.assertEqual(data["count"], 15)
+        self.assertEqual(len(data["results"]), 5)
+        self.assertIsNotNone(data["previous"])
+        self.assertSameResponse(
+            "ad-list", {"category": self.category.parent_id, "ordering": "price"}
+        )
+        self.assertSameResponse("ad-list", {"search": "phone", "page_size": 5})
+        self.assertSameResponse("ad-list", {"page": 9})
+
+    def test_authenticated_detail_and_search(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        data = self.assertSameResponse(
+            "ad-detail", kwargs={"slug": self.ad.slug}, ignore=("view_count",)
+        )
+        self.assertTrue(data["is_liked"])
+        self.assertSameResponse("ad-detail", kwargs={"slug": "missing"})
+        self.assertSameResponse("category-product-search", {"q": "phone"})
+        self.assertSameResponse("autocomplete-search", {"q": "pho"})
+        self.assertSameResponse("categories-with-children")
+
+    async def test_served_by_async_handler(self):
+        url = reverse("store:async-ad-list")
+        response = await self.async_client.get(url, {"page_size": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertTrue(async_views.AdListView.view_is_async)
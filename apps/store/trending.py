@@ -0,0 +1,220 @@
+import heapq
+import threading
+
+from django.conf import settings
+from django.db.models.functions import Lower
+from django.utils import translation
+
+from common.utils.counter_buffer import DEFAULTS, CounterBuffer
+
+from .search.base import tokenize
+from .search_counter import popular_search_counter
+
+MAX_QUERY_LENGTH = 200
+
+
+def normalize_query(query, min_length=2):
+    """Qidiruvni kichik harfli so'zlar ketma-ketligiga keltiradi (juda qisqasi - None)."""
+    term = " ".join(tokenize(query))[:MAX_QUERY_LENGTH].strip()
+    if len(term) < min_length:
+        return None
+    return term
+
+
+class SpaceSavingStore:
+    """
+    Space-Saving sketch: eng ko'p `capacity` ta kalitni kuzatadi. Joy tugasa
+    eng kichik hisobli kalit chiqariladi va yangisi uning hisobini meros oladi
+    (`errors` da saqlanadi). `drain` kafolatlangan sonni (count - error) qaytaradi,
+    shuning uchun bazaga hech qachon ortiqcha qo'shilmaydi.
+    """
+
+    shared = False
+
+    def __init__(self, namespace=None, capacity=1000):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._counts = {}
+        self._errors = {}
+        # Eski yozuvlar o'chirilmaydi, chiqarishda hisob mos kelmasa tashlanadi
+        self._heap = []
+
+    def add(self, key, amount=1):
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= self.capacity:
+                evicted, floor = self._pop_min()
+                del self._counts[evicted]
+                del self._errors[evicted]
+                self._counts[key] = floor
+                self._errors[key] = floor
+            self._counts[key] = self._counts.get(key, 0) + amount
+            self._errors.setdefault(key, 0)
+            heapq.heappush(self._heap, (self._counts[key], key))
+            if len(self._heap) > 4 * self.capacity:
+                self._heap = [(count, k) for k, count in self._counts.items()]
+                heapq.heapify(self._heap)
+            return len(self._counts)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self._counts.get(key) == count:
+                return key, count
+
+    def get(self, key):
+        with self._lock:
+            return self._counts.get(key, 0) - self._errors.get(key, 0)
+
+    def drain(self):
+        with self._lock:
+            counts, errors = self._counts, self._errors
+            self._reset()
+        return {
+            key: count - errors[key]
+            for key, count in counts.items()
+            if count > errors[key]
+        }
+
+
+class QueryLog(CounterBuffer):
+    """
+    Foydalanuvchi qidiruvlarini (til, normallashgan so'rov) kaliti bilan
+    sketchda yig'adi va davriy ravishda har bir til bo'yicha eng ko'p
+    `TOP_K` tasini PopularSearch ga yozadi. So'rovlarning o'zi saqlanmaydi.
+
+    Yangi so'rov nofaol (is_auto) yozuv sifatida qo'shiladi. `ACTIVATE`
+    yoqilgan bo'lsa, u barcha jarayonlar bo'yicha bazada jami `MIN_COUNT`
+    marta qidirilgach faollashadi; admin o'zgartirgan yozuvlarga tegilmaydi.
+    """
+
+    settings_name = "TRENDING_SEARCHES"
+    namespace = "trending_searches"
+    defaults = {
+        **DEFAULTS,
+        "ENABLED": True,
+        "STORE": "store.trending.SpaceSavingStore",
+        "STORE_OPTIONS": {"capacity": 1000},
+        "FLUSH_INTERVAL": 300,
+        # Sketch hajmi cheklangan, shuning uchun faqat vaqt bo'yicha yoziladi
+        "FLUSH_THRESHOLD": float("inf"),
+        "TOP_K": 20,
+        "MIN_LENGTH": 2,
+        # Bitta yozishda shuncha marta qidirilgan so'rov nomzod sifatida qo'shiladi
+        "CANDIDATE_MIN_COUNT": 3,
+        "MIN_COUNT": 100,
+        "ACTIVATE": False,
+    }
+
+    def record(self, query, language=None):
+        options = self.options
+        if not options["ENABLED"]:
+            return
+        term = normalize_query(query, options["MIN_LENGTH"])
+        if term is None:
+            return
+        super().record((self.get_language(language), term))
+
+    def record_request(self, request, query):
+        """Keyingi sahifalarni o'tkazib yuboradi: bitta qidiruv bir marta sanaladi."""
+        params = request.query_params
+        if params.get("cursor") or params.get("page", "1") not in ("", "1"):
+            return
+        self.record(query)
+
+    @staticmethod
+    def get_language(language=None):
+        languages = settings.MODELTRANSLATION_LANGUAGES
+        language = (language or translation.get_language() or "").split("-")[0]
+        if language in languages:
+            return language
+        return settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+
+    def write(self, counts):
+        terms_by_language = {}
+        for (language, term), amount in counts.items():
+            terms_by_language.setdefault(language, {})[term] = amount
+
+        options = self.options
+        search_counts = {}
+        created = False
+        for language, terms in terms_by_language.items():
+            top = dict(
+                sorted(terms.items(), key=lambda item: item[1], reverse=True)[
+                    : options["TOP_K"]
+                ]
+            )
+            found, new = self.upsert(language, top, options)
+            created = created or new
+            for term, pk in found.items():
+                search_counts[pk] = search_counts.get(pk, 0) + top[term]
+
+        if search_counts:
+            popular_search_counter.write(search_counts)
+            created = self.activate(list(search_counts), options) or created
+        if created:
+            from common.utils.response_cache import expire_response_cache
+
+            from .models import PopularSearch
+
+            expire_response_cache(PopularSearch)
+
+    def upsert(self, language, terms, options):
+        """Yetishmayotgan so'rovlarni yaratadi va {so'rov: pk} qaytaradi."""
+        from .models import PopularSearch
+
+        field = f"name_{language}"
+        existing = self.lookup(field, terms)
+        missing = [
+            term
+            for term, amount in terms.items()
+            if term not in existing and amount >= options["CANDIDATE_MIN_COUNT"]
+        ]
+        if not missing:
+            return existing, False
+        with translation.override(language):
+            PopularSearch.objects.bulk_create(
+                [
+                    PopularSearch(
+                        name=term,
+                        is_auto=True,
+                        is_active=False,
+                        **{field: term},
+                    )
+                    for term in missing
+                ],
+                ignore_conflicts=True,
+            )
+        return self.lookup(field, terms), True
+
+    @staticmethod
+    def activate(pks, options):
+        """Jami qidiruvlar soni chegaradan oshgan nomzodlarni faollashtiradi."""
+        from .models import PopularSearch
+
+        if not options["ACTIVATE"]:
+            return False
+        return bool(
+            PopularSearch.objects.filter(
+                pk__in=pks,
+                is_auto=True,
+                is_active=False,
+                search_count__gte=options["MIN_COUNT"],
+            ).update(is_active=True)
+        )
+
+    @staticmethod
+    def lookup(field, terms):
+        from .models import PopularSearch
+
+        # Qo'lda kiritilgan "iPhone" ham "iphone" so'roviga mos kelsin
+        return dict(
+            PopularSearch.objects.annotate(term=Lower(field))
+            .filter(term__in=list(terms))
+            .values_list("term", "pk")
+        )
+
+
+query_log = QueryLog()
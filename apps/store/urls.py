@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = "store"
 
@@ -64,6 +64,16 @@ urlpatterns = [
     path(
         "my-search/list/", views.SavedSearchListView.as_view(), name="saved-search-list"
     ),
+    path(
+        "my-search/matches/",
+        views.SavedSearchMatchListView.as_view(),
+        name="saved-search-matches",
+    ),
+    path(
+        "my-search/matches/seen/",
+        views.SavedSearchMatchSeenView.as_view(),
+        name="saved-search-matches-seen",
+    ),
     path(
         "my-search/<int:pk>/delete/",
         views.SavedSearchDeleteView.as_view(),
@@ -85,4 +95,26 @@ urlpatterns = [
         views.search_count_increase,
         name="search-count-increase",
     ),
+    # ASGI uchun async nusxalar
+    path(
+        "async/categories-with-childs/",
+        async_views.CategoryWithChildrenView.as_view(),
+        name="async-categories-with-children",
+    ),
+    path("async/list/ads/", async_views.AdListView.as_view(), name="async-ad-list"),
+    path(
+        "async/ads/<slug:slug>/",
+        async_views.AdDetailView.as_view(),
+        name="async-ad-detail",
+    ),
+    path(
+        "async/search/category-product/",
+        async_views.CategoryProductSearchView.as_view(),
+        name="async-category-product-search",
+    ),
+    path(
+        "async/search/complete/",
+        async_views.AutoCompleteSearchView.as_view(),
+        name="async-autocomplete-search",
+    ),
 ]
@@ -0,0 +1,95 @@
+import itertools
+import sqlite3
+import threading
+
+from django.db.models import F
+
+from common.utils.counter_buffer import CounterBuffer
+
+
+class SQLiteFileStore:
+    """
+    Bitta serverdagi barcha workerlar uchun umumiy lokal fayl. Kutilayotgan
+    kalitlar soni har `size_check_every` ta qo'shishda bir marta sanaladi,
+    oradagi `add()` lar oxirgi sanalgan sonni qaytaradi.
+    """
+
+    shared = True
+
+    def __init__(self, path, namespace="ad_views", size_check_every=100):
+        self.path = str(path)
+        self.table = namespace
+        self.size_check_every = size_check_every
+        self._adds = itertools.count(1)
+        self._size = 0
+        self._local = threading.local()
+        self._execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(id INTEGER PRIMARY KEY, amount INTEGER NOT NULL)"
+        )
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, sql, params=()):
+        return self._connection.execute(sql, params)
+
+    def add(self, key, amount=1):
+        self._execute(
+            f"INSERT INTO {self.table} (id, amount) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET amount = amount + excluded.amount",
+            (key, amount),
+        )
+        if next(self._adds) % self.size_check_every == 0:
+            (self._size,) = self._execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()
+        return self._size
+
+    def get(self, key):
+        row = self._execute(
+            f"SELECT amount FROM {self.table} WHERE id = ?", (key,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def drain(self):
+        self._execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._execute(f"SELECT id, amount FROM {self.table}").fetchall()
+            self._execute(f"DELETE FROM {self.table}")
+            self._execute("COMMIT")
+        except Exception:
+            self._execute("ROLLBACK")
+            raise
+        self._size = 0
+        return dict(rows)
+
+
+class ViewCountBuffer(CounterBuffer):
+    """
+    E'lon ko'rishlarini xotirada yig'ib, bazaga guruhlab yozadi:
+    bir xil qo'shimchaga ega e'lonlar bitta
+    `UPDATE ... SET view_count = view_count + n WHERE id IN (...)` bilan yangilanadi.
+    """
+
+    settings_name = "VIEW_COUNT_BUFFER"
+    namespace = "ad_views"
+
+    def write(self, counts):
+        from .models import Ad
+
+        batch_size = self.options["BATCH_SIZE"]
+        for amount, ad_ids in self.group_by_amount(counts).items():
+            for i in range(0, len(ad_ids), batch_size):
+                Ad.objects.filter(pk__in=ad_ids[i : i + batch_size]).update(
+                    view_count=F("view_count") + amount
+                )
+
+
+view_counter = ViewCountBuffer()
@@ -1,17 +1,20 @@
-from django.db.models import Q
+from django.db.models import Q, Sum
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import generics, status, filters
+from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
+from common.utils.response_cache import ResponseCacheMixin
+
 from .models import (
     Category,
     Ad,
     AdPhoto,
     FavoriteProduct,
     SavedSearch,
+    SavedSearchMatch,
     SearchCount,
     PopularSearch,
 )
@@ -24,88 +27,133 @@ from .serializers import (
     AdPhotoCreateSerializer,
     FavoriteProductSerializer,
     SavedSearchSerializer,
+    SavedSearchMatchSerializer,
     SearchCountSerializer,
     PopularSearchSerializer,
     SearchResultSerializer,
     AutoCompleteSerializer,
 )
-from .filters import AdFilter
+from .autocomplete import autocomplete_index
+from .conditional import ConditionalAdDetailMixin, ConditionalAdListMixin
+from .category_tree import get_category_tree
+from .filters import (
+    AdFilter,
+    AdOrderingFilter,
+    AdSearchFilter,
+    filter_category_subtrees,
+)
 from .permissions import IsOwnerOrReadOnly
-from .pagination import StandardResultsSetPagination, SmallResultsSetPagination
+from .pagination import (
+    AdFeedPagination,
+    CachedCountPagination,
+    SmallResultsSetPagination,
+)
+from .search import search_ads
+from .search_counter import search_counter
+from .trending import query_log
+from .view_counter import view_counter
 
 
 # Category Views
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(ResponseCacheMixin, generics.ListAPIView):
+    use_replica = True
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CachedCountPagination
+    cache_models = (Category,)
 
 
-class CategoryWithChildrenView(generics.ListAPIView):
-    queryset = Category.objects.filter(is_active=True, parent__isnull=True)
+class CategoryWithChildrenView(ResponseCacheMixin, generics.ListAPIView):
+    use_replica = True
     serializer_class = CategoryWithChildrenSerializer
     pagination_class = None
+    filter_backends = []
+    cache_models = (Category,)
 
     def get_queryset(self):
-        return Category.objects.filter(is_active=True, parent__isnull=True).order_by(
-            "order", "name"
-        )
+        return get_category_tree().roots()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["category_tree"] = get_category_tree()
+        return context
 
 
 class SubCategoryListView(generics.ListAPIView):
+    use_replica = True
     serializer_class = CategorySerializer
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["parent__id"]
+    filter_backends = []
 
     def get_queryset(self):
-        return Category.objects.filter(is_active=True, parent__isnull=False).order_by(
-            "order", "name"
+        tree = get_category_tree()
+        parent_id = self.request.query_params.get("parent__id")
+        if parent_id:
+            try:
+                return tree.children(int(parent_id))
+            except (ValueError, TypeError):
+                return []
+        return tree.sorted_categories(
+            category.id
+            for category in tree.nodes.values()
+            if category.parent_id is not None
         )
 
 
 # Ad Views
-class AdListView(generics.ListAPIView):
+class AdListView(ConditionalAdListMixin, generics.ListAPIView):
+    use_replica = True
     queryset = Ad.objects.filter(status="active")
     serializer_class = AdListSerializer
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        AdSearchFilter,
+        AdOrderingFilter,
     ]
     filterset_class = AdFilter
     search_fields = ["name", "description"]
     ordering_fields = ["published_at", "price", "view_count"]
     ordering = ["-is_top", "-published_at"]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = AdFeedPagination
+    unfiltered_params = {"page", "page_size", "ordering", "cursor", "with_count"}
 
     def get_queryset(self):
-        queryset = (
-            Ad.objects.filter(status="active")
-            .select_related("seller", "category", "region", "district")
-            .prefetch_related("photos")
-        )
+        queryset = Ad.objects.filter(status="active").for_list()
 
         category_ids = self.request.query_params.get("category_ids")
         if category_ids:
             try:
                 category_list = [int(x.strip()) for x in category_ids.split(",")]
-                queryset = queryset.filter(category_id__in=category_list)
             except (ValueError, TypeError):
-                pass
+                category_list = None
+            if category_list is not None:
+                queryset = filter_category_subtrees(queryset, category_list)
 
         return queryset
 
+    def get_fast_count(self):
+        # Filtrsiz lenta: faol e'lonlar soni kategoriya hisoblagichlarida bor
+        if set(self.request.query_params) - self.unfiltered_params:
+            return None
+        return (
+            Category.objects.aggregate(total=Sum("active_ad_count"))["total"] or 0
+        )
 
-class AdDetailView(generics.RetrieveAPIView):
-    queryset = Ad.objects.filter(status="active")
+
+class AdDetailView(ConditionalAdDetailMixin, generics.RetrieveAPIView):
+    use_replica = True
+    queryset = Ad.objects.filter(status="active").select_related(
+        "category", "seller", "region", "district"
+    )
     serializer_class = AdDetailSerializer
     lookup_field = "slug"
 
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        instance.increment_view_count()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+    def ad_requested(self, pk):
+        view_counter.record(pk)
+
+    def get_object(self):
+        instance = super().get_object()
+        instance.view_count += view_counter.pending(instance.pk)
+        return instance
 
 
 class AdCreateView(generics.CreateAPIView):
@@ -114,19 +162,15 @@ class AdCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class MyAdListView(generics.ListAPIView):
+class MyAdListView(ConditionalAdListMixin, generics.ListAPIView):
     serializer_class = AdListSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = AdFeedPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["status"]
 
     def get_queryset(self):
-        return (
-            Ad.objects.filter(seller=self.request.user)
-            .select_related("category", "region", "district")
-            .prefetch_related("photos")
-        )
+        return Ad.objects.filter(seller=self.request.user).for_list()
 
 
 class MyAdDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -142,8 +186,11 @@ class MyAdDetailView(generics.RetrieveUpdateDestroyAPIView):
         return AdCreateUpdateSerializer
 
 
-class ProductDownloadView(generics.RetrieveAPIView):
-    queryset = Ad.objects.filter(status="active")
+class ProductDownloadView(ConditionalAdDetailMixin, generics.RetrieveAPIView):
+    use_replica = True
+    queryset = Ad.objects.filter(status="active").select_related(
+        "category", "seller", "region", "district"
+    )
     serializer_class = AdDetailSerializer
     lookup_field = "slug"
 
@@ -154,30 +201,36 @@ class AdPhotoCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class FavoriteProductListView(generics.ListAPIView):
+class FavoriteProductListView(ConditionalAdListMixin, generics.ListAPIView):
     serializer_class = FavoriteProductSerializer
+    ad_attr = "ad"
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CachedCountPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["ad__category"]
 
     def get_queryset(self):
-        return FavoriteProduct.objects.filter(user=self.request.user).select_related(
-            "ad__seller", "ad__category", "ad__region", "ad__district"
+        return (
+            FavoriteProduct.objects.filter(user=self.request.user)
+            .select_related("ad__seller", "ad__category", "ad__region", "ad__district")
         )
 
 
-class FavoriteProductByIdListView(generics.ListAPIView):
+class FavoriteProductByIdListView(ConditionalAdListMixin, generics.ListAPIView):
     serializer_class = FavoriteProductSerializer
-    pagination_class = StandardResultsSetPagination
+    ad_attr = "ad"
+    pagination_class = CachedCountPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["device_id"]
 
     def get_queryset(self):
         device_id = self.request.query_params.get("device_id")
         if device_id:
-            return FavoriteProduct.objects.filter(device_id=device_id).select_related(
-                "ad__seller", "ad__category", "ad__region", "ad__district"
+            return (
+                FavoriteProduct.objects.filter(device_id=device_id)
+                .select_related(
+                    "ad__seller", "ad__category", "ad__region", "ad__district"
+                )
             )
         return FavoriteProduct.objects.none()
 
@@ -287,7 +340,31 @@ class SavedSearchDeleteView(generics.DestroyAPIView):
         return SavedSearch.objects.filter(user=self.request.user)
 
 
+class SavedSearchMatchListView(generics.ListAPIView):
+    serializer_class = SavedSearchMatchSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CachedCountPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["saved_search", "is_seen"]
+
+    def get_queryset(self):
+        return SavedSearchMatch.objects.filter(user=self.request.user).select_related(
+            "ad__seller", "ad__category", "ad__region", "ad__district"
+        )
+
+
+class SavedSearchMatchSeenView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        updated = SavedSearchMatch.objects.filter(
+            user=request.user, is_seen=False
+        ).update(is_seen=True)
+        return Response({"updated": updated})
+
+
 class CategoryProductSearchView(generics.ListAPIView):
+    use_replica = True
     serializer_class = SearchResultSerializer
     pagination_class = SmallResultsSetPagination
 
@@ -296,6 +373,7 @@ class CategoryProductSearchView(generics.ListAPIView):
         if not query:
             return []
 
+        query_log.record_request(self.request, query)
         results = []
 
         categories = Category.objects.filter(
@@ -312,9 +390,9 @@ class CategoryProductSearchView(generics.ListAPIView):
                 }
             )
 
-        ads = Ad.objects.filter(
-            Q(name__icontains=query) & Q(status="active")
-        ).select_related("category")[:5]
+        ads = search_ads(
+            Ad.objects.filter(status="active").select_related("category"), query
+        )[:5]
 
         for ad in ads:
             results.append(
@@ -344,34 +422,17 @@ class CategoryProductSearchView(generics.ListAPIView):
 
 
 class AutoCompleteSearchView(generics.ListAPIView):
+    use_replica = True
     serializer_class = AutoCompleteSerializer
     pagination_class = SmallResultsSetPagination
+    filter_backends = []
 
     def get_queryset(self):
         query = self.request.query_params.get("q", "").strip()
         if not query:
             return []
 
-        results = []
-
-        ads = Ad.objects.filter(
-            Q(name__icontains=query) & Q(status="active")
-        ).select_related("category")[:10]
-
-        for ad in ads:
-            results.append(
-                {
-                    "id": ad.id,
-                    "name": ad.name,
-                    "icon": (
-                        ad.category.icon.url
-                        if ad.category and ad.category.icon
-                        else None
-                    ),
-                }
-            )
-
-        return results
+        return autocomplete_index.search(query, limit=10)
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -384,24 +445,29 @@ class AutoCompleteSearchView(generics.ListAPIView):
         return Response(serializer.data)
 
 
-class PopularSearchView(generics.ListAPIView):
+class PopularSearchView(ResponseCacheMixin, generics.ListAPIView):
+    use_replica = True
     queryset = PopularSearch.objects.filter(is_active=True)
     serializer_class = PopularSearchSerializer
     pagination_class = SmallResultsSetPagination
+    cache_models = (PopularSearch,)
 
 
 @api_view(["GET"])
 def search_count_increase(request, id):
-    try:
-        category = Category.objects.get(id=id)
-        search_count, created = SearchCount.objects.get_or_create(
-            category=category, defaults={"search_count": 0}
-        )
-        search_count.increment()
-
-        serializer = SearchCountSerializer(search_count)
-        return Response(serializer.data)
-    except Category.DoesNotExist:
+    category = Category.objects.select_related("search_stats").filter(id=id).first()
+    if category is None:
         return Response(
             {"error": "Kategoriya topilmadi"}, status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+        )
+
+    try:
+        search_count = category.search_stats
+    except SearchCount.DoesNotExist:
+        search_count, created = SearchCount.objects.get_or_create(category=category)
+    search_count.increment()
+    # Bazaga hali yozilmagan qo'shimchalar ham ko'rsatiladi
+    search_count.search_count += search_counter.pending(category.id)
+
+    serializer = SearchCountSerializer(search_count)
+    return Response(serializer.data)
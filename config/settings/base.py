@@ -5,6 +5,8 @@ from pathlib import Path
 from django.utils.translation import gettext_lazy as _
 from dotenv import load_dotenv
 
+from .database import get_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.append(os.path.join(BASE_DIR, "apps"))
@@ -41,6 +43,9 @@ LOCAL_APPS = [
 INSTALLED_APPS = BASE_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # Eng tashqarida: boshqa middleware'lar vaqti va so'rovlari ham o'lchanadi
+    "common.middleware.RequestMetricsMiddleware",
+    "common.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -73,12 +78,10 @@ TEMPLATES = [
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+# DATABASE_URL, REPLICA_DATABASE_URL, DB_CONN_MAX_AGE, DB_POOL, ... (database.py)
+DATABASES = get_databases(BASE_DIR)
+
+DATABASE_ROUTERS = ["common.db_router.ReplicaRouter"]
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -152,6 +155,133 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Kesh: CACHE_BACKEND = locmem | file | redis, CACHE_LOCATION - papka yoki URL
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            {
+                "locmem": "",
+                "file": os.path.join(BASE_DIR, "cache"),
+                "redis": "redis://127.0.0.1:6379/1",
+            }[CACHE_BACKEND],
+        ),
+    }
+}
+# Deyarli o'zgarmas GET javoblari (kategoriyalar, sahifalar, sozlamalar)
+# shuncha soniya keshlanadi; model o'zgarsa darhol eskiradi
+RESPONSE_CACHE_TIMEOUT = 600
+
+# Endpoint o'lchovlari (common.middleware.RequestMetricsMiddleware): soatlik
+# yig'indilar EndpointMetric jadvaliga yoziladi, `request_metrics` buyrug'i
+# ko'rsatadi. BUDGETS - endpoint uchun so'rovlar soni va ms chegarasi;
+# oshganlari logga yoziladi, testlarda QueryBudgetMixin tekshiradi
+REQUEST_METRICS = {
+    "ENABLED": os.environ.get("REQUEST_METRICS_ENABLED", "1") == "1",
+    "FLUSH_INTERVAL": 60,
+    "BUDGETS": {
+        "store:ad-list": {"queries": 4, "ms": 300},
+        "store:ad-detail": {"queries": 4, "ms": 200},
+        "store:my-ad-list": {"queries": 4, "ms": 300},
+        "store:my-favorite-list": {"queries": 4, "ms": 300},
+        "store:saved-search-matches": {"queries": 4, "ms": 300},
+        "store:category-list": {"queries": 3, "ms": 200},
+        "store:categories-with-children": {"queries": 2, "ms": 200},
+        "store:popular-search": {"queries": 3, "ms": 200},
+        "store:category-product-search": {"queries": 3, "ms": 300},
+        "store:autocomplete-search": {"queries": 4, "ms": 100},
+        "regions-with-districts": {"queries": 3, "ms": 200},
+    },
+}
+
+# `use_replica = True` belgilangan view'larning GET/HEAD so'rovlari ALIAS
+# bazasidan o'qiydi (common.db_router). POST/PUT/PATCH/DELETE dan keyin
+# STICKY_SECONDS davomida COOKIE_NAME cookie'si bilan asosiy bazadan o'qiladi
+READ_REPLICA = {
+    "ALIAS": "replica",
+    "STICKY_SECONDS": int(os.environ.get("REPLICA_STICKY_SECONDS", 10)),
+    "COOKIE_NAME": "read_primary",
+}
+
+# Fon vazifalari navbati (common.Task jadvali), `run_tasks` worker bajaradi.
+# EAGER=True bo'lsa vazifalar so'rov ichida darhol bajariladi
+TASKS = {
+    "EAGER": os.environ.get("TASKS_EAGER", "") == "1",
+    "MAX_ATTEMPTS": 3,
+    "RETRY_DELAY": 30,
+    "LEASE": 300,
+    "WORKERS": 4,
+    "BATCH_SIZE": 20,
+    "POLL_INTERVAL": 1,
+}
+
+# Yuklangan rasmlarning kichraytirilgan nusxalari fon vazifasida yaratiladi
+# (generate_image_variants buyrug'i mavjud rasmlar uchun, WORKERS oqimda)
+IMAGE_VARIANTS = {
+    "SIZES": {"thumb": (320, 320), "detail": (800, 800), "full": (1600, 1600)},
+    "FORMAT": "WEBP",
+    "QUALITY": 80,
+    "WORKERS": 2,
+    "READY_CHECK_INTERVAL": 60,
+    "FIELDS": (
+        "store.AdPhoto.image",
+        "store.Category.icon",
+        "store.PopularSearch.icon",
+        "accounts.User.profile_photo",
+    ),
+}
+
+# E'lon ko'rishlari xotirada yig'ilib, bazaga guruhlab yoziladi
+# (har bir worker chiqishda o'zinikini yozadi; flush_view_counts buyrug'i
+# faqat SQLiteFileStore kabi umumiy store bilan ishlaydi)
+VIEW_COUNT_BUFFER = {
+    "STORE": "common.utils.counter_buffer.LocalMemoryStore",
+    "FLUSH_INTERVAL": 10,
+    "FLUSH_THRESHOLD": 500,
+}
+# Kategoriya va mashhur qidiruvlar hisoblagichlari ham shunday yig'iladi
+# (flush_search_counts ham faqat umumiy store bilan ishlaydi)
+SEARCH_COUNT_BUFFER = {
+    "STORE": "common.utils.counter_buffer.LocalMemoryStore",
+    "FLUSH_INTERVAL": 10,
+    "FLUSH_THRESHOLD": 500,
+}
+# Mashhur qidiruvlar trend skori shuncha kunda ikki marta so'nadi
+SEARCH_TREND_HALF_LIFE_DAYS = 7
+# Foydalanuvchi qidiruvlari cheklangan sketchda yig'iladi va har FLUSH_INTERVAL
+# soniyada har bir til bo'yicha eng ko'p TOP_K tasi PopularSearch ga yoziladi.
+# Yangi so'rovlar nofaol qo'shiladi va admin tomonidan faollashtiriladi;
+# ACTIVATE=True bo'lsa jami MIN_COUNT marta qidirilganlari o'zi faollashadi
+TRENDING_SEARCHES = {
+    "STORE_OPTIONS": {"capacity": 1000},
+    "FLUSH_INTERVAL": 300,
+    "TOP_K": 20,
+    "CANDIDATE_MIN_COUNT": 3,
+    "MIN_COUNT": 100,
+    "ACTIVATE": False,
+}
+
+# True bo'lsa, kategoriya product_count'i ichki kategoriyalardagi e'lonlarni ham qo'shadi
+CATEGORY_PRODUCT_COUNT_ROLLUP = False
+# Kategoriya daraxti keshda saqlanadi, Category o'zgarganda tozalanadi
+CATEGORY_TREE_CACHE_TIMEOUT = 300
+# Sahifalangan ro'yxatlarning umumiy soni shuncha soniya keshlanadi
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
+
+# None bo'lsa, baza turiga qarab tanlanadi (SQLite FTS5 / PostgreSQL tsvector)
+STORE_SEARCH_BACKEND = None
+
+# Avtoto'ldirish indeksi signallar bilan yangilanadi; boshqa workerlardagi
+# o'zgarishlarni olish uchun shuncha soniyada bir qayta quriladi
+AUTOCOMPLETE_REBUILD_INTERVAL = 300
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),